@@ -0,0 +1,162 @@
+/*
+ * 模拟 Reolink 客户端的页面逻辑, 数据与设备行为由 utils/fake_client.py 提供
+ * 页面结构与 config/selectors.yml 中 main_window / add_device_window 的选择器对应
+ */
+var FakeClient = (function () {
+    var listJson = '';
+
+    function query(name) {
+        return new URLSearchParams(location.search).get(name) || '';
+    }
+
+    function api(path, body) {
+        return fetch('/api/' + path, {
+            method: body ? 'POST' : 'GET',
+            headers: {'Content-Type': 'application/json'},
+            body: body ? JSON.stringify(body) : undefined
+        }).then(function (resp) { return resp.json(); });
+    }
+
+    function el(tag, attrs, children) {
+        var e = document.createElement(tag);
+        Object.keys(attrs || {}).forEach(function (k) {
+            if (k === 'text') e.textContent = attrs[k];
+            else if (k.indexOf('on') === 0) e.addEventListener(k.slice(2), attrs[k]);
+            else e.setAttribute(k, attrs[k]);
+        });
+        (children || []).forEach(function (c) { e.appendChild(c); });
+        return e;
+    }
+
+    function hideMenu() {
+        document.getElementById('context-menu').style.display = 'none';
+    }
+
+    function showMenu(evt, name) {
+        evt.preventDefault();
+        var menu = document.getElementById('context-menu');
+        menu.innerHTML = '';
+        menu.appendChild(el('img', {src: 'remove.png', alt: '删除', onclick: function () {
+            hideMenu();
+            openDialog('remove', name);
+        }}));
+        menu.style.left = evt.clientX + 'px';
+        menu.style.top = evt.clientY + 'px';
+        menu.style.display = 'block';
+    }
+
+    function deviceItem(d) {
+        var card = el('div', {'class': 'device-wrap-background allow-events-item', onclick: function () {
+            document.querySelectorAll('.device-wrap-background.selected').forEach(function (c) {
+                c.classList.remove('selected');
+            });
+            card.classList.add('selected');
+        }, oncontextmenu: function (evt) { showMenu(evt, d.name); }}, [
+            el('span', {'class': 'device-name allow-events-item small-title', text: d.name}),
+            el('span', {'class': 'state-text', text: d.status}),
+            el('div', {'class': 'sd-box allow-events', title: 'SD Card'})
+        ]);
+        var buttons = d.buttons.map(function (title) {
+            return el('li', {}, [el('div', {'class': 'cell-inner', title: title, onclick: function () {
+                api('button', {name: d.name, title: title}).then(function (resp) {
+                    if (resp.dialog) openDialog(resp.dialog, d.name);
+                });
+            }})]);
+        });
+        return el('li', {'class': 'list-item'}, [
+            el('div', {}, [el('div', {'class': 'device-wrap'}, [card])]),
+            el('ul', {'class': 'device-settings'}, buttons)
+        ]);
+    }
+
+    function render(devices) {
+        var ul = document.getElementById('device-ul');
+        ul.innerHTML = '';
+        devices.forEach(function (d) { ul.appendChild(deviceItem(d)); });
+    }
+
+    function refresh() {
+        return api('devices').then(function (devices) {
+            var json = JSON.stringify(devices);
+            // 列表未变化时不重新渲染, 避免已获取的元素失效
+            if (json !== listJson) {
+                listJson = json;
+                render(devices.filter(function (d) { return d.listed; }));
+            }
+        });
+    }
+
+    function openDialog(kind, name) {
+        window.open('dialog.html?kind=' + kind + '&name=' + encodeURIComponent(name || ''), '_blank',
+            'width=480,height=240');
+    }
+
+    return {
+        initMain: function () {
+            document.addEventListener('click', hideMenu);
+            refresh();
+            setInterval(refresh, 100);
+        },
+
+        openAddDevice: function () {
+            window.open('add_device.html', '_blank', 'width=800,height=600');
+        },
+
+        openDialog: openDialog,
+
+        initDialog: function () {
+            var texts = {remove: '确定删除设备?', clear: '确定清空设备列表?', battery: '电池设备', login: '密码错误'};
+            document.getElementById('dialog-text').textContent = texts[query('kind')] || '';
+        },
+
+        confirmDialog: function () {
+            var kind = query('kind'), name = query('name');
+            var done = function () { window.close(); };
+            if (kind === 'remove') api('remove', {name: name}).then(done);
+            else if (kind === 'clear') api('clear', {}).then(done);
+            else done();
+        },
+
+        initAddDevice: function () {
+            api('devices').then(function (devices) {
+                var ul = document.getElementById('scan-ul');
+                devices.filter(function (d) { return !d.listed; }).forEach(function (d) {
+                    ul.appendChild(el('li', {}, [
+                        el('h4', {text: d.name}),
+                        el('div', {'class': 'add-btn cell-inner', onclick: function () {
+                            document.getElementById('uid-input').value = d.uid;
+                            FakeClient.addDevice();
+                        }})
+                    ]));
+                });
+            });
+        },
+
+        addDevice: function () {
+            var uid = document.getElementById('uid-input').value.trim();
+            api('add', {uid: uid}).then(function (resp) {
+                if (!resp.ok) return;
+                // 电池机有二次确认弹窗
+                if (resp.battery) openDialog('battery', resp.name);
+                location.href = (resp.wired_only ? 'device_login.html' : 'device_wifi.html') + '?uid=' + encodeURIComponent(uid);
+            });
+        },
+
+        gotoLogin: function () {
+            location.href = 'device_login.html?uid=' + encodeURIComponent(query('uid'));
+        },
+
+        login: function () {
+            var tip = document.getElementById('login-tip');
+            tip.textContent = '';
+            api('login', {
+                uid: query('uid'),
+                uname: document.getElementById('uname-input').value,
+                passwd: document.getElementById('passwd-input').value
+            }).then(function (resp) {
+                if (resp.ok) window.close();
+                else tip.textContent = resp.tip;
+            });
+        }
+    };
+})();
@@ -1,15 +1,17 @@
+from typing import Iterable, Set
 from selenium.webdriver.remote.webdriver import WebDriver
 from base.base_window import BaseWindow
 from page.main_window import MainWindow
 from utils.common import common
+from utils.device_registry import DeviceRegistry
 
 
 class BaseWF(BaseWindow):
     """基本工作流"""
 
-    def __init__(self, driver: WebDriver, window_handle: str = '') -> None:
-        super().__init__(driver, window_handle)
-        self._main_window = MainWindow(self._driver)
+    def __init__(self, driver: WebDriver, window_handle: str = '', devices: DeviceRegistry = None) -> None:
+        super().__init__(driver, window_handle, devices)
+        self._main_window = MainWindow(self._driver, devices=self._devices)
         # self._logger = Logger()
 
     def awake_device_by_need(self, name: str = None) -> None:
@@ -19,13 +21,39 @@ class BaseWF(BaseWindow):
                 - name: 待唤醒的设备, 默认唤醒全部设备
         """
         try:
-            # 如果未指定设备名，尝试唤醒所有设备
-            if not name:
-                self._main_window.attempt_awake_devices()
-            else:
-                # 否则，尝试唤醒指定设备
-                self._main_window.attempt_awake_devices([name])
+            # 未指定设备名时尝试唤醒所有设备, 否则唤醒指定设备
+            pending = self._main_window.attempt_awake_devices([name] if name else [])
         except BaseException as err:
             raise ValueError(
                 f"{common.I18n['_error_msg']['_attempt_awake_device_fail']}: {err}"
             )
+        # 超时仍未连接的设备同样视为唤醒失败
+        if pending:
+            raise ValueError(
+                f"{common.I18n['_error_msg']['_attempt_awake_device_fail']}: {', '.join(sorted(pending))}"
+            )
+
+    def wait_for_devices(
+            self,
+            names: Iterable[str],
+            status: str = 'ACTIVE',
+            timeout: float = None
+    ) -> Set[str]:
+        """
+            等待设备进入指定状态, 状态由设备列表后台监控推送, 不重复读取设备列表
+
+            参数:
+                - names: 设备名称
+                - status: 状态键, 见 `common.I18n['_e_device_status']`, 默认 ACTIVE
+                - timeout: 超时时间(秒), 为空时一直等待
+
+            返回值:
+                - Set[str]: 超时仍未进入该状态的设备, 全部进入时为空集合
+        """
+        owned = not (self._devices.monitor and self._devices.monitor.running)
+        self._main_window.start_device_monitor()
+        try:
+            return self._devices.wait_for(names, status, timeout)
+        finally:
+            if owned:
+                self._main_window.stop_device_monitor()
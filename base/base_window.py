@@ -1,56 +1,290 @@
 import os
+import sys
 import time
+from contextlib import nullcontext
 from datetime import date
-from random import uniform
 from selenium.webdriver.support import expected_conditions as EC
-from typing import List, Any, Literal, Dict, Callable
-from selenium.common import TimeoutException
+from typing import List, Any, Literal, Dict, Callable, Tuple
+from selenium.common import TimeoutException, WebDriverException
 from selenium.webdriver import ActionChains, Keys
 from selenium.webdriver.common.actions.wheel_input import ScrollOrigin
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 # from selenium import webdriver
-import pyautogui as pg
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.wait import WebDriverWait
 from utils.common import common
+from utils.device_registry import DeviceRegistry
 from utils.utils import util
+from utils.pause_report import pause_report
+from base.input_backend import create_input_backend, native_input, CdpInput
 
 """基础窗口，所有窗口都继承自该窗口，提供了基础的页面操作能力"""
 
+# 支持事件驱动等待的选择器类型
+_OBSERVABLE_BY = (By.XPATH, By.CSS_SELECTOR, By.TAG_NAME)
+
+# 窗口位置尺寸缓存的有效期(秒), 窗口移动或缩放后最多经过该时间即重新读取
+_WINDOW_RECT_TTL = 0.5
+
+# 注入页面的等待脚本: 先同步检查一次, 未满足时通过 MutationObserver 监听 DOM 变化,
+# 辅以低频检查覆盖样式过渡等不产生 DOM 变化的场景, 超时回调 null
+_OBSERVE_SCRIPT = """
+var selector = arguments[0], by = arguments[1], root = arguments[2] || document,
+    waitAttr = arguments[3], allowNull = arguments[4], multiple = arguments[5],
+    timeout = arguments[6], done = arguments[arguments.length - 1];
+
+function query() {
+    if (by === 'xpath') {
+        var snap = document.evaluate(selector, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < snap.snapshotLength; i++) {
+            if (snap.snapshotItem(i).nodeType === 1) nodes.push(snap.snapshotItem(i));
+        }
+        return nodes;
+    }
+    return Array.prototype.slice.call(root.querySelectorAll(selector));
+}
+
+function visible(el) {
+    var style = window.getComputedStyle(el);
+    if (style.display === 'none' || style.visibility === 'hidden') return false;
+    var rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+}
+
+function ready(el) {
+    if (!waitAttr) return true;
+    if (waitAttr === 'text') return allowNull || (visible(el) && (el.innerText || '').trim() !== '');
+    if (waitAttr === 'visible') return visible(el);
+    return allowNull || !!el.getAttribute(waitAttr);
+}
+
+function check() {
+    var found = query();
+    if (!found.length) return null;
+    if (multiple) return found;
+    return ready(found[0]) ? found[0] : null;
+}
+
+var first = check();
+if (first) {
+    done(first);
+    return;
+}
+
+var finished = false, observer, ticker, timer;
+function finish(value) {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearInterval(ticker);
+    clearTimeout(timer);
+    done(value);
+}
+function recheck() {
+    if (finished) return;
+    var value = check();
+    if (value) finish(value);
+}
+
+observer = new MutationObserver(recheck);
+observer.observe(document.documentElement, {
+    childList: true, subtree: true, attributes: true, characterData: true
+});
+ticker = setInterval(recheck, 100);
+timer = setTimeout(function () { finish(null); }, timeout);
+"""
+
+# 一次读取整个排程方格, 优先读取 <canvas> 像素, 否则按方块中心取 DOM 背景色
+# 参数: 元素, 横向个数, 纵向个数, 激活颜色(为空时返回颜色二维数组, 否则返回每行的位掩码)
+_CUBE_READ_SCRIPT = """
+var el = arguments[0], xunit = arguments[1], yunit = arguments[2], active = arguments[3];
+el.scrollIntoView();
+var r = el.getBoundingClientRect(), uw = r.width / xunit, uh = r.height / yunit;
+var grid = null, i, j;
+
+if (el instanceof HTMLCanvasElement && el.width && el.height) {
+    try {
+        var ctx = el.getContext('2d');
+        if (ctx) {
+            var sx = el.width / r.width, sy = el.height / r.height;
+            var data = ctx.getImageData(0, 0, el.width, el.height).data;
+            grid = [];
+            for (i = 0; i < yunit; i++) {
+                var row = [];
+                for (j = 0; j < xunit; j++) {
+                    var px = Math.floor((j + 0.5) * uw * sx), py = Math.floor((i + 0.5) * uh * sy);
+                    var k = (py * el.width + px) * 4;
+                    row.push('rgb(' + data[k] + ', ' + data[k + 1] + ', ' + data[k + 2] + ')');
+                }
+                grid.push(row);
+            }
+        }
+    } catch (e) {
+        // 跨域污染的 canvas 或 webgl 上下文, 回退到 DOM
+        grid = null;
+    }
+}
+
+if (!grid) {
+    grid = [];
+    for (i = 0; i < yunit; i++) {
+        var cells = [];
+        for (j = 0; j < xunit; j++) {
+            var hit = document.elementFromPoint(r.left + uw / 2 + j * uw, r.top + uh / 2 + i * uh);
+            cells.push(hit ? window.getComputedStyle(hit).backgroundColor : null);
+        }
+        grid.push(cells);
+    }
+}
+
+if (!active) return grid;
+var norm = function (c) { return String(c).replace(/\\s+/g, '').toLowerCase(); };
+var target = norm(active);
+return grid.map(function (cells) {
+    var mask = 0;
+    for (var n = 0; n < cells.length; n++) {
+        if (norm(cells[n]) === target) mask += Math.pow(2, n);
+    }
+    return mask;
+});
+"""
+
+# 通过原生 setter 设置 range 输入框的值并派发 input/change 事件, 两帧后返回重新读取的值
+# (受控组件不接受合成事件时会在重新渲染时还原)
+_RANGE_SET_SCRIPT = """
+var el = arguments[0], value = arguments[1], done = arguments[arguments.length - 1];
+var setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+setter.call(el, String(value));
+el.dispatchEvent(new Event('input', {bubbles: true}));
+el.dispatchEvent(new Event('change', {bubbles: true}));
+requestAnimationFrame(function () {
+    requestAnimationFrame(function () { done(el.value); });
+});
+"""
+
+# 在日期选择器中找到文本为指定日期的元素
+_DAY_PICK_SCRIPT = """
+var selector = arguments[0], by = arguments[1], day = arguments[2], nodes = arguments[3] || [];
+if (arguments[3]) {
+    // 无法在页面中查询的选择器, 由调用方查找后传入
+} else if (by === 'xpath') {
+    var snap = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (var i = 0; i < snap.snapshotLength; i++) nodes.push(snap.snapshotItem(i));
+} else {
+    nodes = Array.prototype.slice.call(document.querySelectorAll(selector));
+}
+for (var j = 0; j < nodes.length; j++) {
+    if ((nodes[j].innerText || nodes[j].textContent || '').trim() === day) return nodes[j];
+}
+return null;
+"""
+
+
+
+def _as_css(selector: str, by: str) -> str:
+    """将 id/class/name/tag 选择器转为 CSS 选择器(同 selenium 对 W3C 的转换), 无法转换时返回 None"""
+    match by:
+        case By.CSS_SELECTOR:
+            return selector
+        case By.ID:
+            return f'[id="{selector}"]'
+        case By.CLASS_NAME:
+            return f".{selector}"
+        case By.NAME:
+            return f'[name="{selector}"]'
+        case By.TAG_NAME:
+            return selector
+    return None
+
+
+# 一次读取窗口与元素的位置尺寸, 元素坐标与 WebElement.rect 一致(相对页面)
+_GEOMETRY_SCRIPT = """
+var els = arguments[0], sx = window.scrollX, sy = window.scrollY;
+return {
+    window: {x: window.screenLeft, y: window.screenTop, width: window.screen.width, height: window.screen.height},
+    rects: els.map(function (el) {
+        var r = el.getBoundingClientRect();
+        return {x: r.left + sx, y: r.top + sy, width: r.width, height: r.height};
+    })
+};
+"""
+
+
+class Until:
+    """
+        点击操作的后置条件, 条件满足后点击立即返回, 替代固定的 pause
+
+        eg:
+            - Until.appear(selector, by): 元素出现
+            - Until.disappear(selector, by): 元素消失
+            - Until.new_window(): 出现新窗口
+            - Until.window_closed(): 当前窗口数减少
+            - Until.text_change(selector, by): 元素文本变化
+            - Until.text_contains(selector, text, by): 元素文本包含 text
+    """
+
+    def __init__(
+            self,
+            kind: Literal['appear', 'disappear', 'new_window', 'window_closed', 'text_change', 'text_contains'],
+            selector: str = None,
+            by: Literal = By.XPATH,
+            timeout: float = None,
+            text: str = None
+    ) -> None:
+        self.kind = kind
+        self.selector = selector
+        self.by = by
+        self.timeout = timeout  # 为空时使用点击操作的超时时间
+        self.text = text
+
+    @classmethod
+    def appear(cls, selector: str, by: Literal = By.XPATH, timeout: float = None) -> 'Until':
+        return cls('appear', selector, by, timeout)
+
+    @classmethod
+    def disappear(cls, selector: str, by: Literal = By.XPATH, timeout: float = None) -> 'Until':
+        return cls('disappear', selector, by, timeout)
+
+    @classmethod
+    def new_window(cls, timeout: float = None) -> 'Until':
+        return cls('new_window', timeout=timeout)
+
+    @classmethod
+    def window_closed(cls, timeout: float = None) -> 'Until':
+        return cls('window_closed', timeout=timeout)
+
+    @classmethod
+    def text_change(cls, selector: str, by: Literal = By.XPATH, timeout: float = None) -> 'Until':
+        return cls('text_change', selector, by, timeout)
+
+    @classmethod
+    def text_contains(cls, selector: str, text: str, by: Literal = By.XPATH, timeout: float = None) -> 'Until':
+        return cls('text_contains', selector, by, timeout, text)
+
 
 class BaseWindow:
     _timeout = common.ENV['element_timeout']  # 设置元素查找的超时时间
     _root_sel = "#remote-config-app > div.config-context-wrap > div"  # 设置根元素的CSS选择器
+    _wait_engine = common.ENV.get('wait_engine', 'observer')  # 元素等待方式 observer|poll
+    _script_timeout = common.ENV.get('script_timeout', 30)  # 异步脚本超时时间
+    _image_dir = os.path.join(common.ProjectRoot, 'test', 'assets', 'images')  # click_on_image 的图片目录
+    _date_header_sel = None  # date_picker 的默认月份标题选择器, 由窗口子类按选择器配置设置
 
-    '''
-    定义了一个名为 _device_statuses 的类变量，它是一个字典。这个字典的键是设备的状态，而对应的值是一个集合（set）
-    每个状态都有一个关联的集合，用于存储具有该状态的设备。这种数据结构的设计是为了方便对设备状态的管理。
-    在程序运行时，可以通过访问 _device_statuses 字典，根据不同的状态快速查找和管理设备。
-    
-    例如，如果想知道所有状态为 'ACTIVE' 的设备，只需访问 _device_statuses['ACTIVE']，
-    这将返回一个包含所有激活设备的集合。这种设计使得对设备状态的变更和检索都变得相对高效。
-    '''
-    _device_statuses = {
-        'ACTIVE': set(),
-        'INACTIVE': set(),
-        'WRONG_PASS': set(),
-        'FAIL': set(),
-        'OTHER': set()
-    }
-
-    def __init__(self, driver: WebDriver, window_handle: str = '') -> None:
+    def __init__(
+            self,
+            driver: WebDriver,
+            window_handle: str = '',
+            devices: DeviceRegistry = None
+    ) -> None:
         self._driver = driver
-
-        if common.ENV['pyautogui.PAUSE']:
-            pg.PAUSE = common.ENV['pyautogui.PAUSE']
-        else:
-            pg.PAUSE = 0.1
-
-        if common.ENV['pyautogui.FAILSAFE']:
-            pg.FAILSAFE = common.ENV['pyautogui.FAILSAFE']
-        else:
-            pg.FAILSAFE = 0.1
+        # 设备状态登记, 同一工作流下的窗口对象共享同一个登记, 见 `utils.device_registry`
+        self._devices = devices if devices is not None else DeviceRegistry()
+        # 输入后端, 见 `global.yml` 的 `input_backend`
+        self._input = create_input_backend(driver)
+        # 窗口位置尺寸缓存, 窗口句柄 -> (读取时间, rect), 超过 _WINDOW_RECT_TTL 或切换窗口时失效
+        self._window_rects: Dict[str, Tuple[float, Dict[str, float]]] = {}
 
         if window_handle != '':
             self._driver.switch_to.window(window_handle)
@@ -60,48 +294,23 @@ class BaseWindow:
     def get_title(self) -> str:
         return self._driver.title
 
-    # 该方法用于等待直到满足某个条件
+    # 该方法用于等待直到满足某个条件, 与 wait_until_2 行为一致, 保留以兼容旧调用
     def wait_until(
             self,
             fn: Callable,
-            # Callable是一个类型提示，用于表示一个对象是可调用的。可以是函数、方法、类或其他任何可调用的对象。fn: Callable 表示参数 fn 应该是一个可调用的对象。这个函数期望一个可调用的函数或方法，并在等待的过程中多次调用它，直到满足某个条件或超时。
-            element: WebElement,  # element 参数是一个 WebElement 对象，表示要在其上执行 fn 检查
-            timeout: int,  # 表示最长等待时间（秒）
-            period: float,  # 表示轮询间隔时间（秒）
-            wait_attr: str = None,  # 表示等待的条件属性，例如 'text', 'visible' 或其他属性
-            allow_null: bool = False  # 如果为 True，则即使属性为空，也将被视为满足条件
+            element: WebElement,
+            timeout: int,
+            period: float,
+            wait_attr: str = None,
+            allow_null: bool = False
     ) -> WebElement:
-        # 获取当前时间，并计算最后期限
-        end_time = time.monotonic() + timeout
-        err_msg = None
-        while True:
-            try:
-                # value = fn(element or self._driver) 这行代码使用了一个短路逻辑的写法。在Python中，or 操作符返回其第一个为真的值。
-                # 如果 element 为真（即不为 None 或者 False），则 fn(element) 就会被调用；否则，self._driver 会被传递给 fn 函数。
-                # 这样的写法在确保有一个有效的 element 变量时使用，否则使用默认的 self._driver。
-                value = fn(element or self._driver)
-                if value:
-                    if wait_attr:
-                        if wait_attr == 'text':
-                            if value.text or allow_null:
-                                return value
-                        elif wait_attr == 'visible' or allow_null:
-                            if value.is_displayed():
-                                return value
-                        else:
-                            if value.get_attribute(wait_attr) or allow_null:
-                                return value
-                        raise ValueError(f"{wait_attr} not available")
-
-                    return value
-            except BaseException as err:
-                err_msg = err
-            time.sleep(period)
-            if time.monotonic() > end_time:
-                err_msg = f"{common.I18n['_error_msg']['_element_timeout']}"
-                break
-        raise TimeoutException(
-            f"{common.I18n['_error_msg']['_element_not_found']}: {err_msg}"
+        return self.wait_until_2(
+            fn=fn,
+            element=element,
+            timeout=timeout,
+            period=period,
+            wait_attr=wait_attr,
+            allow_null=allow_null
         )
 
     def wait_until_2(
@@ -111,10 +320,65 @@ class BaseWindow:
             timeout: int,
             period: float,
             wait_attr: str = None,
-            allow_null: bool = False
+            allow_null: bool = False,
+            selector: str = None,
+            by: Literal = By.XPATH,
+            multiple: bool = False
     ) -> WebElement:
+        """
+            等待直到 `fn` 返回满足条件的值
+
+            参数:
+                - fn: 轮询时调用的查找函数
+                - element: 相对路径的根元素, 为空时在整个页面查找
+                - timeout: 超时时间
+                - period: 轮询间隙
+                - wait_attr: 需要等待显示的值 text|visible|title 等
+                - allow_null: 是否允许 wait_attr 对应的值为空
+                - selector: 选择器, 传入时优先在页面中注入 MutationObserver 等待, 失败回退为轮询
+                - by: 选择器类型, 事件驱动等待仅支持 By.XPATH | By.CSS_SELECTOR | By.TAG_NAME
+                - multiple: 是否返回所有匹配元素(对应 find_elements)
+        """
         # 获取当前时间，并计算最后期限
         end_time = time.monotonic() + timeout
+
+        if selector is not None and self._observer_available(by, timeout):
+            try:
+                return self._observe_until(
+                    selector=selector,
+                    by=by,
+                    element=element,
+                    timeout=timeout,
+                    wait_attr=wait_attr,
+                    allow_null=allow_null,
+                    multiple=multiple
+                )
+            except TimeoutException:
+                raise
+            except WebDriverException:
+                # 页面不支持脚本注入(根元素失效、跨域 iframe 等), 用剩余时间回退为轮询
+                timeout = max(end_time - time.monotonic(), 0)
+
+        return self._poll_until(
+            fn=fn,
+            element=element,
+            timeout=timeout,
+            period=period,
+            wait_attr=wait_attr,
+            allow_null=allow_null
+        )
+
+    def _poll_until(
+            self,
+            fn: Callable,
+            element: WebElement,
+            timeout: float,
+            period: float,
+            wait_attr: str = None,
+            allow_null: bool = False
+    ) -> WebElement:
+        """轮询等待, 每隔 `period` 调用一次 `fn`"""
+        end_time = time.monotonic() + timeout
         err_msg = None
 
         while True:
@@ -149,6 +413,57 @@ class BaseWindow:
             f"{common.I18n['_error_msg']['_element_not_found']}: {err_msg}"
         )
 
+    def _observer_available(
+            self,
+            by: Literal,
+            timeout: float
+    ) -> bool:
+        """判断当前查找能否使用事件驱动等待"""
+        if self._wait_engine != 'observer':
+            return False
+        if by not in _OBSERVABLE_BY:
+            return False
+        # 异步脚本受会话 script timeout 限制, 超出时交给轮询处理
+        return timeout < self._script_timeout
+
+    def _observe_until(
+            self,
+            selector: str,
+            by: Literal,
+            element: WebElement,
+            timeout: float,
+            wait_attr: str = None,
+            allow_null: bool = False,
+            multiple: bool = False
+    ) -> WebElement:
+        """
+            在页面中注入 MutationObserver, 选择器匹配且满足 `wait_attr` 条件时立即返回
+
+            返回值:
+                - WebElement | List[WebElement]: 查找到的元素(集合)
+        """
+        if by == By.TAG_NAME:
+            by = By.CSS_SELECTOR
+
+        # 等待脚本会占用会话直到返回, 期间暂停设备列表后台读取, 见 page.device_monitor
+        monitor = self._devices.monitor
+        with monitor.paused() if monitor else nullcontext():
+            ret = self._driver.execute_async_script(
+                _OBSERVE_SCRIPT,
+                selector,
+                'xpath' if by == By.XPATH else 'css',
+                element,
+                wait_attr,
+                allow_null,
+                multiple,
+                int(timeout * 1000)
+            )
+        if not ret:
+            raise TimeoutException(
+                f"{common.I18n['_error_msg']['_element_not_found']}: {common.I18n['_error_msg']['_element_timeout']}"
+            )
+        return ret
+
     # 使用 wd.find_element (注意少了一个s) 方法， 就只会返回 第一个 元素。
     def find_element_by_selector(
             self,
@@ -182,7 +497,9 @@ class BaseWindow:
             timeout=timeout,
             period=period,
             wait_attr=wait_attr,
-            allow_null=allow_null
+            allow_null=allow_null,
+            selector=selector,
+            by=by
         )
         if pause > 0:
             time.sleep(pause)
@@ -213,7 +530,10 @@ class BaseWindow:
             fn=lambda x: x.find_elements(by, selector),  # x: 这个参数是 find_elements 方法的调用者，它是一个 WebElement 对象，表示要在哪个元素上执行查找。
             element=element,
             timeout=timeout,
-            period=period
+            period=period,
+            selector=selector,
+            by=by,
+            multiple=True
         )
 
     def click_on_element(
@@ -224,7 +544,8 @@ class BaseWindow:
             element: WebElement = None,
             timeout: int = _timeout,
             period: float = 0.25,
-            idtext: str = None
+            idtext: str = None,
+            until: Until = None
     ) -> None:
         """
             在指定元素上执行鼠标左键单击操作
@@ -232,11 +553,12 @@ class BaseWindow:
             参数:
                 - selector: 选择器路径
                 - by: 选择器类型, 可选 By.XPATH | By.CSS_SELECTOR, 默认 By.XPATH
-                - pause: 执行完操作后的暂停时间, 单位为s
+                - pause: 执行完操作后的暂停时间, 单位为s, 仅在未指定 until 时生效
                 - element: 相对路径的根元素, 默认 None
                 - timeout: 超时时间, 默认5s
                 - period: 重试间隙, 默认为0.25s
                 - idtext: 验证文本, 与待点击的元素的文本一致则点击外部元素, 退出点击
+                - until: 后置条件, 见 `Until`, 条件满足后立即返回, 超时抛出 TimeoutException
         """
         ele_to_click = self.find_element_by_selector(
             selector=selector,
@@ -260,9 +582,78 @@ class BaseWindow:
             method=EC.element_to_be_clickable(ele_to_click),
             message=f"{selector} {common.I18n['_error_msg']['_element_not_interactable']}"
         )
+        state = self._prepare_until(until) if until else None
         ele_to_click.click()
         # self._driver.execute_script('arguments[0].click();', ele_to_click)
-        time.sleep(pause)
+        if not until:
+            time.sleep(pause)
+            return None
+
+        start = time.monotonic()
+        self._wait_post_condition(
+            until=until,
+            state=state,
+            timeout=until.timeout or timeout,
+            period=period
+        )
+        pause_report.record(
+            key=sys._getframe(1).f_code.co_name,
+            legacy=pause,
+            waited=time.monotonic() - start
+        )
+
+    def _prepare_until(self, until: Until) -> Any:
+        """记录点击前的状态(窗口句柄/元素文本), 用于判断后置条件"""
+        match until.kind:
+            case 'new_window' | 'window_closed':
+                return set(self._driver.window_handles)
+            case 'text_change':
+                found = self._driver.find_elements(until.by, until.selector)
+                return found[0].text if found else None
+            case _:
+                return None
+
+    def _wait_post_condition(
+            self,
+            until: Until,
+            state: Any,
+            timeout: float,
+            period: float
+    ) -> None:
+        """等待点击的后置条件成立"""
+        match until.kind:
+            case 'appear':
+                self.find_element_by_selector(
+                    selector=until.selector,
+                    by=until.by,
+                    timeout=timeout,
+                    period=period
+                )
+                return
+            case 'disappear':
+                fn = lambda x: not x.find_elements(until.by, until.selector)
+            case 'new_window':
+                fn = lambda x: set(x.window_handles) - state
+            case 'window_closed':
+                fn = lambda x: state - set(x.window_handles)
+            case 'text_change':
+                def fn(x):
+                    found = x.find_elements(until.by, until.selector)
+                    return found and found[0].text != state
+            case 'text_contains':
+                def fn(x):
+                    found = x.find_elements(until.by, until.selector)
+                    return found and until.text in found[0].text
+            case _:
+                raise ValueError(
+                    f"{common.I18n['_error_msg']['_wrong_params']}: {until.kind}"
+                )
+        self._poll_until(
+            fn=fn,
+            element=None,
+            timeout=timeout,
+            period=period
+        )
 
     def input_text(
             self,
@@ -344,8 +735,10 @@ class BaseWindow:
                 - which: 待选择的菜单项, 从上到下, 默认为1, 选中第一项
                 - pause: 执行完操作等待时间, 默认为0.5s
         """
-        pg.typewrite(['down' for _ in range(which)])
-        pg.typewrite(
+        # 右键菜单为客户端原生菜单, 不在页面 DOM 中, 始终通过物理键盘操作
+        native = native_input()
+        native.press(['down' for _ in range(which)], 0.05)
+        native.press(
             ['enter' if common.ENV['platform'] == 'Win32' else 'return']
         )
         time.sleep(pause)
@@ -359,21 +752,18 @@ class BaseWindow:
             点击图片
 
             参数:
-                - img_name: 图片名称(不带后缀, 仅支持png图片), 图片需存放在 `test/assets/images` 下
+                - img_name: 图片名称(不带后缀, 仅支持png图片), 图片需存放在 `_image_dir`(默认 `test/assets/images`) 下
                 - pause: 执行完操作的等待时间
         """
-        target = pg.locateOnScreen(os.path.join(
-            common.ProjectRoot,
-            'test',
-            'assets',
-            'images',
-            f"{img_name}.png"
-        ))
-        if not target:
+        path = os.path.join(self._image_dir, f"{img_name}.png")
+        found = self._input.click_image(path)
+        if not found and isinstance(self._input, CdpInput):
+            # 页面截图中找不到时(如原生右键菜单), 回退到屏幕查找
+            found = native_input().click_image(path)
+        if not found:
             raise ValueError(
                 common.I18n['_error_msg']['_get_click_loc_fail']
             )
-        pg.click(pg.center(target))
 
         if pause:
             time.sleep(pause)
@@ -443,8 +833,10 @@ class BaseWindow:
                 - (bool, str): 成功返回 `True`, 错误信息为空, 否则返回 `False`, 错误信息
         """
         try:
-            pg.typewrite(path)
-            pg.typewrite(
+            # 系统文件选择框不在页面中, 始终通过物理键盘操作, 每步之后的 pyautogui PAUSE 用于等待文件选择框响应
+            native = native_input()
+            native.typewrite(path)
+            native.press(
                 ['enter' if common.ENV['platform'] ==
                             'Win32' else 'return' for _ in range(2)
                  ],
@@ -464,7 +856,11 @@ class BaseWindow:
             up_arrow: str,
             down_arrow: str,
             day_sel: str,
-            by: Literal = By.XPATH
+            by: Literal = By.XPATH,
+            header_sel: str = None,
+            header_fmt: str = '%Y-%m',
+            timeout: float = None,
+            pause: float = 2
     ) -> WebElement:
         """
             日期选择器
@@ -475,42 +871,69 @@ class BaseWindow:
                 - down_arrow: 向下箭头选择器, 用于月份选取
                 - day_sel: 日期选择器, 执行结果应是一个 `List[WebElement]`
                 - by: 选择器类型, 同 `By`
+                - header_sel: 月份标题选择器, 翻页后等待其文本包含目标月份, 默认为窗口的 `_date_header_sel`;
+                  页面中找不到该标题时按 pause 暂停
+                - header_fmt: 月份标题中目标月份的格式, 同 `strftime`, 默认 `%Y-%m`
+                - timeout: 等待月份标题的超时时间, 默认与 pause 相同; 超时(如标题格式与 header_fmt 不符)后继续选择日期, 不抛出错误
+                - pause: 没有月份标题时翻页后的暂停时间, 默认2s
+
+            返回值:
+                - WebElement: 选中的日期元素, 未找到时返回 None
         """
         if not util.is_valid_datetime(
                 dt=dt,
                 ref_fmt='%Y-%m-%d'
         ):
             raise ValueError(
-                f"{common.I18n['_errror_msg']['_invalid_time']}: {dt}"
+                f"{common.I18n['_error_msg']['_invalid_time']}: {dt}"
             )
 
         y, m, d = map(lambda x: int(x), dt.split('-'))
         ty, tm = date.today().year, date.today().month
         diff = (ty - y) * 12 + (tm - m)
 
-        if diff > 0:
-            for _ in range(diff):
-                self.click_on_element(
-                    selector=up_arrow,
-                    by=by
-                )
-        if diff < 0:
+        if diff:
+            arrow = self.find_element_by_selector(
+                selector=up_arrow if diff > 0 else down_arrow,
+                by=by
+            )
+            # 所有翻页点击合并为一次动作序列, 点击之间不暂停
+            ac = ActionChains(self._driver, duration=0).move_to_element(arrow)
             for _ in range(abs(diff)):
-                self.click_on_element(
-                    selector=down_arrow,
-                    by=by
-                )
-
-        list = self.find_elements_by_selector(
-            selector=day_sel,
-            by=by
-        )
-        for e in list:
-            if e.text == str(d):
-                e.click()
-                return e
-
-        return None
+                ac.click()
+            ac.perform()
+
+            header_sel = header_sel or self._date_header_sel
+            if header_sel and self._driver.find_elements(by, header_sel):
+                try:
+                    self._wait_post_condition(
+                        until=Until.text_contains(
+                            selector=header_sel,
+                            text=date(y, m, 1).strftime(header_fmt),
+                            by=by
+                        ),
+                        state=None,
+                        timeout=timeout or pause,
+                        period=0.1
+                    )
+                except TimeoutException:
+                    # 标题格式与 header_fmt 不符时最多等待与原固定暂停相同的时间
+                    pass
+            else:
+                time.sleep(pause)
+
+        # 一次脚本找出日期文本为 d 的元素, 无法在页面中查询的选择器先查找再传入
+        css = _as_css(day_sel, by)
+        if by == By.XPATH:
+            args = (day_sel, 'xpath', str(d), None)
+        elif css:
+            args = (css, 'css', str(d), None)
+        else:
+            args = (None, None, str(d), self._driver.find_elements(by, day_sel))
+        e = self._driver.execute_script(_DAY_PICK_SCRIPT, *args)
+        if e:
+            e.click()
+        return e
 
     def get_current_window(self) -> common.EWindow:
         """
@@ -541,6 +964,7 @@ class BaseWindow:
                 - name: 窗口名称, 见`Common.EWindow`
         """
         self._driver.switch_to.window(self._driver.window_handles[name.value])
+        self._window_rects.clear()
 
     # def switch_to_self_window(self) -> None:
     #     '''
@@ -551,12 +975,13 @@ class BaseWindow:
     def close(self) -> None:
         self._driver.quit()
 
-    def get_window_rect(self) -> Dict[str, float]:
+    def get_window_rect(self, cached: bool = True) -> Dict[str, float]:
         """
             获取窗口尺寸
 
             参数:
-                - element: 元素
+                - cached: 是否使用缓存, 缓存在切换窗口与每次读取元素屏幕坐标时刷新, 超过 `_WINDOW_RECT_TTL` 秒后重新读取,
+                  窗口移动或缩放后需要立即得到新值时传入 `False`
 
             返回值:
                 - x: 窗口左上角坐标横坐标
@@ -564,13 +989,43 @@ class BaseWindow:
                 - width: 屏幕宽度
                 - height: 屏幕高度
         """
+        handle = self._driver.current_window_handle
+        entry = self._window_rects.get(handle)
+        if not cached or entry is None or time.monotonic() - entry[0] > _WINDOW_RECT_TTL:
+            entry = (time.monotonic(), self._driver.execute_script(_GEOMETRY_SCRIPT, [])['window'])
+            self._window_rects[handle] = entry
+        return entry[1]
+
+    def get_element_rects(
+            self,
+            elements: List[WebElement],
+            ref: Literal['screen', 'window'] = 'window'
+    ) -> List[Dict[str, float]]:
+        """
+            一次获取多个元素的位置尺寸参数, 窗口位置与元素位置在同一次脚本中读取
 
-        return {
-            'x': self._driver.execute_script('return window.screenLeft'),
-            'y': self._driver.execute_script('return window.screenTop'),
-            'width': self._driver.execute_script('return window.screen.width'),
-            'height': self._driver.execute_script('return window.screen.height')
-        }
+            参数:
+                - elements: 元素列表
+                - ref: 坐标参照, 同 `get_element_rect`
+
+            返回值:
+                - List[Dict[str, float]]: 与 elements 一一对应, 同 `get_element_rect`
+        """
+        geometry = self._driver.execute_script(_GEOMETRY_SCRIPT, elements)
+        self._window_rects[self._driver.current_window_handle] = (time.monotonic(), geometry['window'])
+        if ref == 'window':
+            return geometry['rects']
+
+        wrect = geometry['window']
+        return [
+            {
+                'x': wrect['x'] + erect['x'],
+                'y': wrect['y'] + erect['y'],
+                'width': erect['width'],
+                'height': erect['height']
+            }
+            for erect in geometry['rects']
+        ]
 
     def get_element_rect(
             self,
@@ -582,6 +1037,7 @@ class BaseWindow:
 
             参数:
                 - element: 元素
+                - ref: 坐标参照, window 为相对页面, screen 为相对屏幕
 
             返回值:
                 - x: 元素左上角坐标横坐标
@@ -589,39 +1045,22 @@ class BaseWindow:
                 - width: 元素宽度
                 - height: 元素高度
         """
-
-        erect = ele.rect
         if ref == 'window':
-            # logger.debug('元素参数(窗口): {}'.format(erect))
-            return erect
-
-        wrect = self.get_window_rect()
-
-        erect = {
-            'x': wrect['x'] + erect['x'],
-            'y': wrect['y'] + erect['y'],
-            'width': erect['width'],
-            'height': erect['height']
-        }
-        # logger.debug('元素参数(屏幕): {}'.format(erect))
-        return erect
+            return ele.rect
+        return self.get_element_rects([ele], ref)[0]
 
     def mouse_move_to_element(
             self,
             element: WebElement
     ) -> WebElement:
         """
-            物理鼠标移动到指定元素中心点
+            鼠标移动到指定元素中心点附近, 使用 `input_backend` 指定的输入后端
 
             参数:
                 - element: 页面元素
 
         """
-        rect = self.get_element_rect(element, 'screen')
-        pg.moveTo(
-            x=rect['x'] + rect['width'] * uniform(0.3, 0.7),
-            y=rect['y'] + rect['height'] * uniform(0.3, 0.7)
-        )
+        self._input.move_to_element(self, element)
         return element
 
     def dropdownbox_handler(
@@ -664,8 +1103,9 @@ class BaseWindow:
             orientation: Literal['up', 'down', 'left', 'right'],
             maximum: float = None,
             minimum: float = None,
-            pause: float = 0.5
-    ) -> None:
+            pause: float = 0.5,
+            mode: Literal['direct', 'keys'] = 'direct'
+    ) -> float:
         """
             滚动调节条(音量, 亮度, 对比度等)
 
@@ -675,35 +1115,43 @@ class BaseWindow:
                 - orientation: 滚动方向(值变大), 取值范围 up|down|left|right
                 - maximum: 最大值, 不传设为元素max属性的值, 若元素没有max属性, 则抛出错误
                 - minimum: 最小值, 不传设为元素min属性的值, 若元素没有min属性, 则抛出错误
-                - pause: 执行完暂停时间, 默认0.5s
-        """
-        time.sleep(0.5)
-        maximum = maximum or element.get_attribute('max')
-        minimum = minimum or element.get_attribute('min')
-        if not maximum:
-            raise ValueError(f"{common.I18n['_error_msg']['_no_maximum']}")
-        if not minimum:
-            raise ValueError(f"{common.I18n['_error_msg']['_no_minimum']}")
-
-        if float(value) < float(minimum):
-            value = float(minimum)
-        if float(value) > float(maximum):
-            value = float(maximum)
+                - pause: 按键方式执行完暂停时间, 默认0.5s
+                - mode: 调节方式
+                    - direct: 通过原生 setter 直接设值并派发 input/change 事件, 组件未接受时回退到按键方式
+                    - keys: 按键方式, 所有按键合并为一次发送
 
-        # print('最大值：', maximum, '最小值：', minimum, '目标值：', value)
+            返回值:
+                - float: 调节后重新读取的数值
+        """
         if orientation not in ['left', 'right', 'up', 'down']:
             raise ValueError(
                 f"{common.I18n['_error_msg']['_wrong_params']}: {orientation}, Valid value: up|down|left|right"
             )
 
-        orgin_step = self._driver.execute_script(
-            "return arguments[0].step",
-            element
-        )
-        self._driver.execute_script(
-            "arguments[0].step={}".format(maximum),
+        if mode == 'keys':
+            time.sleep(0.5)
+        attrs = self._driver.execute_script(
+            "var el = arguments[0];"
+            "return {min: el.getAttribute('min'), max: el.getAttribute('max'), step: el.step};",
             element
         )
+        maximum = maximum or attrs['max']
+        minimum = minimum or attrs['min']
+        if not maximum:
+            raise ValueError(f"{common.I18n['_error_msg']['_no_maximum']}")
+        if not minimum:
+            raise ValueError(f"{common.I18n['_error_msg']['_no_minimum']}")
+
+        value = min(max(float(value), float(minimum)), float(maximum))
+        # step 为空或为 any 时按 1 处理
+        orgin_step = float(attrs['step']) if str(attrs['step']).replace('.', '', 1).isdigit() else 1.0
+        rg = int((value - float(minimum)) / orgin_step)
+        expected = float(minimum) + rg * orgin_step
+
+        if mode == 'direct':
+            current = self._driver.execute_async_script(_RANGE_SET_SCRIPT, element, expected)
+            if current is not None and abs(float(current) - expected) < 1e-9:
+                return float(current)
 
         match orientation:
             case 'left':
@@ -722,19 +1170,24 @@ class BaseWindow:
                 zero = Keys.LEFT
                 target = Keys.RIGHT
 
+        # 临时把 step 设为最大值, 一次按键置零
+        self._driver.execute_script(
+            "arguments[0].step = arguments[1]",
+            element,
+            maximum
+        )
         element.send_keys(zero)
-        # print('置零：', element.get_attribute('value'))
-
         self._driver.execute_script(
-            "arguments[0].step={}".format(orgin_step),
-            element
+            "arguments[0].step = arguments[1]",
+            element,
+            attrs['step']
         )
 
-        rg = int((value - float(minimum)) / float(orgin_step))
-        # print('要走的步数：', rg)
-        for _ in range(rg):
-            element.send_keys(target)
+        # 所有按键合并为一次发送
+        if rg:
+            element.send_keys(target * rg)
         time.sleep(pause)
+        return float(self._driver.execute_script("return arguments[0].value", element))
 
     def mouse_press(
             self,
@@ -761,35 +1214,116 @@ class BaseWindow:
             self,
             element: WebElement,
             xunit: int = 24,
-            yunit: int = 7
+            yunit: int = 7,
+            active_color: str = None
     ) -> List[Any]:
         """
-            获取 Canvas 的数据
+            获取 Canvas 的数据, 整个方格一次读取
 
             参数:
                 - element: Canvas元素
                 - xunit: 横向方块个数
                 - yunit: 纵向方块个数
+                - active_color: 激活方块的颜色, 如 `rgb(0, 174, 255)`
+
+            返回值:
+                - List[List[str]]: 未指定 active_color 时, 每个方块中心的颜色 `rgb(r, g, b)`
+                - List[int]: 指定 active_color 时, 每行一个位掩码, 第 j 位为 1 表示第 j 列方块为激活颜色
         """
-        # width = self._driver.execute_script("return arguments[0].getBoundingClientRect().width;", element) # 执行JavaScript代码，获取元素的宽度
-        # height = self._driver.execute_script("return arguments[0].getBoundingClientRect().height;", element) # 执行JavaScript代码，获取元素的高度
+        return self._driver.execute_script(
+            _CUBE_READ_SCRIPT,
+            element,
+            xunit,
+            yunit,
+            active_color
+        )
+
+    @staticmethod
+    def _cube_strokes(
+            current: List[int],
+            target: List[int],
+            xunit: int
+    ) -> List[tuple]:
+        """
+            计算从 current 到 target 需要拖动的矩形
+
+            每行取需要改变的连续方块, 上下相邻且列范围相同的合并为一个矩形;
+            矩形内的方块当前状态相同, 从任一角开始拖动都会将整个矩形设为目标状态
+
+            返回值:
+                - List[(top, left, bottom, right)]: 方块行列号, 闭区间
+        """
+        runs: Dict[tuple, tuple] = {}  # (left, right, 目标状态) -> 正在合并的矩形
+        strokes = []
+        for i in range(len(target)):
+            changed = current[i] ^ target[i]
+            row_runs = set()
+            j = 0
+            while j < xunit:
+                if not changed >> j & 1:
+                    j += 1
+                    continue
+                state = target[i] >> j & 1
+                left = j
+                while j < xunit and changed >> j & 1 and (target[i] >> j & 1) == state:
+                    j += 1
+                row_runs.add((left, j - 1, state))
+
+            for key in list(runs):
+                if key not in row_runs:
+                    strokes.append(runs.pop(key))
+            for key in row_runs:
+                top = runs[key][0] if key in runs else i
+                runs[key] = (top, key[0], i, key[1])
+        strokes.extend(runs.values())
+        return sorted(strokes)
+
+    def paint_cube_canvas(
+            self,
+            element: WebElement,
+            matrix: List[Any],
+            active_color: str,
+            xunit: int = 24
+    ) -> bool:
+        """
+            设置 Canvas 方格, 只拖动需要改变的区域, 所有拖动合并为一次动作序列
+
+            参数:
+                - element: Canvas元素
+                - matrix: 目标方格, 每行为 bool/0/1 的列表, 或同 `parse_cube_canvas` 的位掩码
+                - active_color: 激活方块的颜色, 同 `parse_cube_canvas`
+                - xunit: 横向方块个数, 仅 matrix 为位掩码时使用
+
+            返回值:
+                - bool: 设置后重新读取的方格与目标一致时返回 True
+        """
+        if matrix and isinstance(matrix[0], (list, tuple)):
+            xunit = len(matrix[0])
+            target = [sum(1 << j for j, v in enumerate(row) if v) for row in matrix]
+        else:
+            target = [int(v) for v in matrix]
+        yunit = len(target)
+
+        current = self.parse_cube_canvas(element, xunit, yunit, active_color)
+        strokes = self._cube_strokes(current, target, xunit)
+        if not strokes:
+            return True
 
-        self._driver.execute_script("arguments[0].scrollIntoView();", element)
         rect = self.get_element_rect(element)
         uwdh = float(rect['width']) / xunit
         uhgh = float(rect['height']) / yunit
 
-        # action = ActionChains(self._driver)
-        colors: List[List[Any]] = []  # 用于存储颜色值的列表
-
-        for i in range(yunit):  # 纵向循环
-            colors.append([])
-            for j in range(xunit):  # 横向循环
-                x = rect['x'] + uwdh / 2 + j * uwdh  # 计算方块中心的x坐标
-                y = rect['y'] + uhgh / 2 + i * uhgh  # 计算方块中心的y坐标
-                # action.move_to_element_with_offset(element, x, y).click().perform() # 移动并点击方块中心
-                color = self._driver.execute_script(
-                    "return window.getComputedStyle(document.elementFromPoint(arguments[0], arguments[1])).backgroundColor;",
-                    x, y)  # 执行JavaScript代码，获取方块背景颜色
-                colors[i].append(color)  # 将颜色值添加到列表中
-        return colors
+        def offset(i: int, j: int) -> tuple:
+            # move_to_element_with_offset 以元素中心为原点
+            return (
+                int((j + 0.5) * uwdh - rect['width'] / 2),
+                int((i + 0.5) * uhgh - rect['height'] / 2)
+            )
+
+        ac = ActionChains(self._driver, duration=0)
+        for top, left, bottom, right in strokes:
+            ac.move_to_element_with_offset(element, *offset(top, left)).click_and_hold()
+            ac.move_to_element_with_offset(element, *offset(bottom, right)).release()
+        ac.perform()
+
+        return self.parse_cube_canvas(element, xunit, yunit, active_color) == target
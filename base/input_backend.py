@@ -0,0 +1,237 @@
+"""
+    输入后端, 提供键盘与鼠标操作能力
+
+    - cdp: 通过 Chrome DevTools `Input.dispatchMouseEvent` / `Input.dispatchKeyEvent` 在当前会话中派发鼠标键盘事件,
+      不依赖物理鼠标键盘与屏幕, 没有 pyautogui 的停顿, 多个客户端可在同一台主机上并行执行
+    - pyautogui: 操作物理鼠标键盘, 用于系统文件选择框、原生右键菜单等页面之外的界面, 同时作为 cdp 的回退;
+      停顿在每次调用后单独执行, 不修改 pyautogui 的全局 PAUSE
+"""
+import time
+from random import uniform
+from typing import Dict, List, Tuple
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+from utils.common import common
+
+
+# pyautogui 键名 -> (key, code, windowsVirtualKeyCode, text)
+_CDP_KEYS: Dict[str, Tuple[str, str, int, str]] = {
+    'enter': ('Enter', 'Enter', 13, '\r'),
+    'return': ('Enter', 'Enter', 13, '\r'),
+    'tab': ('Tab', 'Tab', 9, ''),
+    'esc': ('Escape', 'Escape', 27, ''),
+    'escape': ('Escape', 'Escape', 27, ''),
+    'backspace': ('Backspace', 'Backspace', 8, ''),
+    'delete': ('Delete', 'Delete', 46, ''),
+    'space': (' ', 'Space', 32, ' '),
+    'up': ('ArrowUp', 'ArrowUp', 38, ''),
+    'down': ('ArrowDown', 'ArrowDown', 40, ''),
+    'left': ('ArrowLeft', 'ArrowLeft', 37, ''),
+    'right': ('ArrowRight', 'ArrowRight', 39, ''),
+    'home': ('Home', 'Home', 36, ''),
+    'end': ('End', 'End', 35, ''),
+    'pageup': ('PageUp', 'PageUp', 33, ''),
+    'pagedown': ('PageDown', 'PageDown', 34, '')
+}
+
+# 元素内按比例偏移的点(视口坐标)
+_VIEWPORT_POINT_SCRIPT = """
+var r = arguments[0].getBoundingClientRect();
+return {
+    x: r.left + r.width * arguments[1],
+    y: r.top + r.height * arguments[2]
+};
+"""
+
+
+class PyAutoGuiInput:
+    """
+        通过 pyautogui 操作物理鼠标键盘
+
+        每次调用后停顿 `pause` 秒(可按调用指定), 等待原生界面响应; 调用时传入 `_pause=False`,
+        不使用也不修改 pyautogui 的全局 PAUSE, 同一进程中其他使用 pyautogui 的代码不受影响
+    """
+
+    def __init__(
+        self,
+        pause: float = 0.1,
+        failsafe: bool = True
+    ) -> None:
+        # 延迟导入, 无图形界面的环境下使用 cdp 后端时不需要 pyautogui
+        import pyautogui as pg
+        self._pg = pg
+        self._pause = pause
+        pg.FAILSAFE = failsafe
+
+    def _sleep(self, pause: float = None) -> None:
+        pause = self._pause if pause is None else pause
+        if pause:
+            time.sleep(pause)
+
+    def press(
+        self,
+        keys: List[str],
+        interval: float = 0,
+        pause: float = None
+    ) -> None:
+        """依次按下并释放按键, 键名同 pyautogui, 完成后停顿 `pause` 秒, 默认为创建时的停顿时间"""
+        self._pg.typewrite(keys, interval, _pause=False)
+        self._sleep(pause)
+
+    def typewrite(
+        self,
+        text: str,
+        interval: float = 0,
+        pause: float = None
+    ) -> None:
+        """输入文本, 完成后停顿 `pause` 秒, 默认为创建时的停顿时间"""
+        self._pg.typewrite(text, interval, _pause=False)
+        self._sleep(pause)
+
+    def move_to_element(
+        self,
+        window,
+        element: WebElement
+    ) -> None:
+        """物理鼠标移动到元素中心附近"""
+        rect = window.get_element_rect(element, 'screen')
+        self._pg.moveTo(
+            x=rect['x'] + rect['width'] * uniform(0.3, 0.7),
+            y=rect['y'] + rect['height'] * uniform(0.3, 0.7),
+            _pause=False
+        )
+        self._sleep()
+
+    def click_image(self, path: str) -> bool:
+        """在屏幕上查找图片并点击其中心, 未找到返回 False"""
+        target = self._pg.locateOnScreen(path)
+        if not target:
+            return False
+        self._pg.click(self._pg.center(target), _pause=False)
+        self._sleep()
+        return True
+
+
+class CdpInput:
+    """通过 Chrome DevTools 协议在当前会话中派发输入事件"""
+
+    def __init__(self, driver: WebDriver) -> None:
+        self._driver = driver
+
+    def _cdp(self, cmd: str, params: dict) -> dict:
+        return self._driver.execute_cdp_cmd(cmd, params)
+
+    def _key(self, key: str, code: str, vk: int, text: str) -> None:
+        params = {'key': key, 'code': code, 'windowsVirtualKeyCode': vk, 'nativeVirtualKeyCode': vk}
+        # 带 text 的 keyDown 同时产生输入, 不带 text 的 rawKeyDown 只触发按键事件
+        if text:
+            self._cdp('Input.dispatchKeyEvent', {'type': 'keyDown', 'text': text, 'unmodifiedText': text, **params})
+        else:
+            self._cdp('Input.dispatchKeyEvent', {'type': 'rawKeyDown', **params})
+        self._cdp('Input.dispatchKeyEvent', {'type': 'keyUp', **params})
+
+    def press(
+        self,
+        keys: List[str],
+        interval: float = 0,
+        pause: float = None
+    ) -> None:
+        """依次按下并释放按键, 键名同 pyautogui, 无法识别的键按字符输入; `pause` 仅为与 pyautogui 后端接口一致"""
+        for i, k in enumerate(keys):
+            if i and interval:
+                time.sleep(interval)
+            if k.lower() in _CDP_KEYS:
+                self._key(*_CDP_KEYS[k.lower()])
+            else:
+                self.typewrite(k)
+
+    def typewrite(
+        self,
+        text: str,
+        interval: float = 0,
+        pause: float = None
+    ) -> None:
+        """向当前焦点元素逐个字符派发按键事件输入文本; `pause` 仅为与 pyautogui 后端接口一致"""
+        for i, ch in enumerate(text):
+            if i and interval:
+                time.sleep(interval)
+            if ch == '\n':
+                self._key(*_CDP_KEYS['enter'])
+            elif ch == '\t':
+                self._key(*_CDP_KEYS['tab'])
+            else:
+                self._key(ch, '', ord(ch.upper()) if ch.isascii() and ch.isalnum() else 0, ch)
+
+    def move_to_element(
+        self,
+        window,
+        element: WebElement
+    ) -> None:
+        """鼠标移动到元素中心附近(视口坐标), 触发页面 hover"""
+        point = self._driver.execute_script(
+            _VIEWPORT_POINT_SCRIPT,
+            element,
+            uniform(0.3, 0.7),
+            uniform(0.3, 0.7)
+        )
+        self._cdp('Input.dispatchMouseEvent', {
+            'type': 'mouseMoved',
+            'x': point['x'],
+            'y': point['y']
+        })
+
+    def click_at(self, x: float, y: float) -> None:
+        """在视口坐标处单击鼠标左键"""
+        for t in ('mouseMoved', 'mousePressed', 'mouseReleased'):
+            self._cdp('Input.dispatchMouseEvent', {
+                'type': t,
+                'x': x,
+                'y': y,
+                'button': 'left' if t != 'mouseMoved' else 'none',
+                'clickCount': 1 if t != 'mouseMoved' else 0
+            })
+
+    def click_image(self, path: str) -> bool:
+        """在页面截图中查找图片并点击其中心, 未找到返回 False"""
+        from io import BytesIO
+        from PIL import Image
+        import pyscreeze
+
+        screenshot = Image.open(BytesIO(self._driver.get_screenshot_as_png()))
+        target = pyscreeze.locate(path, screenshot)
+        if not target:
+            return False
+        ratio = self._driver.execute_script('return window.devicePixelRatio') or 1
+        x, y = pyscreeze.center(target)
+        self.click_at(x / ratio, y / ratio)
+        return True
+
+
+_native = None
+
+
+def native_input() -> PyAutoGuiInput:
+    """
+        获取操作物理鼠标键盘的后端, 用于系统文件选择框、原生右键菜单等页面之外的界面, 首次使用时创建
+
+        无论 `input_backend` 选择哪个后端, 每次操作后都按 `pyautogui.PAUSE` 停顿, 系统文件选择框等原生界面依赖该停顿等待响应
+    """
+    global _native
+    if _native is None:
+        _native = PyAutoGuiInput(
+            pause=common.ENV.get('pyautogui.PAUSE') or 0.1,
+            failsafe=bool(common.ENV.get('pyautogui.FAILSAFE', True))
+        )
+    return _native
+
+
+def create_input_backend(driver: WebDriver):
+    """
+        根据 `global.yml` 的 `input_backend` 创建页面内输入使用的后端
+
+        返回值:
+            - CdpInput | PyAutoGuiInput
+    """
+    if common.ENV.get('input_backend', 'pyautogui') == 'cdp':
+        return CdpInput(driver)
+    return native_input()
@@ -1,11 +1,16 @@
+import time
 from typing import List
 from base.base import BaseWF
 from utils.common import common
+from utils.credential_memory import credentials
 
 
 class MainWF(BaseWF):
     """主工作流"""
 
+    # 最近一次登录工作流的尝试记录, 见 `attempt_login_by_device_uid`
+    login_attempts: List[dict] = []
+
     def attempt_login_by_device_uid(
             self,
             uid: str,
@@ -24,12 +29,15 @@ class MainWF(BaseWF):
                 - passwds: 尝试登录的密码列表
                 - rm_device: 可选, 执行工作流前是否先自动删除待测试设备, 默认为`True`
 
-            注: 会循环提供的 `unames` 和 `passwds`, 直到登录成功
+            注: 会循环提供的 `unames` 和 `passwds`, 直到登录成功;
+                尝试顺序由 `utils.credential_memory` 按该 uid 的历史结果调整, 上次成功的组合最先尝试,
+                被设备拒绝过的组合最后尝试或跳过, 每次尝试记录在 `login_attempts`:
+                {uname, passwd, result: pass|fail|error|skipped, message, cost}
 
             返回值:
                 - tuple: 正确执行操作返回`True`, 错误信息为空; 否则, 返回`False`与错误信息
         """
-        _logs = ''
+        attempts = self.login_attempts = []
         try:
             # 尝试唤醒设备
             # self.awake_device_by_need(name)
@@ -66,21 +74,31 @@ class MainWF(BaseWF):
                     f"{common.I18n['_error_msg']['_handle_wifi_fail']}: {err}"
                 )
 
-            for u in unames:
-                for p in passwds:
-                    sus, err = add_device_window.login_device(
-                        uname=u,
-                        password=p
-                    )
-                    if not sus:
-                        _logs += f"{common.I18n['_error_msg']['_login_fail']} uname-{u} | password-{p}: {err} ---> fail\n"
-                    else:
-                        _logs += f"{common.I18n['_verify_success']} uname-{u} | password-{p} ---> pass\n"
+            pairs, skipped = credentials.order(uid, unames, passwds)
+            for u, p in skipped:
+                attempts.append({'uname': u, 'passwd': p, 'result': 'skipped', 'message': '', 'cost': 0})
 
-                        return True, ''
+            for u, p in pairs:
+                start = time.perf_counter()
+                sus, err = add_device_window.login_device(
+                    uname=u,
+                    password=p
+                )
+                cost = time.perf_counter() - start
+                if sus:
+                    result = 'pass'
+                elif common.I18n['_e_device_status']['WRONG_PASS'] in err:
+                    # 仅设备明确拒绝的组合计为失败, 连接失败等错误不影响下次的尝试顺序
+                    result = 'fail'
+                else:
+                    result = 'error'
+                credentials.record(uid, u, p, result, cost)
+                attempts.append({'uname': u, 'passwd': p, 'result': result, 'message': err, 'cost': round(cost, 3)})
+                if sus:
+                    return True, ''
 
             # 记录日志
-            # self._logger.info(str(_logs))
+            # self._logger.info(str(attempts))
 
             return False, common.I18n['_error_msg']['_login_fail']
 
@@ -0,0 +1,158 @@
+"""
+    BaseWindow 操作基准: pytest case/bench_base_window.py -s
+
+    在 utils/mock_driver 的模拟 WebDriver 上执行各操作, 每条命令注入固定延迟, 元素按设定的延迟出现,
+    统计每个操作的总耗时、WebDriver 命令数与 time.sleep 暂停时间, 与 case/bench_base_window.baseline.json 比较:
+
+    - 命令数多于基线
+    - 暂停时间超过基线 0.05s 以上
+    - 总耗时超过基线的 (1 + bench_tolerance) 倍再加 0.05s
+
+    均视为回归, 基线中没有的操作同样失败. 有意修改或新增操作后, 设置环境变量 BENCH_UPDATE_BASELINE=1 重新执行以更新基线,
+    本次结果同时写入 outcome/bench/base_window.json
+"""
+import json
+import os
+import pytest
+from selenium.webdriver.common.by import By
+from base.base_window import BaseWindow, Until
+from utils.common import common
+from utils.instrument import recorder
+from utils.mock_driver import MockDriver
+from utils.read_config import config
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_base_window.baseline.json')
+LATENCY = 0.005  # 每条命令的延迟(秒)
+APPEAR = 0.4  # 延迟出现的元素在 0.4s 后出现, 与 0.25s 的轮询间隙错开
+ACTIVE = 'rgb(0, 174, 255)'
+
+_RESULTS = {}
+
+
+def _wait_until_2(driver: MockDriver, window: BaseWindow):
+    driver.add('//*[@id="delayed"]', text='ready', delay=APPEAR)
+    return lambda: window.wait_until_2(
+        fn=lambda x: x.find_element(By.XPATH, '//*[@id="delayed"]'),
+        element=None,
+        timeout=5,
+        period=0.25,
+        selector='//*[@id="delayed"]',
+        by=By.XPATH
+    )
+
+
+def _wait_until_2_poll(driver: MockDriver, window: BaseWindow):
+    window._wait_engine = 'poll'
+    return _wait_until_2(driver, window)
+
+
+def _find_element_by_selector(driver: MockDriver, window: BaseWindow):
+    driver.add('#device-name', By.CSS_SELECTOR, text='Cam-000')
+    return lambda: window.find_element_by_selector('#device-name', By.CSS_SELECTOR, wait_attr='text')
+
+
+def _click_on_element(driver: MockDriver, window: BaseWindow):
+    def open_dialog(d: MockDriver):
+        d.add('#dialog', By.CSS_SELECTOR, text='确定', delay=APPEAR)
+
+    driver.add('#add-device', By.CSS_SELECTOR, text='添加设备', on_click=open_dialog)
+    return lambda: window.click_on_element(
+        '#add-device',
+        By.CSS_SELECTOR,
+        until=Until.appear('#dialog', By.CSS_SELECTOR)
+    )
+
+
+def _input_text(driver: MockDriver, window: BaseWindow):
+    driver.add('#uid-input', By.CSS_SELECTOR)
+    return lambda: window.input_text('#uid-input', '9527000000000000', By.CSS_SELECTOR)
+
+
+def _scroll(driver: MockDriver, window: BaseWindow):
+    driver.add('#device-ul', By.CSS_SELECTOR, attrs={'class': 'list'})
+    ele = driver.find_element(By.CSS_SELECTOR, '#device-ul')
+    return lambda: window.scroll(3, ele, interval=0.1)
+
+
+def _range(driver: MockDriver, controlled: bool):
+    driver.add('#volume', By.CSS_SELECTOR, value=0, controlled=controlled, attrs={'min': '0', 'max': '100', 'step': '1'})
+    return driver.find_element(By.CSS_SELECTOR, '#volume')
+
+
+def _scroll_bar(driver: MockDriver, window: BaseWindow):
+    ele = _range(driver, controlled=False)
+    return lambda: window.scroll_bar(ele, 42, 'right')
+
+
+def _scroll_bar_keys(driver: MockDriver, window: BaseWindow):
+    # 受控组件不接受直接设值, 回退到按键方式
+    ele = _range(driver, controlled=True)
+    return lambda: window.scroll_bar(ele, 42, 'right')
+
+
+def _parse_cube_canvas(driver: MockDriver, window: BaseWindow):
+    grid = [[ACTIVE if (i + j) % 3 else 'rgb(255, 255, 255)' for j in range(24)] for i in range(7)]
+    driver.add('//canvas', grid=grid)
+    ele = driver.find_element(By.XPATH, '//canvas')
+    return lambda: window.parse_cube_canvas(ele, active_color=ACTIVE)
+
+
+CASES = {
+    'wait_until_2': _wait_until_2,
+    'wait_until_2[poll]': _wait_until_2_poll,
+    'find_element_by_selector': _find_element_by_selector,
+    'click_on_element': _click_on_element,
+    'input_text': _input_text,
+    'scroll': _scroll,
+    'scroll_bar': _scroll_bar,
+    'scroll_bar[keys]': _scroll_bar_keys,
+    'parse_cube_canvas': _parse_cube_canvas
+}
+
+
+def _load_baseline() -> dict:
+    if not os.path.exists(BASELINE):
+        return {}
+    with open(BASELINE, encoding='utf-8') as stream:
+        return json.load(stream)
+
+
+@pytest.mark.parametrize('name', list(CASES))
+def test_primitive(name):
+    driver = MockDriver(latency=LATENCY)
+    window = BaseWindow(driver)
+    run = CASES[name](driver, window)
+
+    recorder.install(driver)
+    recorder.begin(name)
+    run()
+    summary = recorder.summary()
+    res = {k: summary[k] for k in ('wall', 'commands', 'sleep')}
+    _RESULTS[name] = res
+    print(f"{name}: {res['wall']:.3f}s, {res['commands']} commands, sleep {res['sleep']:.3f}s")
+
+    if os.environ.get('BENCH_UPDATE_BASELINE'):
+        return
+    base = _load_baseline().get(name)
+    assert base is not None, f"{name}: 基线中没有该操作, 设置 BENCH_UPDATE_BASELINE=1 重新执行以生成基线"
+    tolerance = float(config.get_data('bench_tolerance', 0.25))
+    assert res['commands'] <= base['commands'], f"{name}: 命令数 {res['commands']} 多于基线 {base['commands']}"
+    assert res['sleep'] <= base['sleep'] + 0.05, f"{name}: 暂停 {res['sleep']}s 超过基线 {base['sleep']}s"
+    limit = base['wall'] * (1 + tolerance) + 0.05
+    assert res['wall'] <= limit, f"{name}: 耗时 {res['wall']}s 超过基线 {base['wall']}s (上限 {limit:.3f}s)"
+
+
+def teardown_module(module):
+    recorder.uninstall()
+
+    directory = os.path.join(common.ProjectRoot, 'outcome', 'bench')
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'base_window.json'), 'w', encoding='utf-8') as stream:
+        json.dump(_RESULTS, stream, ensure_ascii=False, indent=2)
+
+    # 只有显式要求时才写基线, 避免一次普通执行把偏慢的结果固化为基线
+    if os.environ.get('BENCH_UPDATE_BASELINE'):
+        baseline = _load_baseline()
+        baseline.update(_RESULTS)
+        with open(BASELINE, 'w', encoding='utf-8') as stream:
+            json.dump(baseline, stream, ensure_ascii=False, indent=2)
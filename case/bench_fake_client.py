@@ -0,0 +1,101 @@
+"""
+    页面层基准(模拟客户端): pytest case/bench_fake_client.py -s
+
+    在 utils/fake_client 的模拟客户端上执行页面对象与工作流, 不依赖 Windows 客户端与真实设备,
+    分别以 1/10/100 台设备统计各操作耗时, 结果写入 outcome/bench/fake_client.json.
+    无法启动 Chromium 时跳过, 浏览器路径见 global.yml 的 fake_client_binary
+"""
+import json
+import os
+import time
+import pytest
+from selenium.webdriver.common.by import By
+from base.base_window import BaseWindow
+from base.main import MainWF
+from page.main_window import MainWindow
+from utils.common import common
+from utils.credential_memory import credentials
+from utils.device_profile import device_profiles
+from utils.fake_client import FakeClient
+
+_RESULTS = {}
+# 右键菜单中的删除图标, 页面与 click_on_image 使用同一张图片
+_IMAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'asset', 'fake_client')
+
+
+@pytest.fixture(scope='module', params=[1, 10, 100], ids=lambda n: f"{n}-devices")
+def client(request):
+    with FakeClient(devices=request.param, latency=0.02, seed=request.param) as fake:
+        try:
+            wd = fake.launch()
+        except BaseException as err:
+            pytest.skip(f"无法启动 Chromium: {err}")
+        fake.driver = wd
+        yield fake
+        wd.quit()
+
+
+@pytest.fixture(autouse=True)
+def profiles(client, monkeypatch, tmp_path):
+    """设备档案改为请求模拟客户端, 档案与登录凭据记录均不读写 outcome/cache, 图片从模拟客户端目录查找"""
+    monkeypatch.setattr(BaseWindow, '_image_dir', _IMAGE_DIR)
+    monkeypatch.setattr(device_profiles, '_endpoint', client.profile_endpoint)
+    monkeypatch.setattr(device_profiles, '_cache_file', str(tmp_path / 'device_profile.json'))
+    monkeypatch.setattr(device_profiles, '_profiles', None)
+    monkeypatch.setattr(credentials, '_cache_file', str(tmp_path / 'credentials.json'))
+    monkeypatch.setattr(credentials, '_records', None)
+
+
+def _timed(client, name: str, fn, *args, **kw):
+    start = time.perf_counter()
+    res = fn(*args, **kw)
+    cost = time.perf_counter() - start
+    _RESULTS.setdefault(f"{len(client.devices)}", {})[name] = round(cost, 4)
+    print(f"[{len(client.devices)} devices] {name}: {cost:.3f}s")
+    return res
+
+
+def test_get_device_list(client):
+    main_window = MainWindow(client.driver)
+    names = _timed(client, 'get_device_list', main_window.get_device_list)
+    assert names == [d['name'] for d in client.devices if d['listed']]
+
+
+def test_base_window_primitives(client):
+    window = BaseWindow(client.driver)
+    selector = MainWindow._data['_device_list_selector']
+    _timed(client, 'find_element_by_selector', window.find_element_by_selector, selector=selector, by=By.CSS_SELECTOR)
+    _timed(client, 'find_elements_by_selector', window.find_elements_by_selector, selector=selector, by=By.CSS_SELECTOR)
+    card = f"{selector} > {MainWindow._data['_device_card_selector']}"
+    _timed(client, 'click_on_element', window.click_on_element, selector=card, by=By.CSS_SELECTOR)
+    _timed(client, 'get_element_rect', window.get_element_rect, window.find_element_by_selector(selector=card, by=By.CSS_SELECTOR))
+
+
+def test_remove_devices(client):
+    target = client.devices[-1]['name']
+    sus, err = _timed(client, 'remove_devices', MainWindow(client.driver).remove_devices, [target])
+    assert sus, err
+    assert not client.devices[-1]['listed']
+
+
+def test_attempt_login_by_device_uid(client):
+    device = client.devices[0]
+    sus, err = _timed(
+        client,
+        'attempt_login_by_device_uid',
+        MainWF(client.driver).attempt_login_by_device_uid,
+        device['uid'],
+        device['name'],
+        ['admin'],
+        ['123456', device['credentials'][1]],
+        True
+    )
+    assert sus, err
+    assert client.hits.get('login') == 2
+
+
+def teardown_module(module):
+    directory = os.path.join(common.ProjectRoot, 'outcome', 'bench')
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'fake_client.json'), 'w', encoding='utf-8') as stream:
+        json.dump(_RESULTS, stream, ensure_ascii=False, indent=2)
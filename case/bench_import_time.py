@@ -0,0 +1,52 @@
+"""
+    导入耗时基准: pytest case/bench_import_time.py
+
+    导入用例入口(page.wf)不应启动客户端, 也不应加载编解码/邮件/图像等重量级依赖,
+    导入耗时超过 global.yml 中的 import_time_budget 视为回归
+"""
+import json
+import os
+import subprocess
+import sys
+from utils.read_config import config
+
+# 导入时不应加载的模块
+HEAVY_MODULES = ['av', 'PIL', 'imbox', 'requests', 'pyautogui', 'webdriver_manager']
+
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import page.wf
+cost = time.perf_counter() - t
+print(json.dumps({
+    'cost': cost,
+    'loaded': [m for m in %r if m in sys.modules],
+    'started': page.wf.Reo.initialized or page.wf.driver._driver is not None
+}))
+""" % (HEAVY_MODULES,)
+
+
+def _measure() -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run(
+        [sys.executable, '-c', _PROBE],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def test_import_does_not_start_client():
+    res = _measure()
+    assert not res['started']
+    assert res['loaded'] == [], f"导入时加载了重量级依赖: {res['loaded']}"
+
+
+def test_import_time_budget():
+    budget = float(config.get_data('import_time_budget', 2))
+    # 取多次中的最小值, 排除磁盘缓存等偶发因素
+    cost = min(_measure()['cost'] for _ in range(3))
+    print(f"import page.wf: {cost:.3f}s (budget {budget}s)")
+    assert cost <= budget, f"导入耗时 {cost:.3f}s 超过预算 {budget}s"
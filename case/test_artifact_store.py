@@ -0,0 +1,66 @@
+"""产物存储: pytest case/test_artifact_store.py"""
+import hashlib
+import os
+import pytest
+from utils.artifact_store import ArtifactStore
+
+
+def _read(fname: str) -> bytes:
+    with open(fname, 'rb') as stream:
+        return stream.read()
+
+
+def test_put_file_does_not_share_inode_with_source(tmp_path):
+    store = ArtifactStore(str(tmp_path / 'objects'))
+    src = tmp_path / 'record.mp4'
+    src.write_bytes(b'original content')
+    dest = str(tmp_path / 'outcome' / 'record.mp4')
+
+    store.put_file(str(src), dest)
+    obj = store.object_path(ArtifactStore.digest(dest))
+    assert not os.path.samefile(str(src), obj)
+
+    # 客户端原地改写源文件
+    with open(src, 'r+b') as stream:
+        stream.write(b'REWRITTEN')
+
+    assert _read(obj) == b'original content'
+    assert _read(dest) == b'original content'
+    assert ArtifactStore.digest(obj) == os.path.basename(obj)
+
+
+def test_put_file_dedups_dest_by_content(tmp_path):
+    store = ArtifactStore(str(tmp_path / 'objects'))
+    src = tmp_path / 'a.jpg'
+    src.write_bytes(b'jpeg')
+    first = store.put_file(str(src), str(tmp_path / 'outcome' / 'a.jpg'))
+    second = store.put_file(str(src), str(tmp_path / 'outcome' / 'b.jpg'))
+    assert os.path.samefile(first, second)
+    assert [f for f in os.listdir(tmp_path / 'objects') if f.endswith('.tmp')] == []
+
+
+def test_put_file_copy_hashes_while_copying(tmp_path, monkeypatch):
+    from utils import artifact_store
+
+    # 不支持 reflink 时只读一遍源文件, 复制的同时得到摘要
+    monkeypatch.setattr(artifact_store, '_reflink', lambda src, dst: False)
+    monkeypatch.setattr(ArtifactStore, 'digest', staticmethod(lambda fname: pytest.fail('re-read')))
+    store = ArtifactStore(str(tmp_path / 'objects'))
+    src = tmp_path / 'record.mp4'
+    data = os.urandom(3 * 1024 * 1024 + 17)
+    src.write_bytes(data)
+    dest = store.put_file(str(src), str(tmp_path / 'outcome' / 'record.mp4'))
+    assert store.last_ingest == 'copy'
+    assert _read(dest) == data
+    obj = store.object_path(hashlib.sha256(data).hexdigest())
+    assert os.path.samefile(obj, dest)
+
+
+def test_put_file_links_immutable_source(tmp_path):
+    store = ArtifactStore(str(tmp_path / 'objects'))
+    src = tmp_path / 'snap.jpg'
+    src.write_bytes(b'jpeg')
+    dest = store.put_file(str(src), str(tmp_path / 'outcome' / 'snap.jpg'), immutable=True)
+    assert store.last_ingest == 'link'
+    assert os.path.samefile(str(src), store.object_path(ArtifactStore.digest(dest)))
+    assert [f for f in os.listdir(tmp_path / 'objects') if f.endswith('.tmp')] == []
@@ -0,0 +1,56 @@
+"""登录凭据记录: pytest case/test_credential_memory.py"""
+import hashlib
+import json
+from utils.credential_memory import CredentialMemory
+
+UID = '952700Y005FT13UE'
+
+
+def _memory(tmp_path, name: str = 'credentials.json', skip_failed: bool = False) -> CredentialMemory:
+    return CredentialMemory(cache_file=str(tmp_path / name), skip_failed=skip_failed)
+
+
+def test_order_survives_reload(tmp_path):
+    memory = _memory(tmp_path)
+    memory.record(UID, 'admin', '123456', 'fail', 1.2)
+    memory.record(UID, 'admin', '111111', 'pass', 0.8)
+
+    pairs, skipped = _memory(tmp_path).order(UID, ['admin'], ['123456', '', '111111'])
+    assert pairs == [('admin', '111111'), ('admin', ''), ('admin', '123456')]
+    assert skipped == []
+
+    pairs, skipped = _memory(tmp_path, skip_failed=True).order(UID, ['admin'], ['123456', '', '111111'])
+    assert pairs == [('admin', '111111'), ('admin', '')]
+    assert skipped == [('admin', '123456')]
+
+
+def test_digests_are_salted_per_file(tmp_path):
+    a, b = _memory(tmp_path, 'a.json'), _memory(tmp_path, 'b.json')
+    a.record(UID, 'admin', '123456', 'pass', 1)
+    b.record(UID, 'admin', '123456', 'pass', 1)
+
+    raw = (tmp_path / 'a.json').read_text(encoding='utf-8')
+    data = json.loads(raw)
+    assert '123456' not in raw
+    assert len(bytes.fromhex(data['salt'])) == 16
+    key = data['records'][UID]['winner']
+    # 不是无盐 sha256, 与另一个缓存文件的摘要也不同
+    assert key != hashlib.sha256('\0'.join((UID, 'admin', '123456')).encode('utf-8')).hexdigest()
+    assert key != json.loads((tmp_path / 'b.json').read_text(encoding='utf-8'))['records'][UID]['winner']
+    assert key == a.digest(UID, 'admin', '123456')
+    assert [f.name for f in tmp_path.iterdir() if f.suffix == '.tmp'] == []
+
+
+def test_legacy_unsalted_records_are_dropped(tmp_path):
+    legacy = hashlib.sha256('\0'.join((UID, 'admin', '123456')).encode('utf-8')).hexdigest()
+    (tmp_path / 'credentials.json').write_text(json.dumps({
+        UID: {'winner': legacy, 'pairs': {legacy: {'pass': 1, 'fail': 0, 'error': 0, 'last': 'pass'}}}
+    }), encoding='utf-8')
+
+    memory = _memory(tmp_path)
+    pairs, _ = memory.order(UID, ['admin'], ['111111', '123456'])
+    assert pairs == [('admin', '111111'), ('admin', '123456')]
+    memory.record(UID, 'admin', '111111', 'pass', 1)
+    data = json.loads((tmp_path / 'credentials.json').read_text(encoding='utf-8'))
+    assert set(data) == {'salt', 'records'}
+    assert legacy not in data['records'][UID]['pairs']
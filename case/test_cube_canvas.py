@@ -0,0 +1,93 @@
+"""布防方格: pytest case/test_cube_canvas.py"""
+import random
+import pytest
+from selenium.webdriver.common.by import By
+from base.base_window import BaseWindow
+from utils.mock_driver import MockDriver
+
+XUNIT, YUNIT = 24, 7
+ACTIVE = 'rgb(0, 174, 255)'
+INACTIVE = 'rgb(255, 255, 255)'
+FULL = (1 << XUNIT) - 1
+
+
+def _apply(current: list, strokes: list) -> list:
+    """按页面的拖动规则执行: 起点方块切换状态, 矩形内全部设为起点的新状态"""
+    grid = list(current)
+    for top, left, bottom, right in strokes:
+        state = (grid[top] >> left & 1) ^ 1
+        mask = ((1 << (right - left + 1)) - 1) << left
+        for i in range(top, bottom + 1):
+            grid[i] = grid[i] | mask if state else grid[i] & ~mask
+    return grid
+
+
+def _random_masks(rand: random.Random) -> list:
+    kind = rand.random()
+    if kind < 0.2:
+        return [rand.choice((0, FULL)) for _ in range(YUNIT)]
+    if kind < 0.4:
+        # 按时间段设置的整列区域, 上下相邻的行可以合并
+        left = rand.randrange(XUNIT)
+        right = rand.randrange(left, XUNIT)
+        mask = ((1 << (right - left + 1)) - 1) << left
+        return [mask if rand.random() < 0.7 else 0 for _ in range(YUNIT)]
+    return [rand.getrandbits(XUNIT) for _ in range(YUNIT)]
+
+
+def test_cube_strokes_reach_target():
+    rand = random.Random(20240101)
+    for _ in range(2000):
+        current, target = _random_masks(rand), _random_masks(rand)
+        strokes = BaseWindow._cube_strokes(current, target, XUNIT)
+        assert _apply(current, strokes) == target, (current, target, strokes)
+        for top, left, bottom, right in strokes:
+            assert 0 <= top <= bottom < YUNIT and 0 <= left <= right < XUNIT
+
+
+@pytest.mark.parametrize('current, target, count', [
+    ([0] * YUNIT, [0] * YUNIT, 0),
+    ([0] * YUNIT, [FULL] * YUNIT, 1),
+    ([FULL] * YUNIT, [0] * YUNIT, 1),
+    # 每行 8:00-18:00 与 20:00-22:00 两段
+    ([0] * YUNIT, [(0b11 << 20) | (0b1111111111 << 8)] * YUNIT, 2),
+    # 只有周三改变
+    ([FULL] * YUNIT, [FULL] * 3 + [0] + [FULL] * 3, 1)
+], ids=['unchanged', 'all-on', 'all-off', 'two-periods', 'one-row'])
+def test_cube_strokes_merge_rows(current, target, count):
+    strokes = BaseWindow._cube_strokes(current, target, XUNIT)
+    assert len(strokes) == count
+    assert _apply(current, strokes) == target
+
+
+def _canvas(driver: MockDriver, masks: list):
+    grid = [[ACTIVE if m >> j & 1 else INACTIVE for j in range(XUNIT)] for m in masks]
+    driver.add('//canvas', grid=grid, palette=(INACTIVE, ACTIVE), rect={'x': 0, 'y': 0, 'width': 480, 'height': 140})
+    return driver.find_element(By.XPATH, '//canvas')
+
+
+def test_paint_cube_canvas_with_masks():
+    rand = random.Random(7)
+    for _ in range(20):
+        driver = MockDriver()
+        current, target = _random_masks(rand), _random_masks(rand)
+        ele = _canvas(driver, current)
+        window = BaseWindow(driver)
+        assert window.paint_cube_canvas(ele, target, ACTIVE)
+        assert window.parse_cube_canvas(ele, active_color=ACTIVE) == target
+        # 所有拖动合并为一次动作序列
+        assert driver.commands.get('actions', 0) <= 1
+
+
+def test_paint_cube_canvas_with_matrix():
+    driver = MockDriver()
+    ele = _canvas(driver, [0] * YUNIT)
+    matrix = [[8 <= j < 18 for j in range(XUNIT)] for _ in range(5)] + [[False] * XUNIT] * 2
+    window = BaseWindow(driver)
+    assert window.paint_cube_canvas(ele, matrix, ACTIVE)
+    assert window.parse_cube_canvas(ele, active_color=ACTIVE) == [0b1111111111 << 8] * 5 + [0, 0]
+
+    # 已是目标状态时不执行拖动
+    driver.reset_commands()
+    assert window.paint_cube_canvas(ele, matrix, ACTIVE)
+    assert 'actions' not in driver.commands
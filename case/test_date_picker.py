@@ -0,0 +1,123 @@
+"""日期选择器: pytest case/test_date_picker.py"""
+import threading
+import time
+import pytest
+from selenium.webdriver.common.by import By
+from datetime import date, timedelta
+from page.main_window import MainWindow
+from utils.mock_driver import MockDriver
+
+RENDER = 0.3  # 翻页后月份标题的渲染延迟
+
+
+def _picker(driver: MockDriver, fmt: str = '%Y-%m', header: bool = True) -> dict:
+    """回放页的日期选择器: 点击向上箭头翻到上个月, 月份标题在 RENDER 秒后更新"""
+    data = MainWindow._data
+    state = {'month': date.today().replace(day=1)}
+    state['header'] = driver.add(
+        data['_date_picker_header'] if header else '//*[@id="no-header"]',
+        text=state['month'].strftime(fmt)
+    )
+
+    def prev_month(d: MockDriver) -> None:
+        # 标题元素不变, 文本在最后一次翻页 RENDER 秒后更新
+        state['month'] = (state['month'] - timedelta(days=1)).replace(day=1)
+        if state.get('timer'):
+            state['timer'].cancel()
+        state['timer'] = threading.Timer(RENDER, setattr, (state['header'], 'text', state['month'].strftime(fmt)))
+        state['timer'].start()
+
+    state['up'] = driver.add(data['_date_picker_up_arrow'], on_click=prev_month)
+    driver.add(data['_date_picker_down_arrow'])
+    state['day'] = driver.add(data['_date_picker_day'], text='15')
+    driver.on_script('day = arguments[2]', lambda args: driver._ref(state['day']) if args[2] == '15' else None)
+    return state
+
+
+def test_date_picker_waits_for_month_header():
+    driver = MockDriver()
+    state = _picker(driver)
+    target = (date.today().replace(day=1) - timedelta(days=1)).replace(day=1) - timedelta(days=1)
+    data = MainWindow._data
+
+    start = time.monotonic()
+    picked = MainWindow(driver).date_picker(
+        dt=target.replace(day=15).strftime('%Y-%m-%d'),
+        up_arrow=data['_date_picker_up_arrow'],
+        down_arrow=data['_date_picker_down_arrow'],
+        day_sel=data['_date_picker_day']
+    )
+    cost = time.monotonic() - start
+
+    assert state['up'].clicks == 2
+    assert state['header'].text == target.strftime('%Y-%m')
+    assert picked is not None and state['day'].clicks == 1
+    # 等到月份标题更新即返回, 不再固定暂停 2s
+    assert RENDER <= cost < 1.5
+
+
+def test_date_picker_current_month_does_not_page():
+    driver = MockDriver()
+    state = _picker(driver)
+    data = MainWindow._data
+
+    start = time.monotonic()
+    MainWindow(driver).date_picker(
+        dt=date.today().replace(day=15).strftime('%Y-%m-%d'),
+        up_arrow=data['_date_picker_up_arrow'],
+        down_arrow=data['_date_picker_down_arrow'],
+        day_sel=data['_date_picker_day']
+    )
+    assert state['up'].clicks == 0
+    assert state['day'].clicks == 1
+    assert time.monotonic() - start < 0.5
+
+
+def _two_months_ago() -> date:
+    return ((date.today().replace(day=1) - timedelta(days=1)).replace(day=1) - timedelta(days=1)).replace(day=15)
+
+
+@pytest.mark.parametrize('fmt, header', [('%m/%Y', True), ('%Y-%m', False)], ids=['format-mismatch', 'no-header'])
+def test_date_picker_falls_back_to_pause(fmt, header):
+    driver = MockDriver()
+    state = _picker(driver, fmt=fmt, header=header)
+    data = MainWindow._data
+
+    start = time.monotonic()
+    picked = MainWindow(driver).date_picker(
+        dt=_two_months_ago().strftime('%Y-%m-%d'),
+        up_arrow=data['_date_picker_up_arrow'],
+        down_arrow=data['_date_picker_down_arrow'],
+        day_sel=data['_date_picker_day'],
+        pause=0.5
+    )
+    cost = time.monotonic() - start
+    # 标题对不上时不抛出错误, 最多等待 pause 后继续选择日期
+    assert picked is not None and state['day'].clicks == 1
+    assert 0.5 <= cost < 1.5
+
+
+@pytest.mark.parametrize('by, selector, script_args', [
+    (By.ID, 'day-15', ['[id="day-15"]', 'css']),
+    (By.CLASS_NAME, 'day-cell', ['.day-cell', 'css']),
+    (By.LINK_TEXT, '15', [None, None])
+], ids=['id', 'class-name', 'link-text'])
+def test_date_picker_day_selector_by(by, selector, script_args):
+    driver = MockDriver()
+    day = driver.add(selector, by)
+    calls = []
+
+    def pick(args):
+        calls.append(args)
+        nodes = args[3] or []
+        return nodes[0] if nodes else driver._ref(day)
+
+    driver.on_script('day = arguments[2]', pick)
+    MainWindow(driver).date_picker(
+        dt=date.today().replace(day=15).strftime('%Y-%m-%d'),
+        up_arrow='//up', down_arrow='//down', day_sel=selector, by=by
+    )
+    assert calls[0][:2] == script_args
+    # 无法转为 CSS 的选择器先查找再传入
+    assert bool(calls[0][3]) == (script_args[0] is None)
+    assert day.clicks == 1
@@ -0,0 +1,71 @@
+"""设备列表后台监控: pytest case/test_device_monitor.py"""
+import threading
+import time
+import pytest
+from urllib3.exceptions import MaxRetryError
+from base.base import BaseWF
+from utils.mock_driver import MockDriver
+
+
+def _workflow(statuses: dict):
+    driver = MockDriver()
+    driver.on_script('__reoDeviceMonitor', lambda args: {'dirty': time.monotonic(), 'statuses': dict(statuses)})
+    driver.on_script('sd_title', lambda args: [
+        {'name': n, 'status': s, 'element': None, 'card': None, 'buttons': [], 'titles': [], 'sd': None, 'sd_title': ''}
+        for n, s in statuses.items()
+    ])
+    return driver, BaseWF(driver)
+
+
+def test_wait_for_devices_stops_monitor():
+    statuses = {'E1 Pro': '未连接'}
+    driver, wf = _workflow(statuses)
+    threading.Timer(0.2, statuses.__setitem__, ('E1 Pro', '已连接')).start()
+    assert wf.wait_for_devices(['E1 Pro'], timeout=3) == set()
+    assert not wf._devices.monitor.running
+
+
+def test_attempt_awake_devices_returns_pending():
+    statuses = {'E1 Pro': '未连接', 'RLC-824A': '已连接'}
+    driver, wf = _workflow(statuses)
+    assert wf._main_window.attempt_awake_devices(timeout=0.3) == {'E1 Pro'}
+    assert not wf._devices.monitor.running
+
+
+def test_monitor_exits_after_quit():
+    statuses = {'E1 Pro': '已连接'}
+    driver, wf = _workflow(statuses)
+    monitor = wf._main_window.start_device_monitor()
+
+    def closed(args):
+        raise MaxRetryError(None, '/session/mock/execute/sync')
+
+    driver.on_script('__reoDeviceMonitor', closed)
+    monitor._thread.join(3)
+    assert not monitor.running
+
+
+def test_awake_device_by_need_raises_on_timeout():
+    statuses = {'E1 Pro': '未连接'}
+    driver, wf = _workflow(statuses)
+    wf._main_window._awake_timeout = 0.3
+    with pytest.raises(ValueError, match='E1 Pro'):
+        wf.awake_device_by_need('E1 Pro')
+
+
+def test_monitor_paused_skips_polls():
+    statuses = {'E1 Pro': '已连接'}
+    driver, wf = _workflow(statuses)
+    polls = []
+    driver.on_script('__reoDeviceMonitor', lambda args: polls.append(1) or {'dirty': 1})
+    monitor = wf._main_window.start_device_monitor()
+    try:
+        with monitor.paused():
+            time.sleep(0.1)
+            seen = len(polls)
+            time.sleep(monitor._interval * 3)
+            assert len(polls) <= seen + 1
+        time.sleep(monitor._interval * 3)
+        assert len(polls) > seen + 1
+    finally:
+        monitor.stop()
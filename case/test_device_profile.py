@@ -0,0 +1,100 @@
+"""设备档案缓存: pytest case/test_device_profile.py"""
+import json
+import os
+import threading
+import time
+import pytest
+from requests import HTTPError
+from utils.device_profile import DeviceProfileCache
+from utils.stub_server import DeviceProfileStub
+
+PROFILES = {f"95270000{i:08d}": {'batteryType': i % 3, 'wifiType': 2} for i in range(8)}
+UIDS = list(PROFILES)
+
+
+@pytest.fixture
+def stub():
+    with DeviceProfileStub(dict(PROFILES)) as server:
+        yield server
+
+
+def _cache(stub, tmp_path, ttl: float = 60) -> DeviceProfileCache:
+    return DeviceProfileCache(endpoint=stub.endpoint, ttl=ttl, cache_file=str(tmp_path / 'device_profile.json'))
+
+
+def test_get_fetches_once_and_persists(stub, tmp_path):
+    cache = _cache(stub, tmp_path)
+    assert cache.get(UIDS[1]) == PROFILES[UIDS[1]]
+    assert cache.get(UIDS[1]) == PROFILES[UIDS[1]]
+    assert stub.hits == {UIDS[1]: 1}
+
+    with open(tmp_path / 'device_profile.json', encoding='utf-8') as stream:
+        assert json.load(stream)[UIDS[1]]['data'] == PROFILES[UIDS[1]]
+    # 新实例从磁盘缓存读取, 不再请求
+    assert _cache(stub, tmp_path).get(UIDS[1]) == PROFILES[UIDS[1]]
+    assert stub.hits == {UIDS[1]: 1}
+
+
+def test_get_unknown_uid_raises(stub, tmp_path):
+    cache = _cache(stub, tmp_path)
+    with pytest.raises(HTTPError):
+        cache.get('UNKNOWN')
+    with pytest.raises(ValueError):
+        cache.get('')
+
+
+def test_ttl_expires_entries(stub, tmp_path):
+    cache = _cache(stub, tmp_path, ttl=0.2)
+    cache.get(UIDS[0])
+    cache.get(UIDS[0])
+    assert stub.hits[UIDS[0]] == 1
+    time.sleep(0.3)
+    cache.get(UIDS[0])
+    assert stub.hits[UIDS[0]] == 2
+
+    cache.invalidate(UIDS[0])
+    cache.get(UIDS[0])
+    assert stub.hits[UIDS[0]] == 3
+
+
+def test_concurrent_get_same_uid_fetches_once(stub, tmp_path):
+    cache = _cache(stub, tmp_path)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker(uid: str) -> None:
+        barrier.wait()
+        results.append(cache.get(uid))
+
+    threads = [threading.Thread(target=worker, args=(UIDS[i % 2],)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    assert len(results) == 8
+    assert stub.hits == {UIDS[0]: 1, UIDS[1]: 1}
+    assert [f for f in os.listdir(tmp_path) if f.endswith('.tmp')] == []
+
+
+def test_slow_fetch_does_not_block_other_uids(stub, tmp_path):
+    cache = _cache(stub, tmp_path)
+    release = threading.Event()
+    fetch = cache._fetch
+
+    def slow_fetch(uid: str) -> dict:
+        if uid == UIDS[0]:
+            release.wait(10)
+        return fetch(uid)
+
+    cache._fetch = slow_fetch
+    slow = threading.Thread(target=cache.get, args=(UIDS[0],))
+    slow.start()
+    try:
+        time.sleep(0.1)
+        start = time.monotonic()
+        assert cache.get(UIDS[1]) == PROFILES[UIDS[1]]
+        assert time.monotonic() - start < 2
+    finally:
+        release.set()
+        slow.join(10)
+    assert stub.hits == {UIDS[0]: 1, UIDS[1]: 1}
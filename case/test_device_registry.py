@@ -0,0 +1,56 @@
+"""设备状态登记: pytest case/test_device_registry.py"""
+import threading
+import time
+from utils.common import common
+from utils.device_registry import DeviceRegistry
+
+TEXT = common.I18n['_e_device_status']
+
+
+def test_update_indexes_and_reports_changes():
+    registry = DeviceRegistry()
+    seen = []
+    unsubscribe = registry.subscribe(lambda *change: seen.append(change))
+
+    changes = registry.update({'E1': TEXT['ACTIVE'], 'C1': TEXT['INACTIVE'], 'D1': '未知状态'})
+    assert sorted(changes) == [('C1', None, 'INACTIVE'), ('D1', None, 'OTHER'), ('E1', None, 'ACTIVE')]
+    assert registry.names('ACTIVE') == {'E1'} and registry['OTHER'] == {'D1'}
+    assert registry.names() == {'E1', 'C1', 'D1'}
+    version = registry.version
+
+    # 状态不变不计入变化, 不在完整快照中的设备移除
+    changes = registry.update({'E1': TEXT['ACTIVE'], 'C1': TEXT['ACTIVE']})
+    assert sorted(changes) == [('C1', 'INACTIVE', 'ACTIVE'), ('D1', 'OTHER', None)]
+    assert registry.names('ACTIVE') == {'E1', 'C1'} and registry.names('INACTIVE') == set()
+    assert 'D1' not in registry and registry.status_text('D1') == TEXT['OTHER']
+    assert registry.version == version + 1
+    assert len(seen) == 5
+
+    # 部分快照只更新其中的设备
+    unsubscribe()
+    assert registry.update({'E1': TEXT['FAIL']}, complete=False) == [('E1', 'ACTIVE', 'FAIL')]
+    assert registry.names() == {'E1', 'C1'}
+    assert registry.update({}, complete=False) == []
+    assert len(seen) == 5
+
+
+def test_wait_for_returns_when_devices_become_active():
+    registry = DeviceRegistry()
+    registry.update({'E1': TEXT['CONNECTING'], 'C1': TEXT['ACTIVE']})
+    timer = threading.Timer(0.1, registry.set, ('E1', 'ACTIVE'))
+    timer.start()
+
+    start = time.monotonic()
+    assert registry.wait_for(['E1', 'C1'], timeout=2) == set()
+    assert time.monotonic() - start < 1
+    timer.join()
+
+
+def test_wait_for_timeout_returns_pending():
+    registry = DeviceRegistry()
+    registry.update({'E1': TEXT['CONNECTING'], 'C1': TEXT['ACTIVE']})
+
+    start = time.monotonic()
+    assert registry.wait_for(['E1', 'C1', 'X1'], timeout=0.2) == {'E1', 'X1'}
+    assert 0.2 <= time.monotonic() - start < 1
+    assert registry.wait_for(['E1'], timeout=0) == {'E1'}
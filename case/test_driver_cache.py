@@ -0,0 +1,35 @@
+"""chromedriver 缓存: pytest case/test_driver_cache.py"""
+import pytest
+from utils.common import common
+from utils.driver_cache import DriverCache
+
+
+def _cache(tmp_path) -> DriverCache:
+    return DriverCache('112', cache_dir=str(tmp_path), offline=True, sha256='')
+
+
+def _error(key: str) -> str:
+    return common.I18n['_error_msg'][key]
+
+
+def test_offline_hit_and_miss(tmp_path):
+    cache = _cache(tmp_path)
+    with pytest.raises(ValueError, match=_error('_driver_not_cached')):
+        cache.resolve()
+
+    src = tmp_path / 'download'
+    src.write_bytes(b'driver-v1')
+    assert cache.store(str(src)) == cache.path
+    assert cache.resolve() == cache.path
+
+
+def test_offline_tampered_cache_reports_checksum_mismatch(tmp_path):
+    cache = _cache(tmp_path)
+    src = tmp_path / 'download'
+    src.write_bytes(b'driver-v1')
+    cache.store(str(src))
+
+    with open(cache.path, 'wb') as stream:
+        stream.write(b'driver-v2')
+    with pytest.raises(ValueError, match=_error('_driver_checksum_mismatch')):
+        cache.resolve()
@@ -0,0 +1,68 @@
+"""输入后端: pytest case/test_input_backend.py"""
+import sys
+from types import SimpleNamespace
+import pytest
+from base import input_backend
+from base.input_backend import CdpInput, PyAutoGuiInput
+
+
+class _CdpDriver:
+    """只记录 execute_cdp_cmd 的驱动"""
+
+    def __init__(self) -> None:
+        self.events = []
+
+    def execute_cdp_cmd(self, cmd: str, params: dict) -> dict:
+        self.events.append((cmd, params))
+        return {}
+
+
+@pytest.fixture
+def fake_pyautogui(monkeypatch):
+    """记录调用参数的 pyautogui, PAUSE 为哨兵值"""
+    calls = []
+    pg = SimpleNamespace(PAUSE='untouched', FAILSAFE=None)
+    pg.typewrite = lambda *args, **kwargs: calls.append(('typewrite', args, kwargs))
+    monkeypatch.setitem(sys.modules, 'pyautogui', pg)
+    monkeypatch.setattr(input_backend, '_native', None)
+    return pg, calls
+
+
+def test_cdp_press_dispatches_key_events():
+    driver = _CdpDriver()
+    CdpInput(driver).press(['down', 'enter'])
+    assert [(p['type'], p['key']) for _, p in driver.events] == [
+        ('rawKeyDown', 'ArrowDown'), ('keyUp', 'ArrowDown'), ('keyDown', 'Enter'), ('keyUp', 'Enter')
+    ]
+    assert {cmd for cmd, _ in driver.events} == {'Input.dispatchKeyEvent'}
+    # 回车产生输入, 方向键不产生
+    assert driver.events[2][1]['text'] == '\r' and 'text' not in driver.events[0][1]
+
+
+def test_cdp_typewrite_sends_each_char():
+    driver = _CdpDriver()
+    CdpInput(driver).typewrite('a1\n')
+    downs = [p for _, p in driver.events if p['type'] != 'keyUp']
+    assert [p.get('text') for p in downs] == ['a', '1', '\r']
+    assert [p['windowsVirtualKeyCode'] for p in downs] == [65, 49, 13]
+
+
+def test_pyautogui_pause_is_per_call(monkeypatch, fake_pyautogui):
+    pg, calls = fake_pyautogui
+    slept = []
+    monkeypatch.setattr(input_backend.time, 'sleep', slept.append)
+
+    native = PyAutoGuiInput(pause=0.3)
+    native.press(['down'], 0.05)
+    native.typewrite('/tmp/a.txt', pause=0)
+    assert pg.PAUSE == 'untouched'
+    assert all(kwargs == {'_pause': False} for _, _, kwargs in calls)
+    assert slept == [0.3]
+
+
+@pytest.mark.parametrize('env, expected', [({'pyautogui.FAILSAFE': False}, False), ({}, True)], ids=['off', 'default'])
+def test_native_input_failsafe_is_bool(monkeypatch, fake_pyautogui, env, expected):
+    pg, _ = fake_pyautogui
+    monkeypatch.setattr(input_backend.common, 'ENV', env)
+    input_backend.native_input()
+    assert pg.FAILSAFE is expected
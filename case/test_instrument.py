@@ -0,0 +1,51 @@
+"""WebDriver 命令统计: pytest case/test_instrument.py"""
+import json
+import time
+import pytest
+from base.base_window import BaseWindow
+from utils.instrument import CommandRecorder
+from utils.mock_driver import MockDriver
+
+
+@pytest.fixture
+def recorder():
+    rec = CommandRecorder()
+    yield rec
+    rec.uninstall()
+
+
+def test_summary_attributes_commands_and_sleep(recorder):
+    driver = MockDriver()
+    recorder.install(driver)
+    recorder.install(driver)  # 重复安装不重复统计
+    recorder.begin('case/test_demo.py::test_demo')
+
+    BaseWindow(driver).get_window_rect(cached=False)
+    time.sleep(0.05)
+
+    summary = recorder.summary()
+    assert summary['test'] == 'case/test_demo.py::test_demo'
+    assert summary['by_command']['w3cExecuteScript']['count'] == 1
+    assert summary['commands'] == 2
+    # 命令归属于发起它的 base/ 方法, 暂停归属于用例函数
+    assert summary['by_caller']['BaseWindow.get_window_rect']['count'] == 2
+    assert summary['by_caller']['test_summary_attributes_commands_and_sleep']['sleep'] >= 0.05
+    assert summary['sleep'] >= 0.05
+    assert summary['wall'] >= summary['webdriver'] + summary['sleep']
+
+
+def test_trace_and_end_write_files(recorder, tmp_path):
+    driver = MockDriver()
+    recorder.install(driver)
+    recorder.begin('case/test_demo.py::test_trace')
+    BaseWindow(driver).get_window_rect(cached=False)
+
+    trace = recorder.trace()
+    assert trace['otherData']['test'] == 'case/test_demo.py::test_trace'
+    event = next(e for e in trace['traceEvents'] if e['name'] == 'w3cExecuteScript')
+    assert event['ph'] == 'X' and event['ts'] >= 0 and event['dur'] >= 0
+    assert event['args']['caller'] == 'BaseWindow.get_window_rect'
+
+    summary = recorder.end(str(tmp_path))
+    assert json.loads((tmp_path / 'case_test_demo.py_test_trace.json').read_text(encoding='utf-8')) == summary
+    assert (tmp_path / 'case_test_demo.py_test_trace.trace.json').exists()
@@ -0,0 +1,125 @@
+"""报警邮件读取: pytest case/test_mailbox.py"""
+import os
+import threading
+import time
+from email.message import EmailMessage
+import pytest
+from utils import mailbox
+from utils.artifact_store import ArtifactStore
+from utils.mailbox import AlertMailbox
+from utils.stub_server import ImapStub
+
+SNAPSHOT = bytes(range(256)) * 40  # 10KB, 分段读取时跨多个分段
+
+
+def _mail(subject: str, attachment: bytes = None) -> EmailMessage:
+    msg = EmailMessage()
+    msg['Subject'] = subject
+    msg['From'] = 'Reolink <alarm@reolink.com>'
+    msg['To'] = 'tester@example.com'
+    msg.set_content('plain body')
+    msg.add_alternative('<p>Cam-000 detected motion</p>', subtype='html')
+    if attachment is not None:
+        msg.add_attachment(attachment, maintype='image', subtype='jpeg', filename='snapshot.jpg')
+    return msg
+
+
+@pytest.fixture
+def stub():
+    with ImapStub([
+        _mail('Motion Detection for Cam-000', SNAPSHOT),
+        _mail('Weekly newsletter'),
+    ]) as server:
+        server.deliver(_mail('Scheduled Email for Cam-001'), seen=True)
+        yield server
+
+
+@pytest.fixture
+def box(stub):
+    with AlertMailbox('tester@example.com', 'pwd', stub.host, port=stub.port, ssl=False) as mb:
+        yield mb
+
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch, tmp_path):
+    """附件写入临时目录的产物存储, 分段大小调小以产生多次分段读取"""
+    monkeypatch.setattr(mailbox, 'artifacts', ArtifactStore(str(tmp_path / 'objects')))
+    monkeypatch.setattr(mailbox, '_CHUNK', 4096)
+
+
+def test_search_filters_on_server(stub, box):
+    assert box.search() == [b'1']
+    stub.deliver(_mail('Motion Detection for Cam-002'))
+    assert box.search() == [b'4', b'1']
+    assert box.search(date='01-Jan-2000') == []
+    assert any('SEARCH UNSEEN ON' in c for c in stub.commands)
+
+
+def test_headers_and_structure(stub, box):
+    head = box.headers(b'1')
+    assert head['subject'] == 'Motion Detection for Cam-000'
+    assert head['sent_from'] == [{'name': 'Reolink', 'email': 'alarm@reolink.com'}]
+    assert head['sent_to'] == [{'name': '', 'email': 'tester@example.com'}]
+
+    parts = box.structure(b'1')
+    assert [(p['part'], p['type'], p['subtype']) for p in parts] == [
+        ('1.1', 'text', 'plain'),
+        ('1.2', 'text', 'html'),
+        ('2', 'image', 'jpeg')
+    ]
+    attachment = parts[-1]
+    assert attachment['filename'] == 'snapshot.jpg'
+    assert attachment['encoding'] == 'base64'
+    assert attachment['disposition'] == 'attachment'
+    # 只读取邮件头与结构, 不标记已读
+    assert not stub.mails[0]['seen']
+
+
+def test_latest_downloads_attachment_in_chunks(stub, box, tmp_path):
+    outdir = str(tmp_path / 'mail')
+    mail = box.latest(outdir)
+    assert mail['subject'] == 'Motion Detection for Cam-000'
+    assert 'detected motion' in mail['body']
+    assert len(mail['attachments']) == 1
+    attachment = mail['attachments'][0]
+    assert attachment['content-type'] == 'image/jpeg'
+    assert attachment['size'] == len(SNAPSHOT)
+    with open(os.path.join(outdir, 'snapshot.jpg'), 'rb') as stream:
+        assert stream.read() == SNAPSHOT
+
+    partial = [c for c in stub.commands if 'BODY.PEEK[2]<' in c]
+    encoded = next(p for p in box.structure(b'1') if p['part'] == '2')['size']
+    assert len(partial) == -(-encoded // mailbox._CHUNK)
+    # 不匹配的邮件没有下载正文
+    assert not any('FETCH 2 (BODY' in c for c in stub.commands)
+
+
+def test_idle_sees_exists_already_buffered(stub, box):
+    # 进入 IDLE 时服务端把续行与 EXISTS 一起发送, EXISTS 已在 conn.file 缓冲区中, socket 不再可读
+    stub.deliver(_mail('Motion Detection for Cam-002'))
+    start = time.monotonic()
+    assert box._idle(5)
+    assert time.monotonic() - start < 1
+    # IDLE 结束后连接仍可继续使用
+    assert box.search() == [b'4', b'1']
+
+
+def test_idle_times_out_without_new_mail(box):
+    start = time.monotonic()
+    assert not box._idle(0.3)
+    assert time.monotonic() - start < 1
+
+
+def test_wait_returns_mail_delivered_during_idle(stub, box, tmp_path):
+    stub.mails[0]['seen'] = True
+    timer = threading.Timer(0.3, stub.deliver, (_mail('Scheduled Email for Cam-003', b'jpeg'),))
+    timer.start()
+    start = time.monotonic()
+    try:
+        mail = box.wait(str(tmp_path / 'mail'), timeout=5)
+    finally:
+        timer.cancel()
+    assert mail['subject'] == 'Scheduled Email for Cam-003'
+    assert mail['attachments'][0]['size'] == 4
+    assert time.monotonic() - start < 2
+    assert 'IDLE' in stub.commands
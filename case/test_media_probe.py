@@ -0,0 +1,116 @@
+"""媒体文件探测: pytest case/test_media_probe.py"""
+import io
+import struct
+import pytest
+from utils import media_probe
+from utils.utils import util
+
+
+def _jpeg(width: int, height: int) -> bytes:
+    app0 = b'\xff\xe0' + struct.pack('>H', 16) + b'JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00'
+    # DHT(C4) 不是 SOF, 需要跳过
+    dht = b'\xff\xc4' + struct.pack('>H', 5) + b'\x00\x00\x00'
+    sof0 = b'\xff\xc0' + struct.pack('>HBHHB', 11, 8, height, width, 1) + b'\x01\x11\x00'
+    # 标记前允许有填充的 0xFF
+    return b'\xff\xd8' + app0 + dht + b'\xff\xff' + sof0 + b'\xff\xda' + b'\x00' * 16
+
+
+def _png(width: int, height: int) -> bytes:
+    ihdr = struct.pack('>II', width, height) + b'\x08\x02\x00\x00\x00'
+    return b'\x89PNG\r\n\x1a\n' + struct.pack('>I', 13) + b'IHDR' + ihdr + b'\x00' * 4
+
+
+def _box(kind: bytes, body: bytes = b'', large: bool = False) -> bytes:
+    if large:
+        return struct.pack('>I4sQ', 1, kind, len(body) + 16) + body
+    return struct.pack('>I4s', len(body) + 8, kind) + body
+
+
+def _trak(handler: bytes, timescale: int, duration: int, stts: list, size=(0, 0), mdhd_v1: bool = False) -> bytes:
+    if mdhd_v1:
+        mdhd = b'\x01\x00\x00\x00' + struct.pack('>QQIQ', 0, 0, timescale, duration) + b'\x00' * 4
+    else:
+        mdhd = b'\x00\x00\x00\x00' + struct.pack('>IIII', 0, 0, timescale, duration) + b'\x00' * 4
+    hdlr = b'\x00' * 8 + handler + b'\x00' * 12 + b'\x00'
+    # 视觉样本描述: size format 保留(6) 索引(2) pre_defined/保留(16) 宽 高 ...
+    entry = struct.pack('>I4s', 86, b'avc1') + b'\x00' * 6 + b'\x00\x01' + b'\x00' * 16 + struct.pack('>HH', *size)
+    entry += b'\x00' * (86 - len(entry))
+    stsd = b'\x00' * 4 + struct.pack('>I', 1) + entry
+    stts_body = b'\x00' * 4 + struct.pack('>I', len(stts)) + b''.join(struct.pack('>II', n, d) for n, d in stts)
+    stbl = _box(b'stbl', _box(b'stsd', stsd) + _box(b'stts', stts_body))
+    minf = _box(b'minf', _box(b'vmhd', b'\x00' * 12) + stbl)
+    mdia = _box(b'mdia', _box(b'mdhd', mdhd) + _box(b'hdlr', hdlr) + minf)
+    return _box(b'trak', _box(b'tkhd', b'\x00' * 84) + mdia)
+
+
+def _mp4(mdhd_v1: bool = False, moov_last: bool = False) -> bytes:
+    ftyp = _box(b'ftyp', b'isom\x00\x00\x02\x00isomiso2avc1mp41')
+    moov = _box(b'moov', _box(b'mvhd', b'\x00' * 100) + _trak(b'soun', 48000, 480000, [(469, 1024)]) + _trak(
+        b'vide', 1000, 10000, [(250, 40), (50, 40)], (1920, 1080), mdhd_v1
+    ))
+    mdat = _box(b'mdat', b'\x00' * 4096, large=True)
+    return ftyp + (mdat + moov if moov_last else moov + mdat)
+
+
+def test_jpeg_size():
+    assert media_probe.jpeg_size(io.BytesIO(_jpeg(2560, 1440))) == (2560, 1440)
+    with pytest.raises(ValueError):
+        media_probe.jpeg_size(io.BytesIO(b'\xff\xd8' + b'\x00' * 8))
+    with pytest.raises(ValueError):
+        media_probe.jpeg_size(io.BytesIO(_png(1, 1)))
+
+
+def test_png_size():
+    assert media_probe.png_size(io.BytesIO(_png(640, 360))) == (640, 360)
+    with pytest.raises(ValueError):
+        media_probe.png_size(io.BytesIO(_jpeg(1, 1)))
+
+
+def test_image_size_dispatches_on_header(tmp_path):
+    jpg = tmp_path / 'snap.png'  # 扩展名与内容不符时按文件头判断
+    jpg.write_bytes(_jpeg(800, 600))
+    png = tmp_path / 'snap.jpg'
+    png.write_bytes(_png(72, 24))
+    assert media_probe.image_size(str(jpg)) == (800, 600)
+    assert media_probe.image_size(str(png)) == (72, 24)
+
+
+@pytest.mark.parametrize('mdhd_v1', [False, True], ids=['mdhd-v0', 'mdhd-v1'])
+@pytest.mark.parametrize('moov_last', [False, True], ids=['moov-first', 'moov-last'])
+def test_mp4_info(tmp_path, mdhd_v1, moov_last):
+    fname = tmp_path / 'record.mp4'
+    fname.write_bytes(_mp4(mdhd_v1, moov_last))
+    info = media_probe.mp4_info(str(fname))
+    # 跳过音频轨, 取视频轨: 300 个样本 / 10s
+    assert info == {'fps': 30.0, 'duration': 10.0, 'width': 1920, 'height': 1080}
+
+
+def test_mp4_info_without_video_track(tmp_path):
+    fname = tmp_path / 'audio.mp4'
+    fname.write_bytes(_box(b'ftyp', b'M4A ') + _box(b'moov', _trak(b'soun', 48000, 480000, [(469, 1024)])))
+    with pytest.raises(ValueError):
+        media_probe.mp4_info(str(fname))
+
+
+def test_probe_many_reports_stats(tmp_path, monkeypatch, capsys):
+    good = tmp_path / 'a.png'
+    good.write_bytes(_png(72, 24))
+    bad = tmp_path / 'b.png'
+    bad.write_bytes(b'broken')
+    fnames = [str(good), str(bad)]
+    results, stats = media_probe.probe_many(fnames)
+    assert results[str(good)] == {'width': 72, 'height': 24}
+    assert 'error' in results[str(bad)]
+    assert stats['files'] == 2 and stats['seconds'] >= 0
+
+    monkeypatch.setattr(util, 'probe_stats', None)
+    assert util._Util__probe_media('image', [str(good)]) == {str(good): {'rs': '72*24', 'vinfo': {}}}
+    assert util.probe_stats['files'] == 1
+
+    # 单个文件损坏不影响其他文件, 错误写入该文件的 vinfo, 不打印统计
+    assert util._Util__probe_media('image', fnames) == {
+        str(good): {'rs': '72*24', 'vinfo': {}},
+        str(bad): {'rs': '', 'vinfo': {'error': results[str(bad)]['error']}}
+    }
+    assert util.probe_stats['files'] == 2
+    assert capsys.readouterr().out == ''
@@ -0,0 +1,56 @@
+"""并行调度模式: pytest case/test_parallel_dist.py"""
+from types import SimpleNamespace
+import pytest
+from utils import conftest
+
+
+class _Config:
+    """pytest_configure 用到的 Config 接口"""
+
+    def __init__(self, args: list, dist: str = 'load', addopts: list = None) -> None:
+        self.option = SimpleNamespace(dist=dist)
+        self.invocation_params = SimpleNamespace(args=tuple(args))
+        self._addopts = addopts or []
+        self.warnings = []
+
+    def getini(self, name: str) -> list:
+        return self._addopts if name == 'addopts' else []
+
+    def issue_config_time_warning(self, warning: Warning, stacklevel: int) -> None:
+        self.warnings.append(warning)
+
+
+@pytest.fixture(autouse=True)
+def no_addopts(monkeypatch):
+    monkeypatch.delenv('PYTEST_ADDOPTS', raising=False)
+
+
+def test_implicit_load_becomes_loadgroup():
+    config = _Config(['-n', '4', 'case/'])
+    conftest.pytest_configure(config)
+    assert config.option.dist == 'loadgroup'
+    assert not config.warnings
+
+
+@pytest.mark.parametrize('args, addopts, env', [
+    (['-n', '4', '--dist', 'load'], [], ''),
+    (['-n', '4', '--dist=load'], [], ''),
+    (['-n', '4'], ['--dist=load'], ''),
+    (['-n', '4'], [], '--dist load')
+], ids=['cli', 'cli-eq', 'ini', 'env'])
+def test_explicit_load_is_kept_with_warning(monkeypatch, args, addopts, env):
+    if env:
+        monkeypatch.setenv('PYTEST_ADDOPTS', env)
+    config = _Config(args, addopts=addopts)
+    conftest.pytest_configure(config)
+    assert config.option.dist == 'load'
+    assert len(config.warnings) == 1
+    assert isinstance(config.warnings[0], pytest.PytestConfigWarning)
+
+
+@pytest.mark.parametrize('dist', ['no', 'loadscope', 'loadgroup'])
+def test_other_modes_untouched(dist):
+    config = _Config(['-n', '4'], dist=dist)
+    conftest.pytest_configure(config)
+    assert config.option.dist == dist
+    assert not config.warnings
@@ -0,0 +1,73 @@
+"""配置解析缓存与层级索引: pytest case/test_read_config.py"""
+import os
+import pytest
+from utils import read_config
+from utils.read_config import Config
+
+
+@pytest.fixture
+def sample(tmp_path, monkeypatch):
+    """在临时目录中加载 config/sample.yml, 不影响全局配置"""
+    (tmp_path / 'config').mkdir()
+    fname = tmp_path / 'config' / 'sample.yml'
+    fname.write_text('page:\n  login:\n    user: admin\n    timeout: 3\ntop: 1\n', encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, '_Config__raw_data', dict(Config._Config__raw_data))
+    monkeypatch.setattr(Config, '_Config__index', dict(Config._Config__index))
+    return fname
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """记录 YAML 解析次数"""
+    calls = []
+    safe_load = read_config.yaml.safe_load
+
+    def counted(stream):
+        calls.append(stream)
+        return safe_load(stream)
+
+    monkeypatch.setattr(read_config.yaml, 'safe_load', counted)
+    return calls
+
+
+def _set_mtime(fname, mtime_ns: int) -> None:
+    os.utime(fname, ns=(mtime_ns, mtime_ns))
+
+
+def test_dotted_key_lookup(sample):
+    config = Config()
+    assert config.get_page_data('page.login.user', source='sample') == 'admin'
+    assert config.get_page_data('page.login', source='sample') == {'user': 'admin', 'timeout': 3}
+    assert config.get_page_data('top', source='sample') == 1
+    assert config.get_page_data('page.logout', source='sample') == {}
+    assert config.get_page_data('', source='sample')['top'] == 1
+
+
+def test_cache_reused_until_file_changes(sample, parses):
+    Config()
+    assert len(parses) == 1
+    assert (sample.parent / '.cache' / 'sample.pickle').exists()
+
+    # 未变化时直接读取缓存
+    Config()
+    assert len(parses) == 1
+
+    # 内容变化, 即使 mtime 相同也重新解析
+    mtime = os.stat(sample).st_mtime_ns
+    sample.write_text('page:\n  login:\n    user: guest\ntop: 1\n', encoding='utf-8')
+    _set_mtime(sample, mtime)
+    assert Config().get_page_data('page.login.user', source='sample') == 'guest'
+    assert len(parses) == 2
+
+    # 只有 mtime 变化同样重新解析
+    _set_mtime(sample, mtime + 10 ** 9)
+    Config()
+    assert len(parses) == 3
+
+
+def test_corrupt_cache_is_ignored(sample, parses):
+    Config()
+    (sample.parent / '.cache' / 'sample.pickle').write_bytes(b'not a pickle')
+    assert Config().get_page_data('page.login.user', source='sample') == 'admin'
+    assert len(parses) == 2
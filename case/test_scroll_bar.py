@@ -0,0 +1,42 @@
+"""调节条: pytest case/test_scroll_bar.py"""
+import pytest
+from selenium.webdriver.common.by import By
+from base.base_window import BaseWindow
+from utils.mock_driver import MockDriver
+
+
+def _range(controlled: bool = False, step: str = '1', value: float = 0):
+    driver = MockDriver()
+    node = driver.add('#volume', By.CSS_SELECTOR, value=value, controlled=controlled,
+                      attrs={'min': '0', 'max': '100', 'step': step})
+    return driver, node, driver.find_element(By.CSS_SELECTOR, '#volume')
+
+
+@pytest.mark.parametrize('value, step, expected', [
+    (42, '1', 42.0),
+    (42, '5', 40.0),
+    (150, '1', 100.0),
+    (-3, '1', 0.0),
+    (42, 'any', 42.0)
+], ids=['exact', 'step', 'above-max', 'below-min', 'step-any'])
+def test_scroll_bar_direct_returns_set_value(value, step, expected):
+    driver, node, ele = _range(step=step, value=60)
+    assert BaseWindow(driver).scroll_bar(ele, value, 'right') == expected
+    assert node.value == expected
+    # 直接设值成功, 不发送按键
+    assert 'sendKeysToElement' not in driver.commands
+
+
+def test_scroll_bar_falls_back_to_keys_for_controlled_input():
+    driver, node, ele = _range(controlled=True, value=60)
+    assert BaseWindow(driver).scroll_bar(ele, 42, 'right', pause=0) == 42.0
+    assert node.value == 42.0
+    # 一次按键置零, 一次发送全部按键
+    assert driver.commands['sendKeysToElement'] == 2
+    assert node.attrs['step'] == '1'
+
+
+def test_scroll_bar_rejects_bad_orientation():
+    driver, node, ele = _range()
+    with pytest.raises(ValueError):
+        BaseWindow(driver).scroll_bar(ele, 42, 'forward')
@@ -0,0 +1,29 @@
+"""窗口位置尺寸缓存: pytest case/test_window_rect.py"""
+import time
+from base import base_window
+from base.base_window import BaseWindow
+from utils.mock_driver import MockDriver
+
+
+def test_window_rect_cache_expires_after_move(monkeypatch):
+    monkeypatch.setattr(base_window, '_WINDOW_RECT_TTL', 0.2)
+    driver = MockDriver()
+    window = {'x': 0, 'y': 0, 'width': 1920, 'height': 1080}
+    reads = []
+
+    def geometry(args):
+        reads.append(dict(window))
+        return {'window': dict(window), 'rects': []}
+
+    driver.on_script('window.screenLeft', geometry)
+    page = BaseWindow(driver)
+    assert page.get_window_rect()['x'] == 0
+
+    # 窗口移动后, 有效期内仍使用缓存, 不传 cached 时过期后读取新位置
+    window['x'] = 200
+    assert page.get_window_rect()['x'] == 0
+    assert page.get_window_rect(cached=False)['x'] == 200
+    window['width'] = 1280
+    time.sleep(0.25)
+    assert page.get_window_rect()['width'] == 1280
+    assert len(reads) == 3
@@ -1,5 +1,5 @@
 from selenium.webdriver.common.by import By
-from base.base_window import BaseWindow
+from base.base_window import BaseWindow, Until
 from utils.read_config import config
 from utils.common import common
 from utils.utils import util
@@ -8,7 +8,7 @@ from utils.utils import util
 class AddDeviceWindow(BaseWindow):
 
     """ Get current page settings"""
-    _data = config.get_page_data(source='selectors')
+    _data = config.get_page_data(tier='add_device_window', source='selectors')
 
     def select_device_by_name(
         self,
@@ -26,7 +26,7 @@ class AddDeviceWindow(BaseWindow):
         """
 
         try:
-            # if name in self._device_statuses['ACTIVE']:
+            # if name in self._devices['ACTIVE']:
             #     raise ValueError(
             #         common.I18n['_error_msg']['_device_already_active']
             #     )
@@ -140,7 +140,8 @@ class AddDeviceWindow(BaseWindow):
                 )
                 if e.text == common.I18n['_connect_fail']:
                     self.click_on_element(
-                        selector=self._data['_close_login_window']
+                        selector=self._data['_close_login_window'],
+                        until=Until.window_closed()
                     )
                 return False, e.text
             except:
@@ -161,7 +162,8 @@ class AddDeviceWindow(BaseWindow):
         try:
             self.click_on_element(
                 selector=self._data['_close_btn_selector'],
-                timeout=0.5
+                timeout=0.5,
+                until=Until.window_closed(timeout=self._timeout)
             )
             return True, ''
         except BaseException as err:
@@ -176,7 +178,8 @@ class AddDeviceWindow(BaseWindow):
         try:
             self.click_on_element(
                 selector=self._data['_close_login_window'],
-                timeout=0.5
+                timeout=0.5,
+                until=Until.window_closed(timeout=self._timeout)
             )
             return True, ''
         except BaseException as err:
@@ -0,0 +1,100 @@
+"""设备列表快照, 通过一次 execute_script 读取设备列表中所有设备的名称、状态、按钮及卡片元素"""
+from typing import Dict, Iterator, List
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+# 在页面中一次性收集设备列表信息, 文本取 innerText 并去除首尾空白, 与 WebElement.text 保持一致
+_SNAPSHOT_SCRIPT = """
+var sel = arguments[0];
+function text(root, s) {
+    var e = root.querySelector(s);
+    return e ? (e.innerText || '').trim() : '';
+}
+var items = document.querySelectorAll(sel.list);
+var ret = [];
+for (var i = 0; i < items.length; i++) {
+    var li = items[i];
+    var buttons = Array.prototype.slice.call(li.querySelectorAll(sel.button));
+    var sd = li.querySelector(sel.sd);
+    ret.push({
+        name: text(li, sel.name),
+        status: text(li, sel.status),
+        element: li,
+        card: li.querySelector(sel.card),
+        buttons: buttons,
+        titles: buttons.map(function (b) { return b.getAttribute('title') || ''; }),
+        sd: sd,
+        sd_title: sd ? (sd.getAttribute('title') || '') : ''
+    });
+}
+return ret;
+"""
+
+
+class DeviceItem:
+    """设备列表中的单个设备"""
+
+    def __init__(self, raw: dict) -> None:
+        self.name: str = raw['name']  # 设备名称
+        self.status: str = raw['status']  # 设备状态文本
+        self.element: WebElement = raw['element']  # 设备列表项 li.list-item
+        self.card: WebElement = raw['card']  # 设备卡片
+        self.buttons: List[WebElement] = raw['buttons']  # 设备按钮
+        self.button_titles: List[str] = raw['titles']  # 设备按钮标题, 与 buttons 一一对应
+        self.sd: WebElement = raw['sd']  # sd卡按钮
+        self.sd_title: str = raw['sd_title']  # sd卡按钮标题
+
+    def __repr__(self) -> str:
+        return f"DeviceItem(name={self.name!r}, status={self.status!r})"
+
+
+class DeviceListSnapshot:
+    """
+        设备列表快照
+
+        一次 WebDriver 调用取回所有设备的信息, 替代逐个设备调用 get_element_text 的方式
+    """
+
+    def __init__(self, items: List[DeviceItem]) -> None:
+        self._items = items
+        self._index: Dict[str, DeviceItem] = {}
+        for item in items:
+            # 与逐个遍历的行为一致, 同名设备以第一个为准
+            self._index.setdefault(item.name, item)
+
+    @classmethod
+    def take(
+        cls,
+        driver: WebDriver,
+        selectors: dict
+    ) -> 'DeviceListSnapshot':
+        """
+            获取设备列表快照
+
+            参数:
+                - driver: WebDriver
+                - selectors: 选择器, 需包含 list|name|status|button|card|sd 字段, 均为 CSS 选择器
+
+            返回值:
+                - DeviceListSnapshot: 设备列表快照
+        """
+        raw = driver.execute_script(_SNAPSHOT_SCRIPT, selectors) or []
+        return cls([DeviceItem(r) for r in raw])
+
+    def names(self) -> List[str]:
+        """设备名称列表"""
+        return [item.name for item in self._items]
+
+    def get(self, name: str) -> DeviceItem:
+        """通过设备名称获取设备, 不存在返回 None"""
+        return self._index.get(name)
+
+    def statuses(self) -> Dict[str, str]:
+        """设备名称 -> 设备状态文本"""
+        return {name: item.status for name, item in self._index.items()}
+
+    def __iter__(self) -> Iterator[DeviceItem]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
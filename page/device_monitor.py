@@ -0,0 +1,139 @@
+"""设备列表后台监控, 页面内 MutationObserver 标记设备列表变化, 后台线程低频读取并更新设备状态登记"""
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from selenium.common import InvalidSessionIdException, WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+from urllib3.exceptions import HTTPError
+from utils.device_registry import DeviceRegistry
+from utils.read_config import config
+
+# 首次执行时在页面中安装 MutationObserver, 每次 DOM 变化计数加一;
+# 计数与上次读取一致时直接返回, 否则返回所有设备的名称与状态文本(同名设备以第一个为准).
+# 当前窗口没有设备列表(如切换到了其他窗口)时返回 null
+_MONITOR_SCRIPT = """
+var sel = arguments[0], seen = arguments[1], w = window;
+if (!document.querySelector(sel.root)) return null;
+if (!w.__reoDeviceMonitor) {
+    // 以页面加载时间作为计数初值, 页面刷新后不会与上次读取的计数相同
+    var m = w.__reoDeviceMonitor = {dirty: Date.now()};
+    new MutationObserver(function () { m.dirty++; }).observe(document.documentElement, {
+        childList: true, subtree: true, characterData: true
+    });
+}
+var dirty = w.__reoDeviceMonitor.dirty;
+if (dirty === seen) return {dirty: dirty};
+function text(root, s) {
+    var e = root.querySelector(s);
+    return e ? (e.innerText || '').trim() : '';
+}
+var items = document.querySelectorAll(sel.list), statuses = {};
+for (var i = 0; i < items.length; i++) {
+    var name = text(items[i], sel.name);
+    if (!(name in statuses)) statuses[name] = text(items[i], sel.status);
+}
+return {dirty: dirty, statuses: statuses};
+"""
+
+
+class DeviceMonitor:
+    """
+        设备列表后台监控
+
+        - 后台线程每隔 `interval` 执行一次很短的脚本, 设备列表没有变化时不读取列表
+        - 列表变化时更新 `DeviceRegistry`, 由登记通知订阅者并唤醒 `wait_for`
+        - 监控自身不使用长时间阻塞的异步脚本
+        - 限制: chromedriver 对同一会话的命令串行执行, 后台读取与主线程的命令互相排队, 并不能让会话空闲;
+          主线程执行阻塞的异步脚本(如元素等待)时可通过 `paused` 暂停读取, 避免读取排在其后、拖慢等待结束后的下一条命令
+
+        eg:
+            with DeviceMonitor(driver, selectors, registry):
+                registry.wait_for(['E1 Pro'], 'ACTIVE', timeout=30)
+    """
+
+    def __init__(
+        self,
+        driver: WebDriver,
+        selectors: dict,
+        registry: DeviceRegistry,
+        interval: float = None
+    ) -> None:
+        """
+            参数:
+                - driver: WebDriver
+                - selectors: 选择器, 需包含 root|list|name|status 字段, 均为 CSS 选择器
+                - registry: 待更新的设备状态登记
+                - interval: 读取间隔(秒), 默认为 global.yml 的 device_monitor_interval
+        """
+        self._driver = driver
+        self._selectors = selectors
+        self._registry = registry
+        self._interval = float(config.get_data('device_monitor_interval', 0.5) if interval is None else interval)
+        self._seen: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._paused = 0
+        self._pause_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def poll(self) -> bool:
+        """
+            读取一次设备列表, 可在未启动后台线程时直接调用
+
+            返回值:
+                - bool: 设备列表是否有变化
+        """
+        ret = self._driver.execute_script(_MONITOR_SCRIPT, self._selectors, self._seen)
+        if not ret or 'statuses' not in ret:
+            return False
+        self._seen = ret['dirty']
+        self._registry.update(ret['statuses'])
+        return True
+
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """暂停后台读取(可嵌套, 可在多个线程中使用), 已经发出的读取不受影响"""
+        with self._pause_lock:
+            self._paused += 1
+        try:
+            yield
+        finally:
+            with self._pause_lock:
+                self._paused -= 1
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self._paused:
+                self._stop.wait(self._interval)
+                continue
+            try:
+                self.poll()
+            except (InvalidSessionIdException, HTTPError, ConnectionError):
+                # 客户端已关闭(driver.quit 之后连接被拒绝, urllib3 抛出 MaxRetryError 等)
+                break
+            except WebDriverException:
+                # 页面刷新、窗口切换等瞬时错误, 下次重试
+                self._seen = None
+            self._stop.wait(self._interval)
+
+    def start(self) -> 'DeviceMonitor':
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='device-monitor', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(self._interval + 5)
+        self._thread = None
+
+    def __enter__(self) -> 'DeviceMonitor':
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
@@ -1,15 +1,21 @@
 """组合基础窗口提供的能力，提供操作主窗口元素的能力"""
 import time
-from typing import List
+from typing import List, Set
 from utils.read_config import config
 from utils.common import common
-from base.base_window import BaseWindow
+from base.base_window import BaseWindow, Until
+from selenium.common import WebDriverException
 from selenium.webdriver.common.by import By
 from page.add_device_window import AddDeviceWindow
+from page.device_list import DeviceListSnapshot
+from page.device_monitor import DeviceMonitor
 
 
 class MainWindow(BaseWindow):
-    _data = config.get_page_data(source='selectors')
+    _data = config.get_page_data(tier='main_window', source='selectors')
+    _awake_timeout = config.get_data('device_awake_timeout', 60)  # 唤醒设备的总超时时间
+    _retry_interval = config.get_data('device_retry_interval', 5)  # 唤醒设备时重复点击重试按钮的间隔
+    _date_header_sel = _data['_date_picker_header']  # 回放日期选择器的月份标题
 
     _mappings = {
         f"{common.I18n['_stream_mode']['high']}": 'high',
@@ -24,32 +30,50 @@ class MainWindow(BaseWindow):
         try:
             self.click_on_element(
                 selector=self._data['_add_device_selector'],
-                by=By.CSS_SELECTOR
+                by=By.CSS_SELECTOR,
+                until=Until.new_window()
             )
             return True, ''
         except BaseException as err:
             return False, str(err)
 
+    def get_device_snapshot(self, wait: bool = True) -> DeviceListSnapshot:
+        """
+            获取设备列表快照, 一次调用取回所有设备的名称、状态、按钮及卡片元素
+
+            参数:
+                - wait: 设备列表为空时是否等待列表出现, 默认 True, 超时抛出 TimeoutException
+
+            返回值:
+                - DeviceListSnapshot: 设备列表快照
+        """
+        selectors = {
+            'list': self._data['_device_list_selector'],
+            'name': self._data['_device_list_item_name'],
+            'status': self._data['_device_list_item_status'],
+            'button': self._data['_device_btn_selector'],
+            'card': self._data['_device_card_selector'],
+            'sd': self._data['_sd_card_btn_selector']
+        }
+        snapshot = DeviceListSnapshot.take(self._driver, selectors)
+        if snapshot or not wait:
+            return snapshot
+
+        # 列表尚未渲染, 等待列表项出现后重新获取
+        self.find_elements_by_selector(
+            selector=self._data['_device_list_selector'],
+            by=By.CSS_SELECTOR
+        )
+        return DeviceListSnapshot.take(self._driver, selectors)
+
     def get_device_list(self) -> List[str]:
         """
             获取设备列表
             返回值:
                 - List[str]: 设备名称列表
         """
-        res = []
         try:
-            device_list = self.find_elements_by_selector(
-                selector=self._data['_device_list_selector'],
-                by=By.CSS_SELECTOR
-            )
-            for d in device_list:
-                device_name = self.get_element_text(
-                    selector=self._data['_device_list_item_name'],
-                    by=By.CSS_SELECTOR,
-                    element=d
-                )
-                res.append(device_name)
-            return res
+            return self.get_device_snapshot().names()
         except BaseException as err:
             # self._logger.error('获取设备列表失败: ' + str(err))
             return []
@@ -67,66 +91,46 @@ class MainWindow(BaseWindow):
                 (WebElement, str): 成功执行返回选择的元素, 错误信息为空, 否则返回None与错误信息
         """
         try:
-            device_list = self.find_elements_by_selector(
-                selector=self._data['_device_list_selector'],
-                by=By.CSS_SELECTOR
-            )
+            device = self.get_device_snapshot().get(name)
+            if not device:
+                raise ValueError(
+                    common.I18n['_error_msg']['_element_not_found']
+                )
+
             valid_btn_txt: str = ''
             match area:
                 case 'sd':
-                    selector = self._data['_sd_card_btn_selector']
+                    item, title = device.sd, device.sd_title
                     valid_btn_txt = 'SD Card'
                 case 'card':
-                    selector = self._data['_device_card_selector']
+                    item, title = device.card, ''
                 case _:
-                    selector = self._data['_device_btn_selector']
+                    item = device.buttons[0] if device.buttons else None
+                    title = device.button_titles[0] if device.buttons else ''
                     valid_btn_txt = common.I18n['_setting']
 
-            target = None
-            for d in device_list:
-
-                device_name = self.get_element_text(
-                    selector=self._data['_device_list_item_name'],
-                    by=By.CSS_SELECTOR,
-                    element=d
-                )
-
-                try:
-                    item = self.find_element_by_selector(
-                        selector=selector,
-                        by=By.CSS_SELECTOR,
-                        element=d,
-                        wait_attr=valid_btn_txt and 'title' or 'class',
-                        timeout=1
-                    )
-                except:
-                    continue
-
-                if device_name == name:
-                    if valid_btn_txt and item.get_attribute('title') != valid_btn_txt:
-                        raise ValueError(
-                            common.I18n['_error_msg']['_not_active_device']
-                        )
-                    self.mouse_move_to_element(item)
-                    item.click()
-                    target = item
-                    break
-
-            if not target:
+            if not item:
                 raise ValueError(
                     common.I18n['_error_msg']['_element_not_found']
                 )
+            if valid_btn_txt and title != valid_btn_txt:
+                raise ValueError(
+                    common.I18n['_error_msg']['_not_active_device']
+                )
+            self.mouse_move_to_element(item)
+            item.click()
 
             # 判断设备状态
             status = self.get_device_status(name=name)
             if status == common.I18n['_e_device_status']['WRONG_PASS']:
                 self.switch_to_window(common.EWindow.DEVICE)
                 self.click_on_element(
-                    selector=self._data['_close_login_pannel']
+                    selector=self._data['_close_login_pannel'],
+                    until=Until.window_closed()
                 )
                 self.switch_to_window(common.EWindow.MAIN)
 
-            return target, ''
+            return item, ''
 
         except BaseException as err:
             return None, str(err)
@@ -156,7 +160,8 @@ class MainWindow(BaseWindow):
                     self.switch_to_window(common.EWindow.DEVICE)
 
                     self.click_on_element(
-                        selector=self._data['_confirm_remove_device_btn']
+                        selector=self._data['_confirm_remove_device_btn'],
+                        until=Until.window_closed()
                     )
 
                     self.switch_to_window(common.EWindow.MAIN)
@@ -168,113 +173,120 @@ class MainWindow(BaseWindow):
 
     def switch_to_add_device_window(self) -> AddDeviceWindow:
         """获取添加设备窗口"""
-        return AddDeviceWindow(self._driver, self._driver.window_handles[1])
+        return AddDeviceWindow(self._driver, self._driver.window_handles[1], devices=self._devices)
 
     def get_device_status(self, name: str) -> str:
-
-        _devices = set()
+        """
+            获取设备状态, 同时刷新设备状态登记
+            参数:
+                - name: 设备名称
+            返回值:
+                - str: 设备状态文本, 设备不存在时返回 OTHER 对应的文本
+        """
         try:
-            res = None
-            device_list = self.find_elements_by_selector(
-                selector=self._data['_device_list_selector'],
-                by=By.CSS_SELECTOR
-            )
-
-            for d in device_list:
-
-                device_name = self.get_element_text(
-                    selector=self._data['_device_list_item_name'],
-                    by=By.CSS_SELECTOR,
-                    element=d
-                )
+            return self._update_device_statuses(self.get_device_snapshot(), name)
+        except BaseException as err:
+            raise ValueError(err)
 
-                _devices.add(device_name)
+    def _update_device_statuses(self, snapshot: DeviceListSnapshot, name: str = None) -> str:
+        """
+            根据设备列表快照刷新设备状态登记
+            参数:
+                - snapshot: 设备列表快照
+                - name: 需要返回状态的设备名称
+            返回值:
+                - str: 设备状态文本, 设备不存在时返回 OTHER 对应的文本
+        """
+        self._devices.update(snapshot.statuses())
+        return self._devices.status_text(name)
 
-                device_status = self.get_element_text(
-                    selector=self._data['_device_list_item_status'],
-                    by=By.CSS_SELECTOR,
-                    element=d
-                )
+    def start_device_monitor(self) -> DeviceMonitor:
+        """
+            启动设备列表后台监控, 持续更新设备状态登记, 同一登记只启动一个监控
 
-                for k in self._device_statuses.keys():
-                    if device_status == common.I18n['_e_device_status'][k]:
-                        self._device_statuses[k].add(device_name)
-                    else:
-                        if device_name in self._device_statuses[k].copy():
-                            self._device_statuses[k].remove(device_name)
+            返回值:
+                - DeviceMonitor: 已启动的监控
+        """
+        monitor = self._devices.monitor
+        if monitor is None:
+            monitor = self._devices.monitor = DeviceMonitor(
+                driver=self._driver,
+                selectors={
+                    'root': self._data['_device_list_root_selector'],
+                    'list': self._data['_device_list_selector'],
+                    'name': self._data['_device_list_item_name'],
+                    'status': self._data['_device_list_item_status']
+                },
+                registry=self._devices
+            )
+        return monitor.start()
 
-                if device_name == name:
-                    res = device_status
-            return res if res else common.I18n['_e_device_status']['OTHER']
+    def stop_device_monitor(self) -> None:
+        """停止设备列表后台监控"""
+        if self._devices.monitor is not None:
+            self._devices.monitor.stop()
 
-        except BaseException as err:
-            raise ValueError(err)
-        finally:
-            for s, devices in self._device_statuses.copy().items():
-                for d in devices:
-                    if d not in _devices:
-                        self._device_statuses[s].remove(d)
-            self._logger.debug('设备状态检测: ' + str(self._device_statuses))
-
-    def attempt_awake_devices(self, devices: List[str] = []) -> None:
+    def attempt_awake_devices(self, devices: List[str] = [], timeout: float = None) -> Set[str]:
         """
             尝试唤醒设备
+
+            一次点击所有待唤醒设备的重试按钮, 由后台监控推送状态变化, 在截止时间内等待全部连接;
+            每隔 `device_retry_interval` 秒对仍未连接且显示重试按钮的设备再次点击
+
             参数:
-                - devices: 尝试唤醒的设备名称列表
+                - devices: 尝试唤醒的设备名称列表, 为空时唤醒全部设备
+                - timeout: 总超时时间, 默认为 global.yml 的 device_awake_timeout
+
+            返回值:
+                - Set[str]: 超时仍未连接的设备, 全部连接时为空集合
+
+            注: 读取设备列表失败等错误直接抛出
         """
+        snapshot = self.get_device_snapshot()
+        self._update_device_statuses(snapshot)
+        pending = {n for n in snapshot.names() if devices == [] or n in devices} - self._devices.names('ACTIVE')
+        if not pending:
+            return pending
+
+        owned = not (self._devices.monitor and self._devices.monitor.running)
+        self.start_device_monitor()
+        deadline = time.monotonic() + (timeout or self._awake_timeout)
         try:
-            # 获取设备列表元素
-            device_list = self.find_elements_by_selector(
-                selector=self._data['_device_list_selector'],
-                by=By.CSS_SELECTOR
-            )
-            # 遍历设备列表
-            for d in device_list:
-                # 获取设备名称
-                device_name = self.get_element_text(
-                    selector=self._data['_device_list_item_name'],
-                    by=By.CSS_SELECTOR,
-                    element=d
-                )
-                i = 0
-                # 如果设备列表为空，或者当前设备在指定的设备列表中
-                if devices == [] or device_name in devices:
-                    # 在规定的尝试次数内进行尝试
-                    while self.get_device_status(device_name) != common.I18n['_e_device_status']['ACTIVE']:
-                        i += 1
-                        sl = self.find_elements_by_selector(
-                            selector=self._data['_device_btn_selector'],
-                            by=By.CSS_SELECTOR,
-                            element=d
-                        )
-                        time.sleep(1)
-                        # 遍历设备的按钮并点击
-                        for se in sl:
-                            self._logger.debug(
-                                '尝试唤醒设备: {}-第{}次'.format(device_name, i)
-                            )
-                            if se.get_attribute('title') == common.I18n['_retry']:
+            while pending:
+                for name in pending:
+                    device = snapshot.get(name)
+                    if not device:
+                        continue
+                    for title, se in zip(device.button_titles, device.buttons):
+                        if title == common.I18n['_retry']:
+                            try:
                                 se.click()
-                        # 如果超过设定的尝试次数，抛出 TimeoutError
-                        if i >= self._timeout:
-                            raise TimeoutError(
-                                f"{device_name} - {common.I18n['_error_msg']['_retry_exceed_limit']} - 已重试{i}次"
-                            )
-
-        except BaseException as err:
-            pass
-            # self._logger.debug('唤醒设备错误: {}'.format(err))
+                            except WebDriverException:
+                                # 列表已重新渲染, 下一轮使用新的快照
+                                pass
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                pending = self._devices.wait_for(pending, 'ACTIVE', min(self._retry_interval, remaining))
+                if pending:
+                    snapshot = self.get_device_snapshot(wait=False)
+        finally:
+            if owned:
+                self.stop_device_monitor()
+        return pending
 
     def clear_all_devices(self):
         try:
             self.click_on_element(
                 selector=self._data['_clear_all_devices'],
-                by=By.CSS_SELECTOR
+                by=By.CSS_SELECTOR,
+                until=Until.new_window()
             )
             self.switch_to_window(common.EWindow.DEVICE)
             self.click_on_element(
                 selector=self._data['_clear_all_device_confirm_btn'],
-                by=By.CSS_SELECTOR
+                by=By.CSS_SELECTOR,
+                until=Until.window_closed()
             )
             self.switch_to_window(common.EWindow.MAIN)
             return True
@@ -5,6 +5,7 @@ from selenium.webdriver.remote.webdriver import WebDriver
 from page.main_window import MainWindow
 from utils.driver import driver
 from base.base import BaseWF
+from utils.lazy import Lazy
 
 
 class ReoWF(BaseWF):
@@ -14,8 +15,8 @@ class ReoWF(BaseWF):
 
     def __init__(self, driver: WebDriver, window_handle: str = '') -> None:
         super().__init__(driver, window_handle)
-        self._mainwf = MainWF(self._driver)  # self._driver 是 BaseWindow 类的一个实例变量，它在该类的构造函数 __init__ 中被初始化。
-        self._mainwindow = MainWindow(self._driver)
+        self._mainwf = MainWF(self._driver, devices=self._devices)  # self._driver 是 BaseWindow 类的一个实例变量，它在该类的构造函数 __init__ 中被初始化。
+        self._mainwindow = MainWindow(self._driver, devices=self._devices)
 
     def attempt_login_by_device_uid(
             self,
@@ -47,5 +48,11 @@ class ReoWF(BaseWF):
         return self._mainwindow.clear_all_devices()
 
 
-web_driver = driver.start()  # driver.start() 返回一个 WebDriver 对象。
-Reo = ReoWF(web_driver)
+def create_reo() -> ReoWF:
+    """启动客户端并创建 ReoWF"""
+    web_driver = driver.start()  # driver.start() 返回一个 WebDriver 对象。
+    return ReoWF(web_driver)
+
+
+# 首次调用 Reo 的方法时才启动客户端, 导入(如 pytest --collect-only)不会启动客户端
+Reo = Lazy(create_reo)
@@ -0,0 +1,233 @@
+"""
+    产物存储(内容寻址), 用于将抓拍/录像/邮件附件收集到 outcome/
+
+    - 对象按 sha256 存放于 <root>/<前2位>/<sha256>, 相同内容跨运行只保存一份
+    - 产物路径(如 outcome/image/xxx.jpg)优先硬链接到对象, 其次 reflink(写时复制), 最后分块复制
+    - 源文件入库: 调用方保证源文件不再改写时直接硬链接; 否则 reflink/clonefile(写时复制, 不复制数据),
+      不支持时分块复制并在复制过程中计算 sha256, 每个字节只读一次; 非硬链接时客户端之后原地改写源文件不会影响已入库的对象
+    - Windows 没有可用的克隆接口(ReFS block clone 需要簇对齐与稀疏文件, 暂不支持), 可变的源文件为一次分块复制
+"""
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+from typing import BinaryIO
+from utils.common import common
+from utils.read_config import config
+
+# 分块读写大小, 避免整个录像文件读入内存
+_CHUNK = 1024 * 1024
+
+# Linux FICLONE ioctl, btrfs/xfs 等支持 reflink 的文件系统可用
+_FICLONE = 0x40049409
+
+
+def _ficlone(src: str, dst: str) -> bool:
+    """Linux FICLONE ioctl"""
+    import fcntl
+
+    with open(src, 'rb') as fs, open(dst, 'wb') as fd:
+        fcntl.ioctl(fd.fileno(), _FICLONE, fs.fileno())
+    return True
+
+
+def _clonefile(src: str, dst: str) -> bool:
+    """macOS clonefile(2), APFS 可用, 目标文件不能已存在"""
+    import ctypes
+    import ctypes.util
+
+    libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    clonefile = getattr(libc, 'clonefile', None)
+    if clonefile is None:
+        return False
+    clonefile.argtypes = (ctypes.c_char_p, ctypes.c_char_p, ctypes.c_uint32)
+    if os.path.exists(dst):
+        os.remove(dst)
+    if clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+        raise OSError(ctypes.get_errno(), 'clonefile failed')
+    return True
+
+
+def _reflink(src: str, dst: str) -> bool:
+    """尝试写时复制(Linux FICLONE / macOS clonefile), 不支持时返回 False 且不留下目标文件"""
+    if sys.platform.startswith('linux'):
+        clone = _ficlone
+    elif sys.platform == 'darwin':
+        clone = _clonefile
+    else:
+        return False
+    try:
+        return clone(src, dst)
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+
+
+def _hardlink(src: str, dst: str) -> bool:
+    """硬链接, dst 已存在时先删除, 失败(跨文件系统等)返回 False"""
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return True
+    except OSError:
+        return False
+
+
+def _copy_digest(src: str, dst: str) -> str:
+    """分块复制并同时计算 sha256"""
+    h = hashlib.sha256()
+    with open(src, 'rb') as fs, open(dst, 'wb') as fd:
+        for chunk in iter(lambda: fs.read(_CHUNK), b''):
+            h.update(chunk)
+            fd.write(chunk)
+    return h.hexdigest()
+
+
+def _clone_or_copy(src: str, dst: str) -> str:
+    """
+        按 reflink -> 分块复制 的顺序将 src 复制到 dst, dst 与 src 不共用 inode
+
+        返回值:
+            - str: 实际使用的方式 reflink|copy
+    """
+    if _reflink(src, dst):
+        return 'reflink'
+    with open(src, 'rb') as fs, open(dst, 'wb') as fd:
+        shutil.copyfileobj(fs, fd, _CHUNK)
+    return 'copy'
+
+
+def _link_or_copy(src: str, dst: str) -> str:
+    """
+        按 硬链接 -> reflink -> 分块复制 的顺序将 src 放到 dst, 仅用于 对象 -> 产物路径
+
+        返回值:
+            - str: 实际使用的方式 link|reflink|copy
+    """
+    try:
+        os.link(src, dst)
+        return 'link'
+    except OSError:
+        pass
+    return _clone_or_copy(src, dst)
+
+
+class ArtifactStore:
+    """
+        内容寻址的产物存储
+
+        eg:
+            artifacts.put_file(src, os.path.join(common.ProjectRoot, 'outcome', 'image', 'a.jpg'))
+            artifacts.put_stream(attachment['content'], os.path.join(..., 'outcome', 'mail', 'a.jpg'))
+    """
+
+    def __init__(self, root: str = None) -> None:
+        """
+            参数:
+                - root: 对象目录, 默认为 global.yml 的 artifact_store_dir, 为空时使用 outcome/.objects
+        """
+        self._root = root or config.get_data('artifact_store_dir') or os.path.join(
+            common.ProjectRoot, 'outcome', '.objects'
+        )
+        # 最近一次入库(link|reflink|copy)与放置产物(exists|link|reflink|copy)所用的方式, 便于调试
+        self.last_ingest = None
+        self.last_method = None
+
+    @staticmethod
+    def digest(fname: str) -> str:
+        """分块计算文件 sha256"""
+        h = hashlib.sha256()
+        with open(fname, 'rb') as stream:
+            for chunk in iter(lambda: stream.read(_CHUNK), b''):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self._root, digest[:2], digest)
+
+    def _place(self, obj: str, dest: str) -> str:
+        """将对象放到产物路径, 已存在且内容相同时跳过"""
+        os.makedirs(os.path.dirname(dest) or '.', exist_ok=True)
+        if os.path.exists(dest):
+            if os.path.samefile(obj, dest):
+                self.last_method = 'exists'
+                return dest
+            os.remove(dest)
+        self.last_method = _link_or_copy(obj, dest)
+        return dest
+
+    def put_file(self, src: str, dest: str, immutable: bool = False) -> str:
+        """
+            收集文件
+
+            参数:
+                - src: 源文件
+                - dest: 产物路径
+                - immutable: 调用方保证源文件之后不会被原地改写(如已完成的抓拍图片), 此时直接硬链接源文件入库
+
+            返回值:
+                - str: 产物路径
+        """
+        # 先放到临时文件再得到摘要, 对象内容与摘要始终一致
+        os.makedirs(self._root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self._root, suffix='.tmp')
+        os.close(fd)
+        try:
+            if immutable and _hardlink(src, tmp):
+                self.last_ingest = 'link'
+                digest = self.digest(tmp)
+            elif _reflink(src, tmp):
+                # 克隆不复制数据, 只需读取一遍计算摘要
+                self.last_ingest = 'reflink'
+                digest = self.digest(tmp)
+            else:
+                self.last_ingest = 'copy'
+                digest = _copy_digest(src, tmp)
+            obj = self.object_path(digest)
+            if os.path.exists(obj):
+                os.remove(tmp)
+            else:
+                os.makedirs(os.path.dirname(obj), exist_ok=True)
+                os.replace(tmp, obj)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return self._place(obj, dest)
+
+    def put_stream(self, stream: BinaryIO, dest: str) -> str:
+        """
+            收集数据流(如邮件附件), 边写入边计算 sha256
+
+            参数:
+                - stream: 可读的二进制流
+                - dest: 产物路径
+
+            返回值:
+                - str: 产物路径
+        """
+        os.makedirs(self._root, exist_ok=True)
+        h = hashlib.sha256()
+        fd, tmp = tempfile.mkstemp(dir=self._root, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in iter(lambda: stream.read(_CHUNK), b''):
+                    h.update(chunk)
+                    out.write(chunk)
+            obj = self.object_path(h.hexdigest())
+            if os.path.exists(obj):
+                os.remove(tmp)
+            else:
+                os.makedirs(os.path.dirname(obj), exist_ok=True)
+                os.replace(tmp, obj)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return self._place(obj, dest)
+
+
+artifacts = ArtifactStore()
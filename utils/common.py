@@ -268,7 +268,9 @@ class Common:
                 '_no_minimum': '获取不到滑动条最小值',
                 '_get_click_loc_fail': '获取点击位置失败',
                 '_get_sniff_time_fail': '获取设备嗅探升级时间失败',
-                '_check_release_fail': '检查最新版本失败'
+                '_check_release_fail': '检查最新版本失败',
+                '_driver_not_cached': '离线模式下未找到缓存的驱动',
+                '_driver_checksum_mismatch': '驱动校验失败'
             },
             '_e_device_status': {
                 'ACTIVE': '已连接',
@@ -1 +1,86 @@
-"""pytest的配置文件"""
+"""
+    pytest的配置文件
+
+    并行执行: pytest -p utils.conftest -n 4 case/
+
+    - 每个 worker 通过 utils.driver.create_driver 启动独立的客户端
+    - config/case.yml 中配置了设备名(name)的用例会按设备分组, 同一设备的用例只会分配给同一个 worker,
+      保证两个 worker 不会同时操作同一台设备; 未指定 --dist 时使用 loadgroup, 显式指定 --dist load 时保留并给出警告
+    - global.yml 的 instrument 为 true 时, 每个用例的 WebDriver 命令与暂停统计写入 outcome/instrument/
+"""
+import os
+import shlex
+from typing import Dict
+import pytest
+from utils.read_config import config as reo_config
+
+
+def get_case_devices() -> Dict[str, str]:
+    """
+        读取 config/case.yml 中用例与设备的对应关系
+
+        返回值:
+            - Dict[str, str]: `模块名.用例名` 与 `用例名` -> 设备名
+    """
+    res = dict()
+    for module, cases in reo_config.get_page_data(tier='', source='case').items():
+        if not isinstance(cases, dict):
+            continue
+        for case, params in cases.items():
+            if isinstance(params, dict) and params.get('name'):
+                res[f"{module}.{case}"] = params['name']
+                res.setdefault(case, params['name'])
+    return res
+
+
+def _dist_given(config) -> bool:
+    """是否显式指定了 --dist(命令行、PYTEST_ADDOPTS 或 ini 的 addopts)"""
+    args = list(config.invocation_params.args)
+    args += shlex.split(os.environ.get('PYTEST_ADDOPTS', ''))
+    args += config.getini('addopts')
+    return any(a == '--dist' or a.startswith('--dist=') for a in args)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # 按设备分组调度需要 loadgroup 模式, -n 默认的 load 模式会忽略分组
+    if getattr(config.option, 'dist', 'no') != 'load':
+        return
+    if not _dist_given(config):
+        config.option.dist = 'loadgroup'
+    elif get_case_devices():
+        config.issue_config_time_warning(
+            pytest.PytestConfigWarning(
+                '显式指定了 --dist load, 按设备分组(xdist_group)不生效, 同一设备的用例可能分配给不同的 worker'
+            ),
+            stacklevel=2
+        )
+
+
+def pytest_collection_modifyitems(session, config, items):
+    devices = get_case_devices()
+    if not devices:
+        return
+    for item in items:
+        module = os.path.splitext(os.path.basename(str(item.fspath)))[0]
+        name = getattr(item, 'originalname', None) or item.name
+        device = devices.get(f"{module}.{name}") or devices.get(name)
+        if device:
+            item.add_marker(pytest.mark.xdist_group(name=device))
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    if not reo_config.get_data('instrument', False):
+        yield
+        return
+
+    from utils.instrument import recorder
+
+    recorder.begin(item.nodeid)
+    yield
+    summary = recorder.end()
+    print(
+        f"\n{item.nodeid}: {summary['commands']} 条命令, 命令 {summary['webdriver']}s, "
+        f"暂停 {summary['sleep']}s, 其他 {summary['other']}s"
+    )
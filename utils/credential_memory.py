@@ -0,0 +1,174 @@
+"""登录凭据记录, 按设备 UID 记住上次登录成功的用户名密码与失败过的组合, 用于调整下次尝试的顺序"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Literal, Tuple
+from utils.common import common
+from utils.read_config import config
+
+# 摘要的 PBKDF2 迭代次数, 每次排序需要对每组凭据计算一次
+_ITERATIONS = 10000
+
+
+class CredentialMemory:
+    """
+        登录凭据记录
+
+        - 每组 (uid, 用户名, 密码) 以 PBKDF2-HMAC-SHA256 摘要保存, 盐为每个缓存文件随机生成并与记录存放在一起,
+          磁盘上不出现明文密码, 也无法用预先计算的常见密码摘要反查
+        - 上次登录成功的组合排在最前, 被设备拒绝过的组合排在最后(或跳过, 见 global.yml 的 credential_skip_failed),
+          其余保持传入顺序
+        - 连接失败等与凭据无关的错误不计为失败
+        - 线程安全, 磁盘缓存为 JSON
+    """
+
+    def __init__(
+        self,
+        cache_file: str = None,
+        skip_failed: bool = None
+    ) -> None:
+        """
+            参数:
+                - cache_file: 磁盘缓存文件, 默认为 global.yml 的 credential_memory_file
+                - skip_failed: 是否跳过被拒绝过的组合, 默认为 global.yml 的 credential_skip_failed
+        """
+        self._cache_file = cache_file or config.get_data('credential_memory_file') or os.path.join(
+            common.ProjectRoot, 'outcome', 'cache', 'credentials.json'
+        )
+        self._skip_failed = bool(
+            config.get_data('credential_skip_failed', False) if skip_failed is None else skip_failed
+        )
+        self._records: Dict[str, dict] = None  # uid -> {'winner': 摘要, 'pairs': {摘要: 统计}}
+        self._salt: bytes = None  # 与 _records 一起加载
+        self._lock = threading.RLock()
+
+    def digest(self, uid: str, uname: str, passwd: str) -> str:
+        with self._lock:
+            self._load()
+            salt = self._salt
+        secret = '\0'.join((uid, uname, passwd)).encode('utf-8')
+        return hashlib.pbkdf2_hmac('sha256', secret, salt, _ITERATIONS).hex()
+
+    def _load(self) -> Dict[str, dict]:
+        if self._records is None:
+            self._records, self._salt = {}, None
+            if os.path.exists(self._cache_file):
+                try:
+                    with open(self._cache_file, encoding='utf-8') as stream:
+                        data = json.load(stream)
+                    # 旧格式(无盐 sha256)的记录无法换算为新摘要, 直接丢弃
+                    if isinstance(data, dict) and 'salt' in data:
+                        self._salt = bytes.fromhex(data['salt'])
+                        self._records = data.get('records', {})
+                except (OSError, ValueError):
+                    self._records = {}
+            if self._salt is None:
+                self._salt = os.urandom(16)
+        return self._records
+
+    def _save(self) -> None:
+        directory = os.path.dirname(self._cache_file)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as stream:
+                json.dump({'salt': self._salt.hex(), 'records': self._records}, stream)
+            os.replace(tmp, self._cache_file)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def order(
+        self,
+        uid: str,
+        unames: List[str],
+        passwds: List[str]
+    ) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+        """
+            计算尝试顺序
+
+            参数:
+                - uid: 设备uid
+                - unames: 用户名列表
+                - passwds: 密码列表
+
+            返回值:
+                - (List[(uname, passwd)], List[(uname, passwd)]): 按顺序尝试的组合, 以及跳过的组合
+        """
+        pairs = [(u, p) for u in unames for p in passwds]
+        with self._lock:
+            record = self._load().get(uid, {})
+        stats = record.get('pairs', {})
+        winner = record.get('winner')
+        keys = {pair: self.digest(uid, *pair) for pair in set(pairs)}
+
+        def rank(pair: Tuple[str, str]) -> int:
+            key = keys[pair]
+            if key == winner:
+                return 0
+            return 2 if stats.get(key, {}).get('last') == 'fail' else 1
+
+        ranked = sorted(pairs, key=rank)  # sorted 是稳定排序, 同一级别内保持传入顺序
+        if not self._skip_failed:
+            return ranked, []
+        return [p for p in ranked if rank(p) < 2], [p for p in ranked if rank(p) == 2]
+
+    def record(
+        self,
+        uid: str,
+        uname: str,
+        passwd: str,
+        result: Literal['pass', 'fail', 'error'],
+        cost: float
+    ) -> None:
+        """
+            记录一次登录尝试
+
+            参数:
+                - result: pass 登录成功 | fail 凭据被拒绝 | error 连接失败等与凭据无关的错误(不影响排序)
+                - cost: 本次尝试耗时(秒)
+        """
+        key = self.digest(uid, uname, passwd)
+        with self._lock:
+            record = self._load().setdefault(uid, {'winner': None, 'pairs': {}})
+            item = record['pairs'].setdefault(key, {'pass': 0, 'fail': 0, 'error': 0, 'last': None})
+            item[result] += 1
+            item['cost'] = round(cost, 3)
+            item['ts'] = time.time()
+            if result == 'pass':
+                item['last'] = 'pass'
+                record['winner'] = key
+            elif result == 'fail':
+                item['last'] = 'fail'
+                if record['winner'] == key:
+                    record['winner'] = None
+            try:
+                self._save()
+            except OSError:
+                # 磁盘缓存写入失败不影响登录
+                pass
+
+    def forget(self, uid: str = None) -> None:
+        """
+            清除记录
+
+            参数:
+                - uid: 待清除的设备uid, 为空时清除全部
+        """
+        with self._lock:
+            records = self._load()
+            if uid:
+                records.pop(uid, None)
+            else:
+                records.clear()
+            try:
+                self._save()
+            except OSError:
+                pass
+
+
+credentials = CredentialMemory()
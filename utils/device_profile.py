@@ -0,0 +1,151 @@
+"""设备档案缓存, 同一 UID 只请求一次 device_type_api, 电池类型与 WiFi 类型共用同一份档案"""
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict
+from utils.common import common
+from utils.read_config import config
+
+
+class DeviceProfileCache:
+    """
+        设备档案缓存
+
+        - 内存缓存 + 磁盘缓存(JSON), 均按 `device_profile_ttl` 过期
+        - 请求使用带连接池的 requests.Session, 复用与 api 服务器的连接
+        - 线程安全, 同一 UID 并发查询只会发出一次请求, 请求期间只锁定该 UID, 不阻塞其他 UID 的查询
+    """
+
+    def __init__(
+        self,
+        endpoint: str = None,
+        ttl: float = None,
+        cache_file: str = None
+    ) -> None:
+        """
+            参数:
+                - endpoint: 档案接口地址模板, `${uid}` 会被替换为设备uid, 默认为 global.yml 的 device_type_api
+                - ttl: 缓存有效期(秒), 默认为 global.yml 的 device_profile_ttl
+                - cache_file: 磁盘缓存文件, 默认为 global.yml 的 device_profile_cache
+        """
+        self._endpoint = endpoint
+        self._ttl = float(config.get_data('device_profile_ttl', 86400) if ttl is None else ttl)
+        self._cache_file = cache_file or config.get_data('device_profile_cache') or os.path.join(
+            common.ProjectRoot, 'outcome', 'cache', 'device_profile.json'
+        )
+        self._profiles: Dict[str, dict] = None  # uid -> {'ts': 获取时间, 'data': 档案}
+        self._session = None
+        self._lock = threading.RLock()  # 保护内存缓存与磁盘写入, 不在请求期间持有
+        self._uid_locks: Dict[str, threading.Lock] = {}
+
+    def _uid_lock(self, uid: str) -> threading.Lock:
+        with self._lock:
+            return self._uid_locks.setdefault(uid, threading.Lock())
+
+    def _cached(self, uid: str) -> dict:
+        with self._lock:
+            item = self._load().get(uid)
+        if item and time.time() - item['ts'] < self._ttl:
+            return item['data']
+        return None
+
+    def _get_session(self):
+        if self._session is None:
+            # 延迟导入 requests, 见 utils.utils
+            from requests import Session
+            from requests.adapters import HTTPAdapter
+
+            session = Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=2)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._session = session
+        return self._session
+
+    def _load(self) -> Dict[str, dict]:
+        if self._profiles is None:
+            self._profiles = {}
+            if os.path.exists(self._cache_file):
+                try:
+                    with open(self._cache_file, encoding='utf-8') as stream:
+                        self._profiles = json.load(stream)
+                except (OSError, ValueError):
+                    self._profiles = {}
+        return self._profiles
+
+    def _save(self) -> None:
+        directory = os.path.dirname(self._cache_file)
+        os.makedirs(directory, exist_ok=True)
+        # 临时文件名唯一, 多个进程(如 pytest-xdist 的 worker)同时写入不会互相覆盖
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as stream:
+                json.dump(self._profiles, stream)
+            os.replace(tmp, self._cache_file)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _fetch(self, uid: str) -> dict:
+        endpoint = str(self._endpoint or config.get_data('device_type_api')).replace('${uid}', uid)
+        resp = self._get_session().get(url=endpoint, timeout=10)
+        resp.raise_for_status()
+        return json.loads(resp.text)
+
+    def get(self, uid: str) -> dict:
+        """
+            获取设备档案
+
+            参数:
+                - uid: 设备uid
+
+            返回值:
+                - dict: device_type_api 返回的档案, 包含 batteryType、wifiType 等字段
+        """
+        if not uid:
+            raise ValueError(
+                f"{common.I18n['_error_msg']['_wrong_params']}: uid 不可为空"
+            )
+        data = self._cached(uid)
+        if data is not None:
+            return data
+
+        with self._uid_lock(uid):
+            # 等待锁期间其他线程可能已经取到
+            data = self._cached(uid)
+            if data is not None:
+                return data
+
+            data = self._fetch(uid)
+            with self._lock:
+                self._load()[uid] = {'ts': time.time(), 'data': data}
+                try:
+                    self._save()
+                except OSError:
+                    # 磁盘缓存写入失败不影响本次结果
+                    pass
+            return data
+
+    def invalidate(self, uid: str = None) -> None:
+        """
+            清除缓存
+
+            参数:
+                - uid: 待清除的设备uid, 为空时清除全部
+        """
+        with self._lock:
+            profiles = self._load()
+            if uid:
+                profiles.pop(uid, None)
+            else:
+                profiles.clear()
+            try:
+                self._save()
+            except OSError:
+                pass
+
+
+device_profiles = DeviceProfileCache()
@@ -0,0 +1,186 @@
+"""设备状态登记, 保存设备列表中每台设备的状态, 供窗口与工作流共享"""
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from utils.common import common
+
+# 状态变化回调: (设备名称, 原状态, 新状态), 设备新出现时原状态为 None, 从列表移除时新状态为 None
+StatusCallback = Callable[[str, Optional[str], Optional[str]], None]
+
+
+class DeviceRegistry:
+    """
+        设备状态登记
+
+        - 设备名称 -> 状态, 状态 -> 设备名称集合 两个索引, 状态为 `common.I18n['_e_device_status']` 的键
+        - 由一次设备列表快照更新, 每台设备 O(1)
+        - 线程安全, 可在多个窗口对象与后台线程之间共享
+        - 状态变化时调用订阅的回调, `wait_for` 可阻塞等待设备进入指定状态
+
+        eg:
+            registry.update(snapshot.statuses())
+            registry.names('ACTIVE')
+            registry.wait_for(['E1 Pro'], 'ACTIVE', timeout=30)
+    """
+
+    def __init__(self) -> None:
+        self._status: Dict[str, str] = {}
+        self._names: Dict[str, Set[str]] = {k: set() for k in common.I18n['_e_device_status']}
+        self._callbacks: List[StatusCallback] = []
+        self._cond = threading.Condition(threading.RLock())
+        self._version = 0
+        self.monitor = None  # 更新该登记的后台监控, 见 page.device_monitor, 同一登记只启动一个
+
+    @staticmethod
+    def status_key(text: str) -> str:
+        """状态文本 -> 状态键, 无法识别的文本为 OTHER"""
+        for k, v in common.I18n['_e_device_status'].items():
+            if v == text:
+                return k
+        return 'OTHER'
+
+    @property
+    def version(self) -> int:
+        """每次有设备状态变化时加 1"""
+        return self._version
+
+    def update(
+        self,
+        statuses: Dict[str, str],
+        complete: bool = True
+    ) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        """
+            用设备列表快照更新状态
+
+            参数:
+                - statuses: 设备名称 -> 状态文本, 见 `DeviceListSnapshot.statuses`
+                - complete: 是否为完整的设备列表, 为 True 时不在其中的设备视为已从列表移除
+
+            返回值:
+                - List[(name, old, new)]: 状态发生变化的设备
+        """
+        changes = []
+        with self._cond:
+            for name, text in statuses.items():
+                changes.extend(self._set(name, self.status_key(text)))
+            if complete:
+                for name in [n for n in self._status if n not in statuses]:
+                    changes.extend(self._set(name, None))
+            if changes:
+                self._version += 1
+                self._cond.notify_all()
+        self._emit(changes)
+        return changes
+
+    def set(self, name: str, status: Optional[str]) -> None:
+        """
+            直接设置单台设备状态
+
+            参数:
+                - name: 设备名称
+                - status: 状态键, 为 None 时移除设备
+        """
+        with self._cond:
+            changes = self._set(name, status)
+            if changes:
+                self._version += 1
+                self._cond.notify_all()
+        self._emit(changes)
+
+    def _set(self, name: str, status: Optional[str]) -> List[tuple]:
+        old = self._status.get(name)
+        if old == status:
+            return []
+        if old is not None:
+            self._names[old].discard(name)
+        if status is None:
+            self._status.pop(name, None)
+        else:
+            self._status[name] = status
+            self._names.setdefault(status, set()).add(name)
+        return [(name, old, status)]
+
+    def _emit(self, changes: List[tuple]) -> None:
+        # 回调在锁外执行, 回调中可以再读写登记
+        for cb in list(self._callbacks):
+            for change in changes:
+                try:
+                    cb(*change)
+                except BaseException:
+                    pass
+
+    def status(self, name: str) -> Optional[str]:
+        """设备状态键, 设备不在列表中返回 None"""
+        with self._cond:
+            return self._status.get(name)
+
+    def status_text(self, name: str) -> str:
+        """设备状态文本, 设备不在列表中时返回 OTHER 对应的文本"""
+        return common.I18n['_e_device_status'][self.status(name) or 'OTHER']
+
+    def names(self, status: str = None) -> Set[str]:
+        """处于指定状态的设备名称, 不指定状态时返回所有设备"""
+        with self._cond:
+            return set(self._status) if status is None else set(self._names.get(status, ()))
+
+    def __getitem__(self, status: str) -> Set[str]:
+        return self.names(status)
+
+    def __contains__(self, name: str) -> bool:
+        with self._cond:
+            return name in self._status
+
+    def subscribe(self, cb: StatusCallback) -> Callable[[], None]:
+        """
+            订阅状态变化
+
+            返回值:
+                - Callable: 调用后取消订阅
+        """
+        with self._cond:
+            self._callbacks.append(cb)
+
+        def unsubscribe() -> None:
+            with self._cond:
+                if cb in self._callbacks:
+                    self._callbacks.remove(cb)
+
+        return unsubscribe
+
+    def wait_for(
+        self,
+        names: Iterable[str],
+        status: str = 'ACTIVE',
+        timeout: float = None
+    ) -> Set[str]:
+        """
+            阻塞等待设备全部进入指定状态, 需要有其他调用方(如后台监控线程)更新登记
+
+            参数:
+                - names: 设备名称
+                - status: 状态键
+                - timeout: 超时时间(秒), 为空时一直等待
+
+            返回值:
+                - Set[str]: 超时时仍未进入该状态的设备, 全部进入时为空集合
+        """
+        names = set(names)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                pending = names - self._names.get(status, set())
+                if not pending:
+                    return pending
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return pending
+                self._cond.wait(remaining)
+
+    def clear(self) -> None:
+        """清空登记, 不触发回调"""
+        with self._cond:
+            self._status.clear()
+            for names in self._names.values():
+                names.clear()
+            self._version += 1
+            self._cond.notify_all()
@@ -1,6 +1,10 @@
+import os
+import shutil
+import time
+from urllib.request import urlopen
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
+from utils.driver_cache import DriverCache
 from utils.read_config import config
 
 """
@@ -14,51 +18,207 @@ class Driver(object):
         定义一个 Driver 类，用于启动和关闭谷歌浏览器驱动
     """
 
-    # 初始化 Driver 对象。它接受两个参数：version 是 Chrome 驱动的版本，path 是 谷歌浏览器(在这里是Reolink客户端) 可执行文件的路径。
-    def __init__(self, version: str, path: str) -> None:
+    # 初始化 Driver 对象。version 是 Chrome 驱动的版本，path 是 谷歌浏览器(在这里是Reolink客户端) 可执行文件的路径。
+    # user_data_dir 为客户端用户数据目录, debugging_port 为客户端远程调试端口, 并行执行时每个 worker 各不相同。
+    def __init__(
+        self,
+        version: str,
+        path: str,
+        user_data_dir: str = None,
+        debugging_port: int = None
+    ) -> None:
         # 将传递进来的版本号和路径保存在对象的属性中。
         self._version = version
         self._path = path
+        self._user_data_dir = user_data_dir or config.app_data_dir
+        self._debugging_port = debugging_port
         self._driver = None  # 初始化一个属性 _driver 为 None，用于保存 Chrome WebDriver 的实例。
+        self.startup_timings = {}  # 启动各阶段耗时(秒): resolve 驱动解析, service 驱动服务启动, launch 客户端启动, attach 连接已运行客户端
+        self._reuse = bool(config.get_data('reuse_client', False))  # 复用已运行的客户端, 见 global.yml
 
     # 类的方法，用于启动 Chrome WebDriver
     def start(self):
         # 如果 _driver 已经存在（即不为 None），直接返回现有的实例，避免重复启动。
         if self._driver:
             return self._driver
-        # 使用 ChromeDriverManager 管理器来安装 Chrome 驱动，并创建一个 ChromeService 对象，用于启动 Chrome WebDriver
-        # ChromeDriverManager是一个用于管理 ChromeDriver 的 Python 库。version=self._version 是在安装 ChromeDriver 时指定的版本。
-        # driver_manager = ChromeDriverManager(version=self._version)
-        driver_manager = ChromeDriverManager(version=self._version)
-
-        # ChromeDriverManager 的 install() 方法会下载并返回 ChromeDriver 的实际可执行文件的路径。
-        driver_path = driver_manager.install()
+        timings = self.startup_timings = {}
+        # 优先使用本地缓存的 ChromeDriver(按 chromium_version 存放并校验 sha256), 未命中时才通过 ChromeDriverManager 下载。
+        # 离线模式(driver_offline)下缓存缺失直接报错, 不访问网络。
+        t = time.perf_counter()
+        driver_path = DriverCache(self._version).resolve()
+        timings['resolve'] = time.perf_counter() - t
         print("驱动路径：" + driver_path)
 
+        # 复用模式下优先连接已运行的客户端, 健康检查不通过时关闭该客户端并重新启动
+        address = self._reuse and self.debugger_address()
+        if address and self._client_alive(address):
+            self._driver = self._create(driver_path, self._attach_options(address))
+            if self._healthy():
+                timings['attach'] = timings.pop('launch')
+                return self._ready()
+            self._close_client()
+
+        self._driver = self._create(driver_path, self._launch_options())
+        return self._ready()
+
+    def _create(self, driver_path: str, wd_options: webdriver.ChromeOptions) -> webdriver.Chrome:
+        """启动驱动服务并创建会话, 分别统计驱动服务启动(service)与客户端启动/连接(launch)耗时"""
+        timings = self.startup_timings
         # 创建 Chrome 驱动器服务.ChromeService 类，它是 ChromeDriver 的服务类。executable_path 参数是 ChromeDriver 的可执行文件路径
         wd_service = ChromeService(executable_path=driver_path)
 
-        # wd_service = ChromeService(executable_path=ChromeDriverManager(version=self._version).install())
+        # webdriver.Chrome 内部会先启动驱动服务再启动客户端, 包装 start 以分别统计两个阶段的耗时
+        service_start = wd_service.start
+
+        def timed_service_start():
+            st = time.perf_counter()
+            service_start()
+            timings['service'] = time.perf_counter() - st
 
+        wd_service.start = timed_service_start
+
+        t = time.perf_counter()
+        wd = webdriver.Chrome(service=wd_service, options=wd_options)
+        timings['launch'] = time.perf_counter() - t - timings.get('service', 0)
+        return wd
+
+    def _launch_options(self) -> webdriver.ChromeOptions:
+        """冷启动客户端的参数"""
         wd_options = webdriver.ChromeOptions()  # 创建 Chrome WebDriver 的参数配置对象，。
         wd_options.binary_location = self._path  # 设置谷歌浏览器可执行文件的路径(在这里其实是reolink客户端的.exe执行路径)
-        wd_options.add_argument('--user-data-dir=' + config.app_data_dir)  # 配置启动参数，指定用户数据目录。运行测试时，Chrome 将使用该目录中的用户数据。
+        wd_options.add_argument('--user-data-dir=' + self._user_data_dir)  # 配置启动参数，指定用户数据目录。运行测试时，Chrome 将使用该目录中的用户数据。
+        port = self._debugging_port or (self._reuse and self._default_port())
+        if port:
+            wd_options.add_argument(f'--remote-debugging-port={port}')  # 指定远程调试端口, 避免多个客户端冲突, 复用模式下供后续会话连接
+        if self._reuse:
+            wd_options.add_experimental_option('detach', True)  # 驱动服务退出后保留客户端进程
         wd_options.add_argument('--disable-extensions')  # 禁用Chrome浏览器的扩展插件功能，避免插件对自动化测试造成干扰。
         wd_options.add_argument('--log-level=3')  # 设置浏览器的日志级别为 error，只输出错误级别及以上的日志
         wd_options.add_argument('--disable-logging')  # 禁用日志生成
+        return wd_options
+
+    def _attach_options(self, address: str) -> webdriver.ChromeOptions:
+        """连接已运行客户端的参数"""
+        wd_options = webdriver.ChromeOptions()
+        wd_options.debugger_address = address
+        return wd_options
 
-        self._driver = webdriver.Chrome(service=wd_service, options=wd_options)
+    def _ready(self) -> webdriver.Chrome:
+        # 元素等待会在页面中执行异步脚本, 脚本超时时间需覆盖元素等待时间
+        self._driver.set_script_timeout(config.get_data('script_timeout', 30))
+        if config.get_data('instrument', False):
+            # 延迟导入, 未开启统计时不加载
+            from utils.instrument import recorder
+
+            recorder.install(self._driver)
+        print("启动耗时：" + ", ".join(f"{k} {v:.3f}s" for k, v in self.startup_timings.items()))
         return self._driver
 
+    def _default_port(self) -> int:
+        return int(config.get_data('remote_debugging_port', 9222))
+
+    def debugger_address(self) -> str:
+        """已运行客户端的调试地址, 未配置 debugger_address 时使用 127.0.0.1:<远程调试端口>"""
+        if self._debugging_port is None and config.get_data('debugger_address'):
+            return config.get_data('debugger_address')
+        return f"127.0.0.1:{self._debugging_port or self._default_port()}"
+
+    @staticmethod
+    def _client_alive(address: str) -> bool:
+        """调试端口是否有客户端在监听"""
+        try:
+            with urlopen(f"http://{address}/json/version", timeout=1) as resp:
+                return resp.status == 200
+        except (OSError, ValueError):
+            return False
+
+    def _healthy(self) -> bool:
+        """
+            健康检查: 会话可执行脚本且主窗口存在, 通过后回到主窗口
+        """
+        try:
+            handles = self._driver.window_handles
+            if not handles:
+                return False
+            self._driver.switch_to.window(handles[0])
+            return self._driver.execute_script('return document.readyState') == 'complete'
+        except BaseException:
+            return False
+
+    def _close_client(self) -> None:
+        """关闭已连接的(不健康的)客户端"""
+        try:
+            self._driver.execute_cdp_cmd('Browser.close', {})
+        except BaseException:
+            pass
+        try:
+            self._driver.service.stop()
+        except BaseException:
+            pass
+        self._driver = None
+
     """    
     如果 self._driver 为真（即非空，表示浏览器驱动对象存在），则执行 self._driver.quit()，关闭浏览器。
     如果 self._driver 为假（即空，表示浏览器驱动对象不存在），则不执行后续的 self._driver.quit()，因为 Python 的短路逻辑不会计算后续的表达式。
     这行代码的目的是确保在调用 quit 方法之前先检查浏览器驱动对象是否存在，以防止在空对象上调用方法而引发异常。
+    复用模式下只停止驱动服务, 保留客户端供下一个会话连接。
     """
 
     def quit(self):
+        if self._reuse:
+            self._driver and self._driver.service.stop()
+            self._driver = None
+            return
         # 调用WebDriver对象的 quit 方法。
         self._driver and self._driver.quit()  # 在 Python 中，and 是逻辑与运算符。对于 A and B，如果 A 为真，返回 B；如果 A 为假，返回 A。这是一个短路逻辑，即如果 A 为假，就不再计算 B。
 
 
-driver = Driver(version=config.chromium_version, path=config.executable_path)
+def worker_index(worker_id: str = None) -> int:
+    """
+        获取 pytest-xdist worker 序号, 未并行执行时返回 -1
+
+        参数:
+            - worker_id: worker 名称, 形如 gw0, 默认读取环境变量 PYTEST_XDIST_WORKER
+    """
+    worker_id = worker_id if worker_id is not None else os.environ.get('PYTEST_XDIST_WORKER', '')
+    if not worker_id.startswith('gw'):
+        return -1
+    return int(worker_id[2:])
+
+
+def create_driver(worker_id: str = None) -> Driver:
+    """
+        按 pytest-xdist worker 创建 Driver, 每个 worker 使用独立的客户端进程、用户数据目录与远程调试端口
+
+        - 用户数据目录: `app_data_dir` 加 `_gw{n}` 后缀, 首次使用时从 `app_data_dir` 复制(保留已添加的设备)
+        - 远程调试端口: `remote_debugging_port` + n
+
+        参数:
+            - worker_id: worker 名称, 形如 gw0, 默认读取环境变量 PYTEST_XDIST_WORKER
+
+        返回值:
+            - Driver: 未并行执行时与原有行为一致, 使用 `app_data_dir`
+    """
+    index = worker_index(worker_id)
+    if index < 0:
+        return Driver(version=config.chromium_version, path=config.executable_path)
+
+    user_data_dir = f"{config.app_data_dir.rstrip('/')}_gw{index}"
+    if not os.path.exists(user_data_dir) and os.path.exists(config.app_data_dir):
+        shutil.copytree(
+            config.app_data_dir,
+            user_data_dir,
+            ignore=shutil.ignore_patterns(
+                'Singleton*', 'lockfile', 'Cache', 'Code Cache', 'GPUCache'
+            )
+        )
+
+    return Driver(
+        version=config.chromium_version,
+        path=config.executable_path,
+        user_data_dir=user_data_dir,
+        debugging_port=int(config.get_data('remote_debugging_port', 9222)) + index
+    )
+
+
+driver = create_driver()
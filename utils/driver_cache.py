@@ -0,0 +1,117 @@
+"""chromedriver 本地缓存, 按客户端内核版本存放, 支持校验与离线模式"""
+import hashlib
+import os
+import shutil
+from utils.common import common
+from utils.read_config import config
+
+
+class DriverCache:
+    """
+        chromedriver 本地缓存
+
+        目录结构:
+            <cache_dir>/<version>/chromedriver(.exe)
+            <cache_dir>/<version>/chromedriver.sha256
+
+        - 命中缓存且校验通过时直接使用, 不访问网络
+        - 缓存缺失或校验失败时通过 webdriver_manager 下载并写入缓存, 离线模式下直接报错(缺失与校验失败分别报错)
+        - 配置了 `driver_sha256` 时以配置值为准, 否则以写入缓存时记录的 sha256 为准;
+          未配置时 .sha256 记录的是首次下载(未经校验)的文件摘要, 只能发现之后缓存文件被改动, 不能保证首次下载的文件可信
+    """
+
+    def __init__(
+        self,
+        version: str,
+        cache_dir: str = None,
+        offline: bool = None,
+        sha256: str = None
+    ) -> None:
+        self._version = str(version)
+        self._dir = os.path.join(
+            cache_dir or config.get_data('driver_cache_dir') or os.path.join(common.ProjectRoot, '.driver_cache'),
+            self._version
+        )
+        self._offline = bool(config.get_data('driver_offline', False)) if offline is None else offline
+        self._sha256 = (sha256 or config.get_data('driver_sha256') or '').lower()
+
+    @property
+    def path(self) -> str:
+        """缓存的 chromedriver 路径"""
+        name = 'chromedriver.exe' if common.ENV.get('platform') == 'Win32' else 'chromedriver'
+        return os.path.join(self._dir, name)
+
+    @staticmethod
+    def checksum(fname: str) -> str:
+        """计算文件 sha256"""
+        h = hashlib.sha256()
+        with open(fname, 'rb') as stream:
+            for chunk in iter(lambda: stream.read(1024 * 1024), b''):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _expected(self) -> str:
+        if self._sha256:
+            return self._sha256
+        sidecar = self.path + '.sha256'
+        if not os.path.exists(sidecar):
+            return ''
+        with open(sidecar, encoding='utf-8') as stream:
+            return stream.read().strip().lower()
+
+    def lookup(self) -> str:
+        """
+            查找缓存
+
+            返回值:
+                - str: 校验通过的 chromedriver 路径, 未命中返回空字符串
+        """
+        if not os.path.exists(self.path):
+            return ''
+        expected = self._expected()
+        if expected and self.checksum(self.path) != expected:
+            return ''
+        return self.path
+
+    def store(self, fname: str) -> str:
+        """
+            将下载的 chromedriver 写入缓存
+
+            参数:
+                - fname: chromedriver 路径
+
+            返回值:
+                - str: 缓存的 chromedriver 路径
+        """
+        digest = self.checksum(fname)
+        if self._sha256 and digest != self._sha256:
+            raise ValueError(
+                f"{common.I18n['_error_msg']['_driver_checksum_mismatch']}: {fname}"
+            )
+        os.makedirs(self._dir, exist_ok=True)
+        tmp = self.path + '.tmp'
+        shutil.copy2(fname, tmp)
+        os.replace(tmp, self.path)
+        with open(self.path + '.sha256', 'w', encoding='utf-8') as stream:
+            stream.write(digest)
+        return self.path
+
+    def resolve(self) -> str:
+        """
+            获取 chromedriver 路径, 优先使用缓存
+
+            返回值:
+                - str: chromedriver 路径
+        """
+        cached = self.lookup()
+        if cached:
+            return cached
+
+        if self._offline:
+            key = '_driver_checksum_mismatch' if os.path.exists(self.path) else '_driver_not_cached'
+            raise ValueError(
+                f"{common.I18n['_error_msg'][key]}: {self.path}"
+            )
+
+        from webdriver_manager.chrome import ChromeDriverManager
+        return self.store(ChromeDriverManager(version=self._version).install())
@@ -0,0 +1,284 @@
+"""
+    模拟 Reolink 客户端, 用于在没有真实客户端与设备的环境(如 Linux CI)中运行页面对象与基准测试
+
+    - 页面: asset/fake_client 下的静态 HTML/JS, 结构与 config/selectors.yml 的 main_window / add_device_window 对应,
+      包括设备列表、添加设备窗口、WiFi 与登录面板、确认弹窗, 弹窗通过 window.open 打开, 与客户端一样是独立窗口
+    - 设备后端: 本模块的 HTTP 服务, 保存设备列表与状态, 支持设置接口延迟与失败注入,
+      同时提供 device_type_api 的设备档案接口
+    - 浏览器: FakeClient.launch 启动(无头) Chromium 并打开主窗口
+
+    eg:
+        with FakeClient(devices=10, latency=0.05) as client:
+            wd = client.launch()
+            MainWindow(wd).get_device_list()
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+from utils.common import common
+from utils.read_config import config
+
+_STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'asset', 'fake_client')
+
+_CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.png': 'image/png'
+}
+
+
+class FakeClient:
+    """模拟客户端的设备后端与静态页面服务"""
+
+    def __init__(
+        self,
+        devices: int = 10,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        fail_rate: float = 0.0,
+        sleeping: float = 0.0,
+        wake_latency: float = 0.5,
+        passwd: str = '111111',
+        seed: int = 0,
+        host: str = '127.0.0.1',
+        port: int = 0
+    ) -> None:
+        """
+            参数:
+                - devices: 设备数量, 初始全部在设备列表中
+                - latency: 设备操作接口(添加/登录/删除/唤醒)的延迟(秒), 设备列表查询不加延迟
+                - jitter: 延迟的随机抖动上限(秒)
+                - fail_rate: 失败注入概率, 登录返回连接失败, 唤醒不成功
+                - sleeping: 初始处于休眠(未连接)状态的电池机比例
+                - wake_latency: 点击重试后设备连接所需时间(秒)
+                - passwd: 设备的 admin 密码
+                - seed: 随机种子, 保证同样的参数得到同样的延迟与失败序列
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.wake_latency = wake_latency
+        self.hits: Dict[str, int] = {}
+        self._rand = random.Random(seed)
+        self._lock = threading.RLock()
+        self.devices: List[dict] = []
+        for i in range(devices):
+            battery = i % 3  # EDeviceType: 0 有线, 1/2 电池机
+            self.devices.append({
+                'name': f"Cam-{i:03d}",
+                'uid': f"95270000{i:08d}",
+                'battery': battery,
+                'wifi': common.EDeviceWifiType.WIRED_ONLY.value if battery == 0 else common.EDeviceWifiType.WIFI_ALL.value,
+                'credentials': ('admin', passwd),
+                'listed': True,
+                'state': 'ACTIVE'
+            })
+        battery_devices = [d for d in self.devices if d['battery']]
+        for d in battery_devices[:int(len(battery_devices) * sleeping)]:
+            d['state'] = 'INACTIVE'
+
+        client = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, code: int, body: bytes, ctype: str) -> None:
+                self.send_response(code)
+                self.send_header('Content-Type', ctype)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Cache-Control', 'no-store')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _json(self, data, code: int = 200) -> None:
+                self._send(code, json.dumps(data, ensure_ascii=False).encode('utf-8'), 'application/json')
+
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                m = re.match(r'^/v1\.0/devices/([^/]+)/profile/?$', path)
+                if m:
+                    profile = client.profile(m.group(1))
+                    return self._json(profile) if profile else self._send(404, b'', 'text/plain')
+                if path == '/api/devices':
+                    return self._json(client.list_devices())
+                fname = os.path.join(_STATIC_DIR, os.path.basename(path) or 'index.html')
+                if not os.path.isfile(fname):
+                    return self._send(404, b'', 'text/plain')
+                with open(fname, 'rb') as stream:
+                    body = stream.read()
+                self._send(200, body, _CONTENT_TYPES.get(os.path.splitext(fname)[1], 'application/octet-stream'))
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                params = json.loads(self.rfile.read(length) or b'{}')
+                action = self.path.split('?', 1)[0].rsplit('/', 1)[-1]
+                handler = getattr(client, f"api_{action}", None)
+                if not handler:
+                    return self._send(404, b'', 'text/plain')
+                client.hits[action] = client.hits.get(action, 0) + 1
+                client._delay()
+                self._json(handler(**params))
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """主窗口地址"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/index.html"
+
+    @property
+    def profile_endpoint(self) -> str:
+        """可直接用作 device_type_api 的地址模板"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1.0/devices/${{uid}}/profile/"
+
+    def _delay(self) -> None:
+        with self._lock:
+            delay = self.latency + (self._rand.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _fail(self) -> bool:
+        with self._lock:
+            return self.fail_rate > 0 and self._rand.random() < self.fail_rate
+
+    def _find(self, **kw) -> dict:
+        key, value = next(iter(kw.items()))
+        return next((d for d in self.devices if d[key] == value), None)
+
+    def profile(self, uid: str) -> dict:
+        d = self._find(uid=uid)
+        return {'batteryType': d['battery'], 'wifiType': d['wifi']} if d else None
+
+    def list_devices(self) -> List[dict]:
+        status = common.I18n['_e_device_status']
+        with self._lock:
+            return [
+                {
+                    'name': d['name'],
+                    'uid': d['uid'],
+                    'listed': d['listed'],
+                    'status': status[d['state']],
+                    # 休眠或离线的设备显示重试按钮
+                    'buttons': [common.I18n['_retry'] if d['state'] in ('INACTIVE', 'FAIL') else common.I18n['_setting']]
+                }
+                for d in self.devices
+            ]
+
+    def set_state(self, name: str, state: str) -> None:
+        """直接修改设备状态(见 common.I18n['_e_device_status'] 的键), 用于构造测试场景"""
+        with self._lock:
+            self._find(name=name)['state'] = state
+
+    def api_remove(self, name: str) -> dict:
+        with self._lock:
+            d = self._find(name=name)
+            if d:
+                d['listed'] = False
+        return {'ok': bool(d)}
+
+    def api_clear(self) -> dict:
+        with self._lock:
+            for d in self.devices:
+                d['listed'] = False
+        return {'ok': True}
+
+    def api_add(self, uid: str) -> dict:
+        with self._lock:
+            d = self._find(uid=uid)
+            if not d:
+                return {'ok': False}
+            d['listed'] = True
+            d['state'] = 'CONNECTING'
+            return {
+                'ok': True,
+                'name': d['name'],
+                'battery': d['battery'] != common.EDeviceType.WIRED.value,
+                'wired_only': d['wifi'] == common.EDeviceWifiType.WIRED_ONLY.value
+            }
+
+    def api_login(self, uid: str, uname: str, passwd: str) -> dict:
+        if self._fail():
+            return {'ok': False, 'tip': common.I18n['_connect_fail']}
+        with self._lock:
+            d = self._find(uid=uid)
+            if not d:
+                return {'ok': False, 'tip': common.I18n['_connect_fail']}
+            if (uname, passwd) != tuple(d['credentials']):
+                d['state'] = 'WRONG_PASS'
+                return {'ok': False, 'tip': common.I18n['_e_device_status']['WRONG_PASS']}
+            d['state'] = 'ACTIVE'
+        return {'ok': True}
+
+    def api_button(self, name: str, title: str) -> dict:
+        with self._lock:
+            d = self._find(name=name)
+            if not d:
+                return {}
+            if title == common.I18n['_retry']:
+                # 唤醒: 连接中, wake_latency 后连接成功(失败注入时回到未连接)
+                d['state'] = 'CONNECTING'
+                result = 'INACTIVE' if self._fail() else 'ACTIVE'
+                threading.Timer(self.wake_latency, self.set_state, (name, result)).start()
+                return {}
+            if d['state'] == 'WRONG_PASS':
+                return {'dialog': 'login'}
+        return {}
+
+    def launch(
+        self,
+        headless: bool = True,
+        binary: str = None,
+        window_size: Tuple[int, int] = (1280, 800)
+    ):
+        """
+            启动 Chromium 并打开主窗口
+
+            参数:
+                - headless: 是否无头模式
+                - binary: 浏览器可执行文件, 默认为 global.yml 的 fake_client_binary, 为空时由 selenium 自动查找
+
+            返回值:
+                - WebDriver
+        """
+        from selenium import webdriver
+
+        wd_options = webdriver.ChromeOptions()
+        if headless:
+            wd_options.add_argument('--headless=new')
+        wd_options.add_argument('--no-sandbox')
+        wd_options.add_argument('--disable-gpu')
+        wd_options.add_argument('--disable-popup-blocking')  # 弹窗以 window.open 打开
+        wd_options.add_argument(f'--window-size={window_size[0]},{window_size[1]}')
+        binary = binary or config.get_data('fake_client_binary')
+        if binary:
+            wd_options.binary_location = binary
+
+        wd = webdriver.Chrome(options=wd_options)
+        wd.set_script_timeout(config.get_data('script_timeout', 30))
+        wd.get(self.url)
+        return wd
+
+    def start(self) -> 'FakeClient':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'FakeClient':
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
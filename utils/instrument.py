@@ -0,0 +1,200 @@
+"""
+    WebDriver 命令统计
+
+    - 包装 driver.command_executor.execute, 记录每条命令的名称、耗时与发起命令的页面方法
+    - 包装 time.sleep, 统计固定暂停时间, 与命令耗时、其他耗时分开汇总
+    - 按用例输出 JSON 汇总与 Chrome trace(chrome://tracing 或 Perfetto 打开)
+    - 由 global.yml 的 instrument 开关控制, 用例钩子见 utils/conftest.py
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from typing import Dict, List
+from utils.common import common
+
+# 页面对象所在目录, 用于确定命令的发起方法
+_SRC_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PAGE_DIRS = (
+    os.path.join(_SRC_ROOT, 'page') + os.sep,
+    os.path.join(_SRC_ROOT, 'base') + os.sep,
+)
+_CASE_DIR = os.path.join(_SRC_ROOT, 'case') + os.sep
+
+_real_sleep = time.sleep
+
+
+def _caller() -> str:
+    """发起调用的页面方法, 取调用栈中最靠近的 page/ 方法, 其次 base/ 方法, 其次用例函数"""
+    frame = sys._getframe(2)
+    found: Dict[str, str] = {}
+    while frame:
+        fname = frame.f_code.co_filename
+        for key, prefix in (('page', _PAGE_DIRS[0]), ('base', _PAGE_DIRS[1]), ('case', _CASE_DIR)):
+            if key not in found and fname.startswith(prefix):
+                found[key] = getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)
+        if 'page' in found:
+            break
+        frame = frame.f_back
+    return found.get('page') or found.get('base') or found.get('case') or '<unknown>'
+
+
+class CommandRecorder:
+    """
+        命令记录器
+
+        eg:
+            recorder.install(driver)
+            recorder.begin('case/test_login.py::test_login')
+            ...
+            recorder.end()   # 返回汇总并写入 outcome/instrument/
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._events: List[dict] = []
+        self._name = 'session'
+        self._started = time.perf_counter()
+        self._installed = set()
+        self._sleep_patched = False
+        self._local = threading.local()  # 命令执行中的 sleep(如重试等待)计入命令耗时, 不重复统计
+
+    def install(self, driver) -> None:
+        """包装 driver 的命令执行器与 time.sleep, 同一个 driver 只包装一次"""
+        executor = driver.command_executor
+        if id(executor) in self._installed:
+            return
+        self._installed.add(id(executor))
+        execute = executor.execute
+        recorder = self
+
+        def timed_execute(command, params):
+            start = time.perf_counter()
+            recorder._local.in_command = True
+            try:
+                return execute(command, params)
+            finally:
+                recorder._local.in_command = False
+                recorder._add('webdriver', command, start, time.perf_counter() - start)
+
+        executor.execute = timed_execute
+
+        if not self._sleep_patched:
+            def timed_sleep(seconds):
+                if getattr(recorder._local, 'in_command', False):
+                    return _real_sleep(seconds)
+                start = time.perf_counter()
+                try:
+                    _real_sleep(seconds)
+                finally:
+                    recorder._add('sleep', 'sleep', start, time.perf_counter() - start)
+
+            time.sleep = timed_sleep
+            self._sleep_patched = True
+
+    def uninstall(self) -> None:
+        """还原 time.sleep, 已包装的 driver 保持不变"""
+        if self._sleep_patched:
+            time.sleep = _real_sleep
+            self._sleep_patched = False
+
+    def _add(self, cat: str, name: str, start: float, duration: float) -> None:
+        event = {
+            'cat': cat,
+            'name': name,
+            'start': start,
+            'dur': duration,
+            'caller': _caller(),
+            'tid': threading.get_ident()
+        }
+        with self._lock:
+            self._events.append(event)
+
+    def begin(self, name: str) -> None:
+        """开始记录一个用例, 清空之前的记录"""
+        with self._lock:
+            self._events = []
+            self._name = name
+            self._started = time.perf_counter()
+
+    def summary(self) -> dict:
+        """
+            返回值:
+                - dict: 总耗时与命令/暂停/其他耗时, 以及按命令、按页面方法的明细
+        """
+        with self._lock:
+            events = list(self._events)
+        wall = time.perf_counter() - self._started
+        by_command: Dict[str, dict] = {}
+        by_caller: Dict[str, dict] = {}
+        totals = {'webdriver': 0.0, 'sleep': 0.0}
+        for e in events:
+            totals[e['cat']] += e['dur']
+            for key, table in ((e['name'], by_command), (e['caller'], by_caller)):
+                item = table.setdefault(key, {'count': 0, 'webdriver': 0.0, 'sleep': 0.0})
+                item['count'] += 1
+                item[e['cat']] += e['dur']
+
+        def rounded(table: Dict[str, dict]) -> Dict[str, dict]:
+            return {
+                k: {n: round(v, 4) for n, v in item.items()}
+                for k, item in sorted(table.items(), key=lambda kv: -(kv[1]['webdriver'] + kv[1]['sleep']))
+            }
+
+        return {
+            'test': self._name,
+            'wall': round(wall, 4),
+            'commands': sum(1 for e in events if e['cat'] == 'webdriver'),
+            'webdriver': round(totals['webdriver'], 4),
+            'sleep': round(totals['sleep'], 4),
+            'other': round(max(wall - totals['webdriver'] - totals['sleep'], 0), 4),
+            'by_command': rounded(by_command),
+            'by_caller': rounded(by_caller)
+        }
+
+    def trace(self) -> dict:
+        """Chrome trace-event 格式"""
+        with self._lock:
+            events = list(self._events)
+        return {
+            'traceEvents': [
+                {
+                    'name': e['name'],
+                    'cat': e['cat'],
+                    'ph': 'X',
+                    'ts': round((e['start'] - self._started) * 1e6, 1),
+                    'dur': round(e['dur'] * 1e6, 1),
+                    'pid': os.getpid(),
+                    'tid': e['tid'],
+                    'args': {'caller': e['caller']}
+                }
+                for e in events
+            ],
+            'displayTimeUnit': 'ms',
+            'otherData': {'test': self._name}
+        }
+
+    def end(self, directory: str = None) -> dict:
+        """
+            结束当前用例, 写入 <directory>/<用例>.json 与 <用例>.trace.json
+
+            参数:
+                - directory: 输出目录, 默认 outcome/instrument
+
+            返回值:
+                - dict: 同 `summary`
+        """
+        directory = directory or os.path.join(common.ProjectRoot, 'outcome', 'instrument')
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, re.sub(r'[^\w.-]+', '_', self._name).strip('_') or 'session')
+        summary = self.summary()
+        with open(base + '.json', 'w', encoding='utf-8') as stream:
+            json.dump(summary, stream, ensure_ascii=False, indent=2)
+        with open(base + '.trace.json', 'w', encoding='utf-8') as stream:
+            json.dump(self.trace(), stream)
+        return summary
+
+
+recorder = CommandRecorder()
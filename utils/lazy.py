@@ -0,0 +1,34 @@
+"""延迟初始化代理, 用于导入时开销较大的全局对象(如启动客户端的 Reo)"""
+from typing import Any, Callable
+
+
+class Lazy:
+    """
+        延迟初始化代理, 首次访问属性时才调用 `factory` 创建真实对象, 之后的属性访问均转发给该对象
+
+        eg:
+            - Reo = Lazy(lambda: ReoWF(driver.start()))
+              导入 Reo 不会启动客户端, 首次调用 Reo.xxx() 时才启动
+    """
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_target', None)
+
+    def _get_target(self) -> Any:
+        target = object.__getattribute__(self, '_target')
+        if target is None:
+            target = object.__getattribute__(self, '_factory')()
+            object.__setattr__(self, '_target', target)
+        return target
+
+    @property
+    def initialized(self) -> bool:
+        """真实对象是否已创建"""
+        return object.__getattribute__(self, '_target') is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get_target(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._get_target(), name, value)
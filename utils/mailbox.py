@@ -0,0 +1,385 @@
+"""
+    报警邮件读取(imaplib)
+
+    - 主题过滤通过服务端 SEARCH 完成, 不再拉取当天全部未读邮件
+    - 先取邮件头, 只下载最新一封匹配邮件的正文
+    - 附件按 BODYSTRUCTURE 分段(partial fetch)读取, 边解码边写入磁盘, 不整体载入内存
+    - 支持通过 IMAP IDLE 等待新邮件
+"""
+import base64
+import binascii
+import imaplib
+import os
+import quopri
+import re
+import select
+import ssl
+import time
+from email.header import decode_header, make_header
+from email.parser import BytesHeaderParser
+from email.utils import getaddresses
+from typing import Iterator, List, Optional
+from utils.artifact_store import artifacts
+
+# 报警邮件主题
+ALERT_SUBJECTS = ('Scheduled Email for', 'Motion Detection for')
+
+# 附件分段读取大小
+_CHUNK = 256 * 1024
+
+# RFC 2177 建议 29 分钟内重新发起 IDLE
+_IDLE_MAX = 29 * 60
+
+# IMAP 日期中的月份固定为英文, 不受 locale 影响
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+_TOKEN = re.compile(
+    rb'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|(NIL)(?=[\s()])|([^\s()"]+))',
+    re.I
+)
+
+
+def imap_date(ts: float = None) -> str:
+    """IMAP SEARCH 使用的日期, 如 01-Jan-2024"""
+    t = time.localtime(ts)
+    return f"{t.tm_mday:02d}-{_MONTHS[t.tm_mon - 1]}-{t.tm_year}"
+
+
+def _decode(value: str) -> str:
+    """解码 RFC 2047 编码的邮件头"""
+    return str(make_header(decode_header(value))) if value else ''
+
+
+def _addresses(values: List[str]) -> List[dict]:
+    """同 imbox 的 sent_from/sent_to 格式"""
+    return [
+        {'name': _decode(name), 'email': addr}
+        for name, addr in getaddresses(values)
+    ]
+
+
+def _flatten(data: list) -> bytes:
+    """将 imaplib 返回的 [(前缀, 字面量), 后缀, ...] 还原为一段文本, 字面量转为带引号的字符串"""
+    out = b''
+    for item in data:
+        if isinstance(item, tuple):
+            prefix, literal = item
+            quoted = literal.replace(b'\\', b'\\\\').replace(b'"', b'\\"')
+            out += re.sub(rb'\{\d+\}$', b'', prefix) + b'"' + quoted + b'"'
+        elif item:
+            out += item
+    return out
+
+
+def parse_list(data: bytes) -> list:
+    """解析 IMAP 括号列表, NIL 解析为 None, 数字解析为 int"""
+    stack = [[]]
+    pos = 0
+    while True:
+        m = _TOKEN.match(data, pos)
+        if not m or m.end() == pos:
+            break
+        pos = m.end()
+        if m.group(1):
+            stack.append([])
+        elif m.group(2):
+            item = stack.pop()
+            stack[-1].append(item)
+        elif m.group(3) is not None:
+            stack[-1].append(re.sub(rb'\\(.)', rb'\1', m.group(3)).decode('utf-8', 'replace'))
+        elif m.group(4):
+            stack[-1].append(None)
+        else:
+            atom = m.group(5).decode('utf-8', 'replace')
+            stack[-1].append(int(atom) if atom.isdigit() else atom)
+    return stack[0]
+
+
+def _pairs(items: Optional[list]) -> dict:
+    items = items or []
+    return {str(items[i]).lower(): items[i + 1] for i in range(0, len(items) - 1, 2)}
+
+
+def walk_structure(bs: list, prefix: str = '') -> Iterator[dict]:
+    """
+        遍历 BODYSTRUCTURE, 返回各叶子节点
+
+        返回值:
+            - Iterator[dict]: part(段号)|type|subtype|params|encoding|size|disposition|filename
+    """
+    if isinstance(bs[0], list):
+        children = [x for x in bs if isinstance(x, list)]
+        for i, child in enumerate(children, 1):
+            yield from walk_structure(child, f"{prefix}.{i}" if prefix else str(i))
+        return
+
+    ctype, subtype = str(bs[0]).lower(), str(bs[1]).lower()
+    # 扩展字段位置: text 多一个行数, message/rfc822 多 envelope/body/行数
+    if ctype == 'text':
+        disp_at = 9
+    elif (ctype, subtype) == ('message', 'rfc822'):
+        disp_at = 11
+    else:
+        disp_at = 8
+    disposition = bs[disp_at] if len(bs) > disp_at and isinstance(bs[disp_at], list) else None
+    params = _pairs(bs[2])
+    disp_params = _pairs(disposition[1]) if disposition else {}
+    filename = disp_params.get('filename') or params.get('name')
+    yield {
+        'part': prefix or '1',
+        'type': ctype,
+        'subtype': subtype,
+        'params': params,
+        'encoding': str(bs[5] or '7bit').lower(),
+        'size': bs[6] or 0,
+        'disposition': str(disposition[0]).lower() if disposition else None,
+        'filename': _decode(filename) if filename else None
+    }
+
+
+class _PartReader:
+    """按段读取邮件的某个 part 并解码, 供 ArtifactStore.put_stream 使用"""
+
+    def __init__(self, box: 'AlertMailbox', uid: bytes, part: dict) -> None:
+        self._box = box
+        self._uid = uid
+        self._part = part
+        self._offset = 0
+        self._rest = b''
+        self._eof = False
+
+    def _next(self) -> bytes:
+        raw = self._box.fetch_part(self._uid, self._part['part'], self._offset, _CHUNK)
+        self._offset += len(raw)
+        if len(raw) < _CHUNK or self._offset >= self._part['size']:
+            self._eof = True
+        return raw
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._eof:
+            raw = self._next()
+            if self._part['encoding'] == 'base64':
+                data = self._rest + re.sub(rb'\s+', b'', raw)
+                cut = len(data) if self._eof else len(data) - len(data) % 4
+                self._rest = data[cut:]
+                chunk = binascii.a2b_base64(data[:cut]) if cut else b''
+            elif self._part['encoding'] == 'quoted-printable':
+                # 软换行可能跨段, 只解码到最后一个换行
+                data = self._rest + raw
+                cut = len(data) if self._eof else data.rfind(b'\n') + 1
+                self._rest = data[cut:]
+                chunk = quopri.decodestring(data[:cut])
+            else:
+                chunk = raw
+            if chunk:
+                return chunk
+        return b''
+
+
+class AlertMailbox:
+    """
+        报警邮件收件箱
+
+        eg:
+            with AlertMailbox(email, passwd, host) as box:
+                mail = box.latest() or box.wait(timeout=120)
+    """
+
+    def __init__(
+        self,
+        email: str,
+        passwd: str,
+        host: str,
+        port: int = None,
+        ssl: bool = True,
+        subjects: tuple = ALERT_SUBJECTS
+    ) -> None:
+        self._email = email
+        self._passwd = passwd
+        self._host = host
+        self._port = port
+        self._ssl = ssl
+        self._subjects = subjects
+        self._conn: imaplib.IMAP4 = None
+
+    def __enter__(self) -> 'AlertMailbox':
+        if self._ssl:
+            self._conn = imaplib.IMAP4_SSL(self._host, self._port or imaplib.IMAP4_SSL_PORT)
+        else:
+            self._conn = imaplib.IMAP4(self._host, self._port or imaplib.IMAP4_PORT)
+        self._conn.login(self._email, self._passwd)
+        self._conn.select('INBOX')
+        return self
+
+    def __exit__(self, *args) -> None:
+        try:
+            self._conn.logout()
+        except (imaplib.IMAP4.error, OSError):
+            pass
+
+    def _uid(self, command: str, *args) -> list:
+        typ, data = self._conn.uid(command, *args)
+        if typ != 'OK':
+            raise imaplib.IMAP4.error(f"UID {command} failed: {data}")
+        return data
+
+    def search(self, date: str = None) -> List[bytes]:
+        """
+            服务端检索当天未读的报警邮件
+
+            返回值:
+                - List[bytes]: uid 列表, 最新的在前
+        """
+        criteria = ['UNSEEN', 'ON', date or imap_date()]
+        # 多个主题用 OR 组合: OR a OR b c
+        for subject in self._subjects[:-1]:
+            criteria += ['OR', 'SUBJECT', f'"{subject}"']
+        criteria += ['SUBJECT', f'"{self._subjects[-1]}"']
+        data = self._uid('SEARCH', None, *criteria)
+        uids = data[0].split() if data and data[0] else []
+        return sorted(uids, key=int, reverse=True)
+
+    def headers(self, uid: bytes) -> dict:
+        """只读取邮件头(不标记已读)"""
+        data = self._uid('FETCH', uid, '(BODY.PEEK[HEADER.FIELDS (SUBJECT FROM TO)])')
+        raw = next((item[1] for item in data if isinstance(item, tuple)), b'')
+        msg = BytesHeaderParser().parsebytes(raw)
+        return {
+            'subject': _decode(msg.get('Subject', '')),
+            'sent_from': _addresses(msg.get_all('From', [])),
+            'sent_to': _addresses(msg.get_all('To', []))
+        }
+
+    def structure(self, uid: bytes) -> List[dict]:
+        data = self._uid('FETCH', uid, '(BODYSTRUCTURE)')
+        items = parse_list(_flatten(data))
+        # [序号, [UID, n, BODYSTRUCTURE, [...]]]
+        fields = next(x for x in items if isinstance(x, list))
+        bs = fields[fields.index('BODYSTRUCTURE') + 1]
+        return list(walk_structure(bs))
+
+    def fetch_part(self, uid: bytes, part: str, offset: int = None, size: int = None) -> bytes:
+        """读取某个 part 的原始(未解码)内容, 指定 offset/size 时为分段读取"""
+        section = f"BODY.PEEK[{part}]" + (f"<{offset}.{size}>" if offset is not None else '')
+        data = self._uid('FETCH', uid, f"({section})")
+        return next((item[1] for item in data if isinstance(item, tuple)), b'')
+
+    def _body(self, uid: bytes, parts: List[dict]) -> str:
+        texts = [p for p in parts if p['type'] == 'text' and p['disposition'] != 'attachment' and not p['filename']]
+        part = next((p for p in texts if p['subtype'] == 'html'), None) or \
+            next((p for p in texts if p['subtype'] == 'plain'), None)
+        if not part:
+            return ''
+        raw = self.fetch_part(uid, part['part'])
+        if part['encoding'] == 'base64':
+            raw = base64.b64decode(raw)
+        elif part['encoding'] == 'quoted-printable':
+            raw = quopri.decodestring(raw)
+        return raw.decode(part['params'].get('charset') or 'utf-8', 'replace')
+
+    def download(self, uid: bytes, outdir: str, head: dict = None) -> dict:
+        """
+            下载邮件正文, 附件分段写入 outdir
+
+            返回值:
+                - dict: 同 Util.get_email_details
+        """
+        mail = dict(head or self.headers(uid))
+        parts = self.structure(uid)
+        mail['body'] = self._body(uid, parts)
+        mail['attachments'] = []
+        for part in parts:
+            if not part['filename']:
+                continue
+            fname = os.path.join(outdir, os.path.basename(part['filename']))
+            artifacts.put_stream(_PartReader(self, uid, part), fname)
+            mail['attachments'].append({
+                'content-type': f"{part['type']}/{part['subtype']}",
+                'size': os.path.getsize(fname),
+                'filename': fname
+            })
+        return mail
+
+    def latest(self, outdir: str) -> Optional[dict]:
+        """
+            下载最新一封报警邮件
+
+            返回值:
+                - dict|None: 没有匹配的邮件时返回 None
+        """
+        for uid in self.search():
+            head = self.headers(uid)
+            # SEARCH SUBJECT 不区分大小写, 这里按原逻辑再精确匹配一次
+            if any(s in head['subject'] for s in self._subjects):
+                return self.download(uid, outdir, head)
+        return None
+
+    def _buffered(self) -> bool:
+        """
+            连接上是否已有可读的数据, 不阻塞
+
+            conn.readline 读取的是带缓冲的 conn.file, 服务端连续发送的多行可能已全部读入缓冲区(或 SSL 层),
+            此时 socket 不再可读, 只靠 select 会一直等到超时
+        """
+        sock = self._conn.sock
+        timeout = sock.gettimeout()
+        sock.settimeout(0)
+        try:
+            return bool(self._conn.file.peek(1))
+        except (BlockingIOError, ssl.SSLWantReadError):
+            return False
+        finally:
+            sock.settimeout(timeout)
+
+    def _idle(self, timeout: float) -> bool:
+        """
+            IMAP IDLE, 直到有新邮件或超时
+
+            返回值:
+                - bool: 是否收到新邮件通知
+        """
+        conn = self._conn
+        tag = conn._new_tag()
+        conn.send(tag + b' IDLE\r\n')
+        if not conn.readline().startswith(b'+'):
+            raise imaplib.IMAP4.error('IDLE rejected')
+        got = False
+        deadline = time.monotonic() + min(timeout, _IDLE_MAX)
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if not self._buffered() and not select.select([conn.sock], [], [], remaining)[0]:
+                    break
+                line = conn.readline()
+                if not line:
+                    raise imaplib.IMAP4.abort('connection closed during IDLE')
+                if re.match(rb'\* \d+ (EXISTS|RECENT)', line):
+                    got = True
+                    break
+        finally:
+            conn.send(b'DONE\r\n')
+            while not conn.readline().startswith(tag):
+                pass
+        return got
+
+    def wait(self, outdir: str, timeout: float) -> Optional[dict]:
+        """
+            等待报警邮件, 服务端支持 IDLE 时由服务端推送, 否则每 5 秒 NOOP 一次
+
+            返回值:
+                - dict|None: 超时返回 None
+        """
+        deadline = time.monotonic() + timeout
+        idle = 'IDLE' in self._conn.capabilities
+        while True:
+            mail = self.latest(outdir)
+            remaining = deadline - time.monotonic()
+            if mail or remaining <= 0:
+                return mail
+            if idle:
+                self._idle(remaining)
+            else:
+                time.sleep(min(5, remaining))
+                self._conn.noop()
@@ -0,0 +1,124 @@
+"""媒体文件目录(SQLite), 记录抓拍/下载/录像文件的探测结果, 避免每次查询都重新扫描和解析整个目录"""
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List
+from utils.common import common
+from utils.read_config import config
+
+
+class MediaCatalog:
+    """
+        媒体文件目录
+
+        - 以 (path, size, mtime) 为键缓存探测结果(分辨率/视频信息), 文件未变化时不再探测
+        - 查询时只读取目录项的 stat, 按创建时间排序后仅探测需要返回的前 num 个文件
+    """
+
+    def __init__(self, db: str = None) -> None:
+        self._db = db or config.get_data('media_catalog_db') or os.path.join(
+            common.ProjectRoot, 'outcome', 'cache', 'media_catalog.sqlite3'
+        )
+        os.makedirs(os.path.dirname(self._db), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS media ('
+                'path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, info TEXT)'
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """打开连接, 正常退出时提交事务, 结束后关闭连接"""
+        conn = sqlite3.connect(self._db, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def scan(directory: str) -> List[os.DirEntry]:
+        """列出目录下的文件(不含子目录)"""
+        with os.scandir(directory) as it:
+            return [e for e in it if e.is_file()]
+
+    def query(
+        self,
+        directory: str,
+        num: int,
+        sort: str,
+        probe: Callable[[List[str]], Dict[str, dict]]
+    ) -> List[dict]:
+        """
+            查询目录中最新/最早的 num 个文件
+
+            参数:
+                - directory: 媒体目录
+                - num: 返回的文件数量
+                - sort: new|old, 同 Util.get_fileinfo
+                - probe: 批量探测函数, 参数为需要探测的文件路径列表, 返回 路径 -> 需要缓存的信息(需可序列化为 JSON)
+
+            返回值:
+                - List[dict]: 文件信息, 包括 path|ctime|size(字节)|info(probe 的返回值)
+        """
+        entries = self.scan(directory)
+        entries.sort(
+            key=lambda e: e.stat().st_ctime,
+            reverse=sort == 'new'
+        )
+        entries = entries[:num]
+        if not entries:
+            return []
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT path, size, mtime, info FROM media WHERE path IN ({','.join('?' * len(entries))})",
+                [e.path for e in entries]
+            ).fetchall()
+            known = {r[0]: (r[1], r[2], r[3]) for r in rows}
+
+            infos = dict()
+            for e in entries:
+                st = e.stat()
+                row = known.get(e.path)
+                if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+                    infos[e.path] = json.loads(row[2])
+
+            # 新文件或文件已变化, 批量重新探测
+            missing = [e for e in entries if e.path not in infos]
+            if missing:
+                probed = probe([e.path for e in missing])
+                conn.executemany(
+                    'INSERT OR REPLACE INTO media (path, size, mtime, info) VALUES (?, ?, ?, ?)',
+                    [
+                        (e.path, e.stat().st_size, e.stat().st_mtime_ns, json.dumps(probed[e.path]))
+                        for e in missing
+                    ]
+                )
+                infos.update(probed)
+
+        return [
+            {
+                'path': e.path,
+                'ctime': e.stat().st_ctime,
+                'size': e.stat().st_size,
+                'info': infos[e.path]
+            }
+            for e in entries
+        ]
+
+    def prune(self) -> int:
+        """
+            删除已不存在的文件记录
+
+            返回值:
+                - int: 删除的记录数
+        """
+        with self._connect() as conn:
+            gone = [
+                (p,) for (p,) in conn.execute('SELECT path FROM media')
+                if not os.path.exists(p)
+            ]
+            conn.executemany('DELETE FROM media WHERE path = ?', gone)
+        return len(gone)
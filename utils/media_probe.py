@@ -0,0 +1,244 @@
+"""
+    媒体文件探测, 只读取文件头/容器元数据, 不解码图像与视频
+
+    - JPEG/PNG: 从文件头读取分辨率
+    - MP4/MOV: 从 moov 元数据读取时长、帧率与分辨率, 不读取 mdat
+    - 其他格式回退到 PIL/av, 并保证文件句柄释放
+    - probe_many 通过进程池批量探测并统计吞吐量
+"""
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, Iterator, List, Tuple
+
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png')
+VIDEO_EXTS = ('.mp4', '.mov', '.m4v')
+
+# 带尺寸信息的 JPEG SOF 标记, 排除 DHT(C4)、JPG(C8)、DAC(CC)
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# 需要向下查找的 MP4 容器 box
+_MP4_CONTAINERS = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+
+# 批量探测时, 少于该数量的文件直接在当前进程探测, 避免进程池启动开销
+_POOL_THRESHOLD = 8
+
+
+def jpeg_size(stream: BinaryIO) -> Tuple[int, int]:
+    """从 JPEG 文件头读取 (宽, 高)"""
+    if stream.read(2) != b'\xff\xd8':
+        raise ValueError('not a jpeg file')
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            raise ValueError('jpeg SOF marker not found')
+        if byte != b'\xff':
+            continue
+        marker = stream.read(1)
+        while marker == b'\xff':
+            marker = stream.read(1)
+        if not marker:
+            raise ValueError('jpeg SOF marker not found')
+        code = marker[0]
+        # 无长度字段的标记
+        if code == 0x01 or 0xD0 <= code <= 0xD9:
+            continue
+        length = struct.unpack('>H', stream.read(2))[0]
+        if code in _JPEG_SOF:
+            _, height, width = struct.unpack('>BHH', stream.read(5))
+            return width, height
+        stream.seek(length - 2, os.SEEK_CUR)
+
+
+def png_size(stream: BinaryIO) -> Tuple[int, int]:
+    """从 PNG IHDR 读取 (宽, 高)"""
+    head = stream.read(24)
+    if head[:8] != b'\x89PNG\r\n\x1a\n' or head[12:16] != b'IHDR':
+        raise ValueError('not a png file')
+    return struct.unpack('>II', head[16:24])
+
+
+def image_size(fname: str) -> Tuple[int, int]:
+    """
+        读取图片分辨率, 支持 JPEG/PNG, 其他格式回退到 PIL
+
+        返回值:
+            - (int, int): (宽, 高)
+    """
+    with open(fname, 'rb') as stream:
+        head = stream.read(8)
+        stream.seek(0)
+        if head.startswith(b'\xff\xd8'):
+            return jpeg_size(stream)
+        if head.startswith(b'\x89PNG'):
+            return png_size(stream)
+
+    from PIL import Image
+
+    with Image.open(fname) as img:
+        return img.size
+
+
+def _boxes(stream: BinaryIO, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """遍历 [当前位置, end) 内的 box, 返回 (类型, 内容起始位置, 内容结束位置)"""
+    while stream.tell() + 8 <= end:
+        start = stream.tell()
+        size, kind = struct.unpack('>I4s', stream.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', stream.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - start
+        if size < header:
+            raise ValueError('invalid mp4 box')
+        yield kind, start + header, start + size
+        stream.seek(start + size)
+
+
+def _mp4_tracks(stream: BinaryIO, end: int, track: dict, tracks: List[dict]) -> None:
+    """递归读取 moov 下各 trak 的元数据"""
+    for kind, body, box_end in _boxes(stream, end):
+        if kind == b'trak':
+            track = {}
+            tracks.append(track)
+        if kind in _MP4_CONTAINERS:
+            _mp4_tracks(stream, box_end, track, tracks)
+            continue
+
+        if kind == b'hdlr':
+            stream.seek(body + 8)
+            track['handler'] = stream.read(4)
+        elif kind == b'mdhd':
+            version = stream.read(1)[0]
+            stream.seek(body + 4)
+            if version == 1:
+                _, _, timescale, duration = struct.unpack('>QQIQ', stream.read(28))
+            else:
+                _, _, timescale, duration = struct.unpack('>IIII', stream.read(16))
+            track['timescale'] = timescale
+            track['duration'] = duration
+        elif kind == b'stsd':
+            # stsd: version/flags(4) + entry_count(4) + 首个样本描述(size(4) + format(4) + 保留(6) + 索引(2) + ...)
+            # 视觉样本描述中宽高位于样本描述起始处偏移 32 字节
+            stream.seek(body + 8 + 32)
+            track['width'], track['height'] = struct.unpack('>HH', stream.read(4))
+        elif kind == b'stts':
+            stream.seek(body + 4)
+            count = struct.unpack('>I', stream.read(4))[0]
+            samples = 0
+            for _ in range(count):
+                samples += struct.unpack('>II', stream.read(8))[0]
+            track['samples'] = samples
+
+
+def mp4_info(fname: str) -> dict:
+    """
+        从 MP4/MOV 的 moov 元数据读取视频信息, 不读取媒体数据
+
+        返回值:
+            - dict: fps|duration|width|height
+    """
+    with open(fname, 'rb') as stream:
+        end = os.fstat(stream.fileno()).st_size
+        tracks: List[dict] = []
+        for kind, body, box_end in _boxes(stream, end):
+            if kind == b'moov':
+                stream.seek(body)
+                _mp4_tracks(stream, box_end, {}, tracks)
+                break
+
+    for t in tracks:
+        if t.get('handler') == b'vide' and t.get('timescale'):
+            seconds = t['duration'] / t['timescale']
+            return {
+                'fps': t.get('samples', 0) / seconds if seconds else 0.0,
+                'duration': seconds,
+                'width': t.get('width'),
+                'height': t.get('height')
+            }
+    raise ValueError('video track not found')
+
+
+def video_info(fname: str) -> dict:
+    """
+        读取视频信息, MP4/MOV 只解析容器元数据, 其他格式回退到 av(读取完成后关闭容器)
+
+        返回值:
+            - dict: fps|duration|width|height
+    """
+    try:
+        return mp4_info(fname)
+    except (ValueError, struct.error):
+        pass
+
+    import av
+
+    with av.open(fname) as container:
+        stream = container.streams.video[0]
+        return {
+            'fps': float(stream.average_rate),
+            'duration': float(stream.duration * stream.time_base),
+            'width': stream.width,
+            'height': stream.height
+        }
+
+
+def probe(fname: str, kind: str = None) -> dict:
+    """
+        探测单个文件
+
+        参数:
+            - fname: 文件完整路径
+            - kind: image|video, 为空时按扩展名判断
+
+        返回值:
+            - dict: 图片为 width|height, 视频为 fps|duration|width|height
+    """
+    if kind is None:
+        kind = 'image' if fname.lower().endswith(IMAGE_EXTS) else 'video'
+    if kind == 'image':
+        width, height = image_size(fname)
+        return {'width': width, 'height': height}
+    return video_info(fname)
+
+
+def _safe_probe(args: Tuple[str, str]) -> dict:
+    try:
+        return probe(*args)
+    except BaseException as err:
+        return {'error': str(err)}
+
+
+def probe_many(
+    fnames: List[str],
+    kind: str = None,
+    workers: int = None
+) -> Tuple[Dict[str, dict], dict]:
+    """
+        批量探测, 文件较多时分配到进程池
+
+        参数:
+            - fnames: 文件完整路径列表
+            - kind: image|video, 为空时按扩展名判断
+            - workers: 进程数, 默认为 CPU 核数
+
+        返回值:
+            - (Dict[str, dict], dict):
+                - 文件路径 -> 探测结果, 探测失败时结果为 {'error': 错误信息}
+                - 统计: files 文件数 | seconds 耗时 | files_per_sec 吞吐量
+    """
+    start = time.perf_counter()
+    args = [(f, kind) for f in fnames]
+    if len(fnames) < _POOL_THRESHOLD:
+        results = [_safe_probe(a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_safe_probe, args, chunksize=16))
+    seconds = time.perf_counter() - start
+    return dict(zip(fnames, results)), {
+        'files': len(fnames),
+        'seconds': seconds,
+        'files_per_sec': len(fnames) / seconds if seconds else 0.0
+    }
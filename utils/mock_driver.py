@@ -0,0 +1,429 @@
+"""
+    模拟 WebDriver, 用于在没有浏览器的环境中测量 BaseWindow 操作的命令数、暂停时间与耗时
+
+    - MockDriver 是真实的 selenium WebDriver, 只替换了命令执行器, 元素、ActionChains、WebDriverWait 均走原有代码路径,
+      utils/instrument 的命令统计可直接使用
+    - 每条命令可注入固定延迟与随机抖动, 模拟与客户端之间的往返耗时
+    - 页面以 MockElement 描述: 按选择器注册, 可设置出现延迟、文本、属性、是否可见、range 取值与方格颜色
+    - 执行脚本按脚本内容识别: 元素等待(MutationObserver)、range 设值、方格读取、几何读取等,
+      其他脚本可通过 MockDriver.on_script 注册处理函数
+
+    eg:
+        driver = MockDriver(latency=0.005)
+        driver.add('//*[@id="ok"]', text='确定', delay=0.3)
+        BaseWindow(driver).find_element_by_selector('//*[@id="ok"]')
+"""
+import itertools
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Literal, Tuple
+from selenium.webdriver import ChromeOptions, Keys
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webdriver import WebDriver
+
+_ELEMENT_KEY = 'element-6066-11e4-a52e-4f735466cecf'
+
+# 不受 utils/instrument 包装影响的 sleep, 命令延迟计入命令耗时
+_sleep = time.sleep
+
+# 按键对 range 取值的影响
+_STEP_KEYS = {Keys.RIGHT: 1, Keys.UP: 1, Keys.LEFT: -1, Keys.DOWN: -1}
+
+
+def _using(by: str) -> str:
+    """选择器类型统一为 WebDriver 协议中的 css selector | xpath | link text | partial link text"""
+    return by if by in (By.XPATH, By.LINK_TEXT, By.PARTIAL_LINK_TEXT) else 'css selector'
+
+
+class MockElement:
+    """模拟页面元素"""
+
+    def __init__(
+        self,
+        selector: str,
+        by: str = By.XPATH,
+        parent: 'MockElement' = None,
+        delay: float = 0,
+        text: str = '',
+        attrs: Dict[str, Any] = None,
+        displayed: bool = True,
+        enabled: bool = True,
+        value: float = None,
+        controlled: bool = False,
+        grid: List[List[str]] = None,
+        palette: Tuple[str, str] = None,
+        rect: Dict[str, float] = None,
+        on_click: Callable = None
+    ) -> None:
+        """
+            参数:
+                - selector / by: 匹配该元素的选择器
+                - parent: 父元素, 相对查找(element 参数)时只在父元素下匹配
+                - delay: 注册后多久出现在页面中(秒)
+                - text / attrs / displayed / enabled: 元素文本、属性、是否可见、是否可用
+                - value: range 输入框的当前值, 取值范围与步长见 attrs 的 min/max/step
+                - controlled: 受控组件, 直接设值会被还原, 只接受按键
+                - grid: 方格颜色, grid[i][j] 为第 i 行第 j 列的颜色
+                - palette: 方格的 (未激活, 激活) 颜色, 设置后按下拖动会把起点所在方块切换为另一种颜色,
+                  并将拖动范围内的方块全部设为该颜色
+                - rect: 元素位置尺寸(相对页面)
+                - on_click: 点击回调, 参数为 MockDriver, 用于模拟点击后出现弹窗等
+        """
+        self.selector = selector
+        self.using = _using(by)
+        self.parent = parent
+        self.appear_at = time.monotonic() + delay
+        self.text = text
+        self.attrs = dict(attrs or {})
+        self.displayed = displayed
+        self.enabled = enabled
+        self.value = value
+        self.controlled = controlled
+        self.grid = grid
+        self.palette = palette
+        self.rect = rect or {'x': 0, 'y': 0, 'width': 100, 'height': 20}
+        self.on_click = on_click
+        self.scroll_top = 0
+        self.clicks = 0
+        self.keys = ''
+        self.id = ''
+
+    def present(self, now: float = None) -> bool:
+        return (time.monotonic() if now is None else now) >= self.appear_at
+
+
+class _MockExecutor:
+    """替代 RemoteConnection, 按命令名分发到 MockDriver 的处理函数"""
+
+    def __init__(self, owner: 'MockDriver') -> None:
+        self._owner = owner
+
+    def execute(self, command: str, params: dict) -> dict:
+        return self._owner._handle(command, params or {})
+
+
+class MockDriver(WebDriver):
+    """
+        注入延迟的模拟 WebDriver
+
+        eg:
+            driver = MockDriver(latency=0.005, jitter=0.002, seed=1)
+            canvas = driver.add('//canvas', grid=[['rgb(0, 0, 0)'] * 24] * 7)
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        latencies: Dict[str, float] = None,
+        seed: int = 0
+    ) -> None:
+        """
+            参数:
+                - latency: 每条命令的延迟(秒)
+                - jitter: 延迟的随机抖动上限(秒)
+                - latencies: 按命令名覆盖延迟, 如 {'w3cExecuteScriptAsync': 0.02}
+                - seed: 随机种子
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.latencies = dict(latencies or {})
+        self.commands: Dict[str, int] = {}
+        self.elements: Dict[str, MockElement] = {}
+        self.handles = ['main']
+        self.current_handle = 'main'
+        self._scripts: List[tuple] = []
+        self._rand = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        super().__init__(command_executor=_MockExecutor(self), options=ChromeOptions())
+
+    def add(self, selector: str, by: str = By.XPATH, **kw) -> MockElement:
+        """注册页面元素, 参数见 `MockElement`"""
+        node = MockElement(selector, by, **kw)
+        with self._lock:
+            node.id = f"mock-{next(self._ids)}"
+            self.elements[node.id] = node
+        return node
+
+    def remove(self, node: MockElement) -> None:
+        with self._lock:
+            self.elements.pop(node.id, None)
+
+    def on_script(
+        self,
+        marker: str,
+        fn: Callable,
+        is_async: bool = False
+    ) -> None:
+        """
+            注册脚本处理函数, 脚本内容包含 `marker` 时调用 fn(args), 返回值作为脚本结果,
+            优先于内置处理
+        """
+        self._scripts.insert(0, (marker, is_async, fn))
+
+    def reset_commands(self) -> None:
+        self.commands.clear()
+
+    # ---- 页面查询 ----
+
+    def _query(
+        self,
+        using: str,
+        selector: str,
+        parent: MockElement = None,
+        now: float = None
+    ) -> List[MockElement]:
+        with self._lock:
+            return [
+                n for n in self.elements.values()
+                if n.using == using and n.selector == selector and n.parent is parent and n.present(now)
+            ]
+
+    def _pending(self, using: str, selector: str, parent: MockElement = None) -> List[MockElement]:
+        """尚未出现的匹配元素, 按出现时间排序"""
+        now = time.monotonic()
+        with self._lock:
+            nodes = [
+                n for n in self.elements.values()
+                if n.using == using and n.selector == selector and n.parent is parent and not n.present(now)
+            ]
+        return sorted(nodes, key=lambda n: n.appear_at)
+
+    def _node(self, ref) -> MockElement:
+        if isinstance(ref, dict):
+            ref = ref.get(_ELEMENT_KEY)
+        return self.elements.get(ref) if ref else None
+
+    @staticmethod
+    def _ref(node: MockElement) -> dict:
+        return {_ELEMENT_KEY: node.id}
+
+    @staticmethod
+    def _error(error: str, message: str = '') -> dict:
+        return {'status': error, 'value': {'error': error, 'message': message or error}}
+
+    # ---- 命令处理 ----
+
+    def _handle(self, command: str, params: dict) -> dict:
+        with self._lock:
+            self.commands[command] = self.commands.get(command, 0) + 1
+            delay = self.latencies.get(command, self.latency)
+            if self.jitter:
+                delay += self._rand.uniform(0, self.jitter)
+        if delay > 0:
+            _sleep(delay)
+
+        match command:
+            case Command.NEW_SESSION:
+                return {'value': {'sessionId': 'mock', 'capabilities': {'browserName': 'mock'}}}
+            case Command.FIND_ELEMENT | Command.FIND_CHILD_ELEMENT:
+                parent = self._node(params.get('id'))
+                found = self._query(params['using'], params['value'], parent)
+                if not found:
+                    return self._error('no such element', params['value'])
+                return {'value': self._ref(found[0])}
+            case Command.FIND_ELEMENTS | Command.FIND_CHILD_ELEMENTS:
+                parent = self._node(params.get('id'))
+                return {'value': [self._ref(n) for n in self._query(params['using'], params['value'], parent)]}
+            case Command.GET_ELEMENT_TEXT:
+                node = self._node(params['id'])
+                return {'value': node.text if node.displayed else ''}
+            case Command.IS_ELEMENT_ENABLED:
+                return {'value': self._node(params['id']).enabled}
+            case Command.GET_ELEMENT_RECT:
+                return {'value': dict(self._node(params['id']).rect)}
+            case Command.GET_ELEMENT_PROPERTY:
+                node = self._node(params['id'])
+                return {'value': node.value if params['name'] == 'value' else node.attrs.get(params['name'])}
+            case Command.CLICK_ELEMENT:
+                node = self._node(params['id'])
+                if not node.displayed or not node.enabled:
+                    return self._error('element not interactable', node.selector)
+                node.clicks += 1
+                if node.on_click:
+                    node.on_click(self)
+                return {'value': None}
+            case Command.SEND_KEYS_TO_ELEMENT:
+                self._send_keys(self._node(params['id']), params.get('text', ''))
+                return {'value': None}
+            case Command.W3C_ACTIONS:
+                self._perform(params.get('actions', []))
+                return {'value': None}
+            case Command.W3C_CLEAR_ACTIONS:
+                return {'value': None}
+            case Command.W3C_EXECUTE_SCRIPT | Command.W3C_EXECUTE_SCRIPT_ASYNC:
+                return {'value': self._run_script(
+                    params['script'],
+                    params.get('args', []),
+                    command == Command.W3C_EXECUTE_SCRIPT_ASYNC
+                )}
+            case Command.W3C_GET_WINDOW_HANDLES:
+                return {'value': list(self.handles)}
+            case Command.W3C_GET_CURRENT_WINDOW_HANDLE:
+                return {'value': self.current_handle}
+            case Command.SWITCH_TO_WINDOW:
+                self.current_handle = params['handle']
+                return {'value': None}
+            case _:
+                return {'value': None}
+
+    def _send_keys(self, node: MockElement, text: str) -> None:
+        if node.value is not None and any(k in text for k in _STEP_KEYS):
+            step = float(node.attrs.get('step') or 1)
+            value = node.value
+            for ch in text:
+                value += _STEP_KEYS.get(ch, 0) * step
+            node.value = min(max(value, float(node.attrs['min'])), float(node.attrs['max']))
+            return
+        if Keys.CONTROL in text:
+            # Ctrl+A 全选, 下一次输入替换原内容
+            node.keys = ''
+            node.attrs['value'] = ''
+            return
+        node.keys += text
+        node.attrs['value'] = node.keys
+
+    def _perform(self, sources: List[dict]) -> None:
+        for source in sources:
+            if source.get('type') == 'pointer':
+                # 移动到元素后按下并抬起视为点击该元素, 在方格上按下后移动再抬起视为拖动
+                target, point, down = None, (0, 0), None
+                for action in source.get('actions', []):
+                    if action.get('type') == 'pointerMove':
+                        node = self._node(action.get('origin'))
+                        if node:
+                            target, point = node, (action.get('x', 0), action.get('y', 0))
+                    elif action.get('type') == 'pointerDown':
+                        down = (target, point)
+                    elif action.get('type') == 'pointerUp' and target:
+                        if target.grid and target.palette and down and down[0] is target:
+                            self._paint(target, down[1], point)
+                        else:
+                            target.clicks += 1
+                            if target.on_click:
+                                target.on_click(self)
+                        down = None
+                continue
+            if source.get('type') != 'wheel':
+                continue
+            for action in source.get('actions', []):
+                node = self._node(action.get('origin'))
+                if action.get('type') == 'scroll' and node:
+                    node.scroll_top += action.get('deltaY', 0)
+
+    @staticmethod
+    def _paint(node: MockElement, start: Tuple[int, int], end: Tuple[int, int]) -> None:
+        """在方格上从 start 拖动到 end, 坐标同 move_to_element_with_offset, 以元素中心为原点"""
+        rows, cols = len(node.grid), len(node.grid[0])
+
+        def cell(point: Tuple[int, int]) -> Tuple[int, int]:
+            x = point[0] + node.rect['width'] / 2
+            y = point[1] + node.rect['height'] / 2
+            return (
+                min(max(int(y * rows / node.rect['height']), 0), rows - 1),
+                min(max(int(x * cols / node.rect['width']), 0), cols - 1)
+            )
+
+        (i0, j0), (i1, j1) = cell(start), cell(end)
+        inactive, active = node.palette
+        color = inactive if node.grid[i0][j0] == active else active
+        for i in range(min(i0, i1), max(i0, i1) + 1):
+            for j in range(min(j0, j1), max(j0, j1) + 1):
+                node.grid[i][j] = color
+
+    # ---- 脚本 ----
+
+    def _run_script(self, script: str, args: list, is_async: bool) -> Any:
+        for marker, asynchronous, fn in self._scripts:
+            if asynchronous == is_async and marker in script:
+                return fn(args)
+
+        if is_async:
+            if 'MutationObserver' in script:
+                return self._observe(*args[:7])
+            if "HTMLInputElement.prototype, 'value'" in script:
+                node = self._node(args[0])
+                if not node.controlled:
+                    node.value = float(args[1])
+                return node.value
+            return None
+
+        if '/* isDisplayed */' in script:
+            node = self._node(args[0])
+            return bool(node and node.displayed and node.present())
+        if '/* getAttribute */' in script:
+            # 与 selenium 的 getAttribute 一致, 没有该属性时取 DOM 属性(title 等默认为空字符串)
+            return self._node(args[0]).attrs.get(args[1], '')
+        if 'HTMLCanvasElement' in script:
+            return self._read_cube(self._node(args[0]), *args[1:4])
+        if "getAttribute('min')" in script:
+            attrs = self._node(args[0]).attrs
+            return {'min': attrs.get('min'), 'max': attrs.get('max'), 'step': attrs.get('step', '')}
+        if 'arguments[0].step = arguments[1]' in script:
+            self._node(args[0]).attrs['step'] = args[1]
+            return None
+        if 'return arguments[0].value' in script:
+            return self._node(args[0]).value
+        if 'window.screenLeft' in script:
+            return {
+                'window': {'x': 0, 'y': 0, 'width': 1920, 'height': 1080},
+                'rects': [dict(self._node(ref).rect) for ref in args[0]]
+            }
+        return None
+
+    def _observe(
+        self,
+        selector: str,
+        by: Literal['xpath', 'css'],
+        root,
+        wait_attr: str,
+        allow_null: bool,
+        multiple: bool,
+        timeout: int
+    ) -> Any:
+        """模拟页面内的 MutationObserver 等待: 元素出现即返回, 否则等到超时返回 null"""
+        using = 'xpath' if by == 'xpath' else 'css selector'
+        parent = self._node(root)
+        deadline = time.monotonic() + timeout / 1000
+
+        def ready(node: MockElement) -> bool:
+            if not wait_attr:
+                return True
+            if wait_attr == 'text':
+                return allow_null or (node.displayed and node.text.strip() != '')
+            if wait_attr == 'visible':
+                return node.displayed
+            return allow_null or bool(node.attrs.get(wait_attr))
+
+        while True:
+            found = self._query(using, selector, parent)
+            if found and (multiple or ready(found[0])):
+                return [self._ref(n) for n in found] if multiple else self._ref(found[0])
+            pending = self._pending(using, selector, parent)
+            wake = pending[0].appear_at if pending else deadline
+            if wake >= deadline:
+                _sleep(max(deadline - time.monotonic(), 0))
+                return None
+            _sleep(max(wake - time.monotonic(), 0))
+
+    @staticmethod
+    def _read_cube(
+        node: MockElement,
+        xunit: int,
+        yunit: int,
+        active: str = None
+    ) -> List[Any]:
+        grid = [list(row[:xunit]) for row in (node.grid or [])[:yunit]]
+        if not active:
+            return grid
+
+        def norm(color: str) -> str:
+            return ''.join(str(color).split()).lower()
+
+        return [
+            sum(1 << j for j, c in enumerate(row) if norm(c) == norm(active))
+            for row in grid
+        ]
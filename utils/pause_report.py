@@ -0,0 +1,79 @@
+"""统计点击操作以后置条件代替固定暂停所节省的等待时间, 进程退出时输出本次运行的报告"""
+import atexit
+import json
+import os
+from typing import Dict
+from utils.common import common
+
+
+class PauseReport:
+    """
+        节省暂停时间统计
+
+        每次带后置条件的点击会记录: 原固定暂停时间 legacy 与实际等待时间 waited,
+        节省时间为 max(legacy - waited, 0)
+    """
+
+    def __init__(self) -> None:
+        self._records: Dict[str, Dict[str, float]] = {}
+
+    def record(
+        self,
+        key: str,
+        legacy: float,
+        waited: float
+    ) -> None:
+        """
+            记录一次点击
+
+            参数:
+                - key: 统计维度, 一般为调用点击的页面方法名
+                - legacy: 原固定暂停时间
+                - waited: 等待后置条件实际耗时
+        """
+        item = self._records.setdefault(
+            key,
+            {'count': 0, 'legacy': 0.0, 'waited': 0.0, 'saved': 0.0}
+        )
+        item['count'] += 1
+        item['legacy'] += legacy
+        item['waited'] += waited
+        item['saved'] += max(legacy - waited, 0)
+
+    def saved(self) -> float:
+        """本次运行累计节省的暂停时间(秒)"""
+        return sum(item['saved'] for item in self._records.values())
+
+    def summary(self) -> dict:
+        """
+            返回值:
+                - dict: 汇总与各调用点明细
+        """
+        return {
+            'saved': round(self.saved(), 3),
+            'clicks': sum(item['count'] for item in self._records.values()),
+            'details': {
+                k: {n: round(v, 3) for n, v in item.items()}
+                for k, item in sorted(self._records.items())
+            }
+        }
+
+    def dump(self, path: str = None) -> None:
+        """
+            输出报告, 默认写入 outcome/pause_report.json, 没有记录时不输出
+
+            参数:
+                - path: 报告路径
+        """
+        if not self._records:
+            return
+        path = path or os.path.join(common.ProjectRoot, 'outcome', 'pause_report.json')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        summary = self.summary()
+        with open(path, 'w', encoding='utf-8') as stream:
+            json.dump(summary, stream, ensure_ascii=False, indent=2)
+        print(f"后置条件等待共节省暂停时间: {summary['saved']}s ({summary['clicks']}次点击), 详见 {path}")
+
+
+pause_report = PauseReport()
+atexit.register(pause_report.dump)
@@ -1,16 +1,19 @@
+import hashlib
+import pickle
 import sys
-from typing import Iterable
 import yaml
 import os
 
 
 class Config(object):
     __raw_data = dict()
+    __index = dict()  # source -> {以 `.` 连接的层级: 值}, 用于 get_page_data 的 O(1) 查找
 
     def __init__(self) -> None:
         """
             Custom config should place in test/config and with yml or yaml suffix.
             Source are the same as config file name.
+            解析结果按文件缓存在 config/.cache 下, 文件 mtime 与 sha1 均未变化时直接读取缓存, 跳过 YAML 解析。
         """
         # os.chdir("..")
         p = os.path.join(os.getcwd(), 'config')
@@ -19,10 +22,12 @@ class Config(object):
             # fname.split('.')：这会将文件名（如 'example.yml'）按照点号分割成一个列表，即 ['example', 'yml']。
             if fname.split('.')[-1] not in ['yml', 'yaml']:  # [-1]：这表示获取列表的最后一个元素，即文件扩展名。对于 'example.yml'，它会得到 'yml'。
                 continue
-            with open(file=os.path.join(p, fname), encoding='utf-8') as stream:  # 打开file文件，as stream：将打开的文件对象赋值给名为 stream 的变量
-                self.__raw_data[fname.split('.')[0]] = yaml.safe_load(stream)  # 获取文件名的前缀如case.yml中的case，作为__raw_data字典的键，值是从 YAML 文件加载得到的数据.
-                # safe_load是 PyYAML 库的函数，用于从打开的 YAML 文件流中加载数据。这里的 stream 是 open 函数返回的文件对象。
-                # yaml.safe_load 会将 YAML 格式的数据解析成 Python 对象，比如字典或列表。
+            # 获取文件名的前缀如case.yml中的case，作为__raw_data字典的键，值是从 YAML 文件加载得到的数据.
+            source = fname.split('.')[0]
+            self.__raw_data[source], self.__index[source] = self.__load(
+                os.path.join(p, fname),
+                os.path.join(p, '.cache', source + '.pickle')
+            )
         # print(self.__raw_data)
 
         # 'chromium_version' 是作为键传递给 get_data 方法的参数，表示我们要获取的特定配置项的名称。
@@ -31,6 +36,58 @@ class Config(object):
         self.app_data_dir = self.get_data('app_data_dir', '')
         self.executable_path = self.get_data('executable_path', '')
 
+    @staticmethod
+    def __load(fname: str, cache: str) -> tuple:
+        """
+            加载 YAML 文件, 优先使用解析缓存
+
+            参数:
+                - fname: YAML 文件路径
+                - cache: 缓存文件路径
+
+            返回值:
+                - (Any, dict): (解析结果, 层级索引)
+        """
+        with open(fname, 'rb') as stream:
+            raw = stream.read()
+        mtime = os.stat(fname).st_mtime_ns
+        digest = hashlib.sha1(raw).hexdigest()
+
+        try:
+            with open(cache, 'rb') as stream:
+                cached = pickle.load(stream)
+            if cached['mtime'] == mtime and cached['sha1'] == digest:
+                return cached['data'], cached['index']
+        except (OSError, pickle.PickleError, EOFError, KeyError, AttributeError):
+            pass
+
+        # safe_load是 PyYAML 库的函数，用于从 YAML 文件内容中加载数据。
+        # yaml.safe_load 会将 YAML 格式的数据解析成 Python 对象，比如字典或列表。
+        data = yaml.safe_load(raw.decode('utf-8'))
+        index = dict()
+        Config.__flatten(data, '', index)
+
+        try:
+            os.makedirs(os.path.dirname(cache), exist_ok=True)
+            tmp = f"{cache}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as stream:
+                pickle.dump({'mtime': mtime, 'sha1': digest, 'data': data, 'index': index}, stream)
+            os.replace(tmp, cache)
+        except OSError:
+            # 缓存写入失败(如只读目录)不影响配置加载
+            pass
+        return data, index
+
+    @staticmethod
+    def __flatten(data, prefix: str, index: dict) -> None:
+        """将嵌套字典展开为 `a.b.c` -> 值 的索引, 中间层级同样建立索引"""
+        if not isinstance(data, dict):
+            return
+        for k, v in data.items():
+            key = f"{prefix}.{k}" if prefix else str(k)
+            index[key] = v
+            Config.__flatten(v, key, index)
+
     def get_data(self, key: str, default: str = '', source: str = 'global') -> str:
         """Get specific config"""
         # 这是一个三元表达式，用于返回根据给定键从配置数据中检索的值，如果键不存在，则返回默认值。
@@ -63,43 +120,17 @@ class Config(object):
                 - get_page_data(tier=''), 不指定source, 默认为global, tier为'', 会取 test/config/global.yml 下的所有参数
         """
         if tier is None:
+            # 未指定 tier 时按调用方文件名推断, 页面类应显式传入 tier
             co_filename = sys._getframe(1).f_code.co_filename
             tier = os.path.splitext(os.path.basename(co_filename))[0]  # os.path.basename(co_filename) 取 co_filename 的基本文件名，即去除路径后的文件名部分。
             # os.path.splitext(...) 将文件名和扩展名分开，返回一个包含文件名和扩展名的元组。[0] 取元组的第一个元素，即文件名部分。
-        # # 获取指定来源 (`source`) 的原始数据
-        _data = self.__raw_data[source]
-
-        _ret = dict()  # 创建一个空字典 _ret，用于存储最终提取的数据。
-        _dinfo = dict()  # 创建一个空字典 _dinfo，用于存储额外的信息，这里的额外信息在代码中并没有给出。
-
-        # if source == 'case':
-        #     # 用例配置自动注入设备基础参数
-        #     _dinfo['device'] = dict()
-        #     for k, v in self.__raw_data['device'].items():
-        #         _dinfo['device'][k] = v
 
         if tier == '':
-            return _data if not _dinfo else {**_data, **_dinfo}
-        else:
-            tiers = tier.split('.')
-            for t in tiers:
-                flag = False
-                if isinstance(_data, Iterable):
-                    for k, v in _data.items():
-                        if k == t:
-                            flag = True
-                            _data = v
-                            _ret = v
-                            break
-                else:
-                    _ret = _data
-                if not flag:
-                    _ret = {}
-                    break
-
-            if not _ret:
-                return _ret
-            return _ret if not _dinfo else {**_ret, **_dinfo}
+            # 获取指定来源 (`source`) 的原始数据
+            return self.__raw_data[source]
+
+        # 通过层级索引直接取值, 不存在时返回空字典
+        return self.__index[source].get(tier, {})
 
 
 config = Config()
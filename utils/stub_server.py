@@ -0,0 +1,339 @@
+"""
+    本地桩服务, 用于离线调试与测试
+
+    - DeviceProfileStub: 模拟 device_type_api, 按 UID 返回设备档案
+    - ImapStub: 模拟报警邮箱, 支持 get_email_details 用到的 IMAP 命令子集(SEARCH/FETCH 分段/BODYSTRUCTURE/IDLE)
+"""
+import json
+import re
+import select
+import socketserver
+import threading
+from email import message_from_bytes, policy
+from email.message import Message
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Union
+
+
+class DeviceProfileStub:
+    """
+        device_type_api 桩服务, 路径与线上一致: /v1.0/devices/<uid>/profile/
+
+        eg:
+            with DeviceProfileStub({'952700Y005FT13UE': {'batteryType': 2, 'wifiType': 2}}) as stub:
+                # 将 global.yml 的 device_type_api 设为 stub.endpoint
+                ...
+                stub.hits  # 各 UID 被请求的次数
+    """
+
+    _path = re.compile(r'^/v1\.0/devices/([^/]+)/profile/?$')
+
+    def __init__(
+        self,
+        profiles: Dict[str, dict],
+        host: str = '127.0.0.1',
+        port: int = 0
+    ) -> None:
+        self.profiles = profiles
+        self.hits: Dict[str, int] = {}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                m = stub._path.match(self.path)
+                uid = m.group(1) if m else None
+                if uid:
+                    stub.hits[uid] = stub.hits.get(uid, 0) + 1
+                if not uid or uid not in stub.profiles:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = json.dumps(stub.profiles[uid]).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def endpoint(self) -> str:
+        """可直接用作 device_type_api 的地址模板"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1.0/devices/${{uid}}/profile/"
+
+    def start(self) -> 'DeviceProfileStub':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'DeviceProfileStub':
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+def _quote(value: str) -> str:
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _payload(part: Message) -> bytes:
+    """part 的原始(传输编码后)内容"""
+    return part.get_payload().encode('utf-8', 'surrogateescape')
+
+
+def _bodystructure(part: Message) -> str:
+    if part.is_multipart():
+        children = ''.join(_bodystructure(p) for p in part.get_payload())
+        return f"({children} {_quote(part.get_content_subtype().upper())})"
+
+    params = part.get_params()[1:] if part.get_params() else []
+    params = '(' + ' '.join(f"{_quote(k)} {_quote(v)}" for k, v in params) + ')' if params else 'NIL'
+    body = _payload(part)
+    fields = ' '.join([
+        _quote(part.get_content_maintype().upper()),
+        _quote(part.get_content_subtype().upper()),
+        params,
+        'NIL',
+        'NIL',
+        _quote(part.get('Content-Transfer-Encoding', '7BIT').upper()),
+        str(len(body))
+    ])
+    if part.get_content_maintype() == 'text':
+        fields += ' ' + str(body.count(b'\n'))
+    disposition = 'NIL'
+    if part.get_content_disposition():
+        filename = part.get_param('filename', header='content-disposition')
+        disposition = f"({_quote(part.get_content_disposition().upper())} " + (
+            f"({_quote('FILENAME')} {_quote(filename)}))" if filename else 'NIL)'
+        )
+    return f"({fields} NIL {disposition})"
+
+
+class ImapStub:
+    """
+        IMAP 桩服务(明文, 无需证书), 收件箱内容由测试预置, 可在运行中投递新邮件以测试 IDLE
+
+        eg:
+            with ImapStub([raw_mail1, raw_mail2]) as stub:
+                util.get_email_details('a@b.c', 'pwd', stub.host, port=stub.port, ssl=False)
+                stub.deliver(raw_mail3)   # 通知正在 IDLE 的连接
+                stub.fetched              # FETCH 返回的字节数, 用于确认只下载了需要的内容
+    """
+
+    def __init__(
+        self,
+        messages: List[Union[bytes, Message]] = None,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        idle: bool = True
+    ) -> None:
+        self.mails: List[dict] = []
+        self.commands: List[str] = []
+        self.fetched = 0
+        self._changed = threading.Condition()
+        self._idle = idle
+        for msg in messages or []:
+            self.deliver(msg)
+        stub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def send(self, data: Union[str, bytes]) -> None:
+                self.wfile.write(data.encode('utf-8') if isinstance(data, str) else data)
+                self.wfile.flush()
+
+            def handle(self):
+                self.send('* OK IMAP4rev1 stub ready\r\n')
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    tag, _, rest = line.decode('utf-8').rstrip('\r\n').partition(' ')
+                    stub.commands.append(rest)
+                    if not stub._dispatch(self, tag, rest):
+                        return
+
+            def idle(self, tag: str) -> None:
+                # 与常见服务端一样, SELECT 之后到达的邮件在进入 IDLE 时立即通知, 与续行在同一次写入中发送
+                known = getattr(self, 'known', 0)
+                with stub._changed:
+                    if len(stub.mails) > known:
+                        known = len(stub.mails)
+                        self.send(f"+ idling\r\n* {known} EXISTS\r\n")
+                    else:
+                        self.send('+ idling\r\n')
+                while True:
+                    if select.select([self.connection], [], [], 0.05)[0]:
+                        self.rfile.readline()  # DONE
+                        break
+                    with stub._changed:
+                        if len(stub.mails) > known:
+                            known = len(stub.mails)
+                            self.send(f"* {known} EXISTS\r\n")
+                self.known = known
+                self.send(f"{tag} OK IDLE terminated\r\n")
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        self._server = Server((host, port), Handler)
+        self._thread = None
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def deliver(
+        self,
+        raw: Union[bytes, Message],
+        date: str = None,
+        seen: bool = False
+    ) -> int:
+        """
+            投递邮件
+
+            参数:
+                - raw: 邮件原文或 email.message.Message
+                - date: 接收日期(同 IMAP SEARCH ON 的格式), 默认为当天
+                - seen: 是否已读
+
+            返回值:
+                - int: 邮件 uid
+        """
+        from utils.mailbox import imap_date
+
+        if isinstance(raw, Message):
+            raw = raw.as_bytes()
+        msg = message_from_bytes(raw, policy=policy.compat32)
+        with self._changed:
+            uid = len(self.mails) + 1
+            self.mails.append({
+                'uid': uid,
+                'raw': raw,
+                'msg': msg,
+                'seen': seen,
+                'date': date or imap_date()
+            })
+            self._changed.notify_all()
+        return uid
+
+    def _search_key(self, tokens: list):
+        t = str(tokens.pop(0)).upper()
+        if t == 'ALL':
+            return lambda m: True
+        if t == 'UNSEEN':
+            return lambda m: not m['seen']
+        if t == 'ON':
+            day = str(tokens.pop(0)).lower()
+            return lambda m: m['date'].lower() == day
+        if t == 'SUBJECT':
+            text = str(tokens.pop(0)).lower()
+            return lambda m: text in str(m['msg'].get('Subject', '')).lower()
+        if t == 'OR':
+            a, b = self._search_key(tokens), self._search_key(tokens)
+            return lambda m: a(m) or b(m)
+        raise ValueError(f"unsupported search key: {t}")
+
+    def _search(self, criteria: str) -> List[int]:
+        from utils.mailbox import parse_list
+
+        tokens = parse_list(criteria.encode('utf-8'))
+        keys = []
+        while tokens:
+            keys.append(self._search_key(tokens))
+        return [m['uid'] for m in self.mails if all(k(m) for k in keys)]
+
+    @staticmethod
+    def _section(msg: Message, section: str) -> bytes:
+        m = re.match(r'HEADER\.FIELDS \(([^)]*)\)$', section, re.I)
+        if m:
+            names = m.group(1).lower().split()
+            head = ''.join(f"{k}: {v}\r\n" for k, v in msg.items() if k.lower() in names)
+            return (head + '\r\n').encode('utf-8')
+        part = msg
+        for n in section.split('.'):
+            if part.is_multipart():
+                part = part.get_payload()[int(n) - 1]
+        return _payload(part)
+
+    def _fetch(self, mail: dict, items: str) -> bytes:
+        out = [f"UID {mail['uid']}".encode('utf-8')]
+        if 'BODYSTRUCTURE' in items.upper():
+            out.append(f"BODYSTRUCTURE {_bodystructure(mail['msg'])}".encode('utf-8'))
+        for peek, section, partial in re.findall(r'BODY(\.PEEK)?\[([^\]]*)\](?:<(\d+\.\d+)>)?', items, re.I):
+            data = self._section(mail['msg'], section)
+            name = f"BODY[{section}]"
+            if partial:
+                offset, size = (int(x) for x in partial.split('.'))
+                data = data[offset:offset + size]
+                name += f"<{offset}>"
+            if not peek:
+                mail['seen'] = True
+            self.fetched += len(data)
+            out.append(f"{name} {{{len(data)}}}\r\n".encode('utf-8') + data)
+        seq = self.mails.index(mail) + 1
+        return f"* {seq} FETCH (".encode('utf-8') + b' '.join(out) + b')\r\n'
+
+    def _dispatch(self, handler, tag: str, rest: str) -> bool:
+        cmd, _, args = rest.partition(' ')
+        cmd = cmd.upper()
+        if cmd == 'CAPABILITY':
+            handler.send('* CAPABILITY IMAP4rev1' + (' IDLE' if self._idle else '') + '\r\n')
+        elif cmd == 'SELECT':
+            handler.known = len(self.mails)
+            handler.send(f"* {handler.known} EXISTS\r\n")
+        elif cmd == 'IDLE' and self._idle:
+            handler.idle(tag)
+            return True
+        elif cmd == 'LOGOUT':
+            handler.send('* BYE\r\n')
+            handler.send(f"{tag} OK LOGOUT completed\r\n")
+            return False
+        elif cmd == 'UID':
+            sub, _, args = args.partition(' ')
+            if sub.upper() == 'SEARCH':
+                uids = ' '.join(str(u) for u in self._search(args))
+                handler.send(f"* SEARCH {uids}\r\n".replace(' \r\n', '\r\n'))
+            elif sub.upper() == 'FETCH':
+                uid, _, items = args.partition(' ')
+                for mail in self.mails:
+                    if str(mail['uid']) in uid.split(','):
+                        handler.send(self._fetch(mail, items))
+            else:
+                handler.send(f"{tag} BAD unsupported UID {sub}\r\n")
+                return True
+        elif cmd not in ('LOGIN', 'NOOP'):
+            handler.send(f"{tag} BAD unsupported command {cmd}\r\n")
+            return True
+        handler.send(f"{tag} OK {cmd} completed\r\n")
+        return True
+
+    def start(self) -> 'ImapStub':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'ImapStub':
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
@@ -1,27 +1,32 @@
 import json
 import os
-from typing import Iterable, Union, Dict
+from typing import Iterable, List, Union, Dict
 from utils.common import common
 from utils.read_config import config
-from PIL import Image
-from requests import get
-import av
+from utils.device_profile import device_profiles
+from utils.media_catalog import MediaCatalog
+from utils import media_probe
+from utils.artifact_store import artifacts
 import time
-import shutil
-from imbox import Imbox
 
 
 """
 封装了一系列工具函数，如获取全局配置、设备类型等函数，方便开发过程中调用
+PIL、av、requests 等依赖在首次使用时导入, 客户端配置在首次读取时加载
 """
 
 
 class Util:
 
     _app_settings = None
+    _media_catalog = None
+    probe_stats = None  # 最近一次批量探测媒体文件的统计, 见 media_probe.probe_many
 
-    def __init__(self) -> None:
-        self._app_settings = self.get_app_settings()
+    def _get_media_catalog(self) -> MediaCatalog:
+        """媒体文件目录, 首次使用时创建"""
+        if not self._media_catalog:
+            self._media_catalog = MediaCatalog()
+        return self._media_catalog
 
     def get_app_settings(
         self,
@@ -87,48 +92,37 @@ class Util:
                 res[item['key']] = item['value']
         return res
 
-    def __get_imginfo(
+    def __probe_media(
         self,
-        fname: str
-    ) -> str:
-        '''
-            获取图片信息（分辨率）
-
-            参数:
-                - fname: 图片完整路径
-
-            返回值
-                - str: 图片分辨率
-        '''
-
-        fname = fname.encode('utf-8')
-        with Image.open(fname) as img:
-            return (str)(img.size[0]) + '*' + (str)(img.size[1])
-
-    def __get_videoinfo(
-        self,
-        fname: str
-    ) -> dict:
+        cat: str,
+        fnames: List[str]
+    ) -> Dict[str, dict]:
         '''
-            获取视频文件信息(时长)
+            批量探测媒体文件, 文件较多时通过进程池并行
 
             参数:
-                - fname: 视频文件完整路径
+                - cat: 文件类型, 同 `get_fileinfo`
+                - fnames: 文件完整路径列表
 
             返回值
-                - dict: 视频基础参数, 包括
-                    - duration: 时长
-                    - with: 帧宽度
-                    - height: 帧长度
-                    - fps: 帧率
+                - Dict[str, dict]: 文件路径 -> {rs: 分辨率, vinfo: 视频基础信息},
+                  单个文件探测失败时 rs 为空, vinfo 为 {error: 错误信息}, 不影响其他文件; 吞吐统计见 `probe_stats`
         '''
-        stream = av.open(fname).streams.video[0]
-        return {
-            'fps': float(stream.average_rate),
-            'duration': stream.duration * 1.0 * stream.time_base,
-            'width': stream.width,
-            'height': stream.height
-        }
+        results, stats = media_probe.probe_many(
+            fnames,
+            kind='image' if cat == 'image' else 'video'
+        )
+        self.probe_stats = stats
+        _ret = dict()
+        for fname, r in results.items():
+            if 'error' in r:
+                _ret[fname] = {'rs': '', 'vinfo': {'error': r['error']}}
+                continue
+            _ret[fname] = {
+                'rs': f"{r['width']}*{r['height']}" if cat == 'image' else '',
+                'vinfo': r if cat != 'image' else {}
+            }
+        return _ret
 
     def get_device_battery_type(
         self,
@@ -144,13 +138,7 @@ class Util:
                 - (EDeviceType, str): (设备类型, 错误信息)
         '''
 
-        if not uid:
-            raise ValueError(
-                f"{common.I18n['_error_msg']['_wrong_params']}: uid 不可为空"
-            )
-        endpoint = str(config.get_data('device_type_api'))
-        endpoint = endpoint.replace('${uid}', uid)
-        resp = json.loads(get(url=endpoint).text)
+        resp = device_profiles.get(uid)
         return common.EDeviceType(resp['batteryType'])
 
     def get_device_wifi_type(
@@ -166,13 +154,7 @@ class Util:
             返回值:
                 - (EDeviceWifiType, str): (设备类型, 错误信息)
         '''
-        if not uid:
-            raise ValueError(
-                f"{common.I18n['_error_msg']['_wrong_params']}: uid 不可为空"
-            )
-        endpoint = str(config.get_data('device_type_api'))
-        endpoint = endpoint.replace('${uid}', uid)
-        resp = json.loads(get(url=endpoint).text)
+        resp = device_profiles.get(uid)
         return common.EDeviceWifiType(int(resp['wifiType']))
 
     def is_integer(
@@ -235,7 +217,7 @@ class Util:
                     - ctime(float): 创建时间
                     - rs(str): 分辨率(图片)  仅cat为 `image` 时, 该参数有值
                     - vinfo(dict): 视频基础信息 仅cat为 `download`|`record` 时, 该参数有值
-                    参考 Util.`__get_videoinfo` 的返回值
+                    参考 media_probe.`video_info` 的返回值
         '''
         try:
             if cat not in ['image', 'download', 'record']:
@@ -260,9 +242,7 @@ class Util:
             }
 
             td = os.path.join(common.ProjectRoot, 'outcome', cat)
-            first = False
             if not os.path.exists(td):
-                first = True
                 os.makedirs(td)
 
             target_dir = self.get_app_settings(key=mappings[cat])
@@ -273,33 +253,32 @@ class Util:
                     self.get_time_by_fmt('%m%d%Y')
                 )
 
-            _ret = []
-            for fn in os.listdir(target_dir):
-
-                fname = os.path.join(target_dir, fn)
-                if os.path.isdir(fname):
-                    continue
+            # 通过媒体目录查询, 只探测需要返回的文件, 已探测且未变化的文件直接使用缓存结果
+            entries = self._get_media_catalog().query(
+                directory=target_dir,
+                num=num,
+                sort=sort,
+                probe=lambda fnames: self.__probe_media(cat, fnames)
+            )
 
-                tf = os.path.join(td, fn)
+            _ret = []
+            for e in entries:
+                tf = os.path.join(td, os.path.basename(e['path']))
 
+                # 收集到内容寻址存储: 抓拍图片写入后不再改写, 直接硬链接入库;
+                # 录像可能仍在写入, 以 reflink/clonefile 入库, 不支持时分块复制(复制时计算摘要)
                 if not os.path.exists(tf):
-                    shutil.copy(fname, tf)
+                    artifacts.put_file(e['path'], tf, immutable=cat == 'image')
 
-                fi = fname if first else tf
                 _ret.append({
-                    'fname': fi,
-                    'ctime': os.path.getctime(fi),
-                    'size': round(os.path.getsize(fi) / 1024, 2),
-                    'rs': self.__get_imginfo(fi) if cat == 'image' else '',
-                    'vinfo': self.__get_videoinfo(fi) if cat != 'image' else {}
+                    'fname': tf,
+                    'ctime': e['ctime'],
+                    'size': round(e['size'] / 1024, 2),
+                    'rs': e['info']['rs'],
+                    'vinfo': e['info']['vinfo']
                 })
 
-            _ret.sort(
-                key=lambda x: x['ctime'],
-                reverse=sort == 'new'
-            )
-
-            return _ret[:num], ''
+            return _ret, ''
 
         except BaseException as err:
             return None, str(err)
@@ -340,7 +319,10 @@ class Util:
         self,
         email: str,
         passwd: str,
-        host: str
+        host: str,
+        wait: float = 0,
+        port: int = None,
+        ssl: bool = True
     ) -> dict:
         '''
             获取邮件内容关于邮件报警的内容
@@ -349,6 +331,9 @@ class Util:
                 - email: 邮件报警收件邮箱地址
                 - passwd: 邮箱客户端授权码
                 - host: 邮件服务器地址
+                - wait: 没有报警邮件时的最长等待时间(秒), 通过 IMAP IDLE 等待新邮件, 默认不等待
+                - port: 邮件服务器端口, 默认为 993(ssl)/143
+                - ssl: 是否使用 SSL 连接
 
             返回值:
                 - 邮件详情(dict):
@@ -359,46 +344,17 @@ class Util:
                     - attachments(List[dict[str, str|int]]): 附件
                 - 错误消息(str): 正确返回时为空, 否则返回错误消息
         '''
-        with Imbox(host, username=email, password=passwd, ssl=True) as ibox:
-            all_msgs = ibox.messages(
-                unread=True,
-                date__on=time.strftime('%d-%b-%Y')
-            )
-            list = []
-            for _, msg in all_msgs:
-                if msg.subject.find('Scheduled Email for') != -1 or msg.subject.find('Motion Detection for') != -1:
-                    list.append(
-                        {
-                            'subject': msg.subject,
-                            'sent_from': msg.sent_from,
-                            'sent_to': msg.sent_to,
-                            'body': msg.body['html'][0] if msg.body['html'] else msg.body['plain'][0],
-                            'attachments': msg.attachments
-                        }
-                    )
-
-            if not list:
-                return None
-
-            ml = list[-1]
-            if ml['attachments']:
-                fp = os.path.join(common.ProjectRoot, 'outcome', 'mail')
-                if not os.path.exists(fp):
-                    os.makedirs(fp)
-                for i, atch in enumerate(ml['attachments']):
-                    fname = os.path.join(
-                        fp,
-                        atch['filename']
-                    )
-                    with open(fname, "wb") as of:
-                        # Copy the BytesIO stream to the output file
-                        of.write(atch['content'].getbuffer())
-
-                    ml['attachments'][i]['filename'] = fname
-                    del ml['attachments'][i]['content']
-                    del ml['attachments'][i]['content-id']
-
-            return ml
+        from utils.mailbox import AlertMailbox
+
+        fp = os.path.join(common.ProjectRoot, 'outcome', 'mail')
+        if not os.path.exists(fp):
+            os.makedirs(fp)
+
+        # 服务端检索当天未读的报警邮件, 只下载最新一封, 附件分段写入磁盘
+        with AlertMailbox(email, passwd, host, port=port, ssl=ssl) as box:
+            if wait > 0:
+                return box.wait(fp, timeout=wait)
+            return box.latest(fp)
 
     def get_sniff_time_by_uid(
         self,